@@ -0,0 +1,119 @@
+"""challenge full text search
+
+Revision ID: b375d9aa05b6
+Revises: 6f7dfbea263a
+Create Date: 2026-10-18 00:00:41.288990
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+SEARCH_VECTOR_FUNCTIONS = """
+CREATE OR REPLACE FUNCTION challenge_search_vector(
+    challenge_id uuid, title text, description text
+) RETURNS tsvector LANGUAGE sql STABLE AS $$
+    SELECT setweight(to_tsvector('english', coalesce(title, '')), 'A')
+        || setweight(to_tsvector('english', coalesce((
+            SELECT string_agg(topics.name, ' ')
+            FROM challenge_topics JOIN topics ON topics.id = challenge_topics.topic_id
+            WHERE challenge_topics.challenge_id = $1
+        ), '')), 'B')
+        || setweight(to_tsvector('english', coalesce(description, '')), 'C')
+$$;
+
+CREATE OR REPLACE FUNCTION challenges_search_vector_update() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    NEW.search_vector := challenge_search_vector(NEW.id, NEW.title, NEW.description);
+    RETURN NEW;
+END
+$$;
+
+-- statement level so that bulk inserts refresh each challenge once
+CREATE OR REPLACE FUNCTION challenge_topics_search_vector_update() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    UPDATE challenges
+    SET search_vector = challenge_search_vector(id, title, description)
+    WHERE id IN (SELECT challenge_id FROM changed_topics);
+    RETURN NULL;
+END
+$$;
+
+CREATE OR REPLACE FUNCTION topics_search_vector_update() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    UPDATE challenges
+    SET search_vector = challenge_search_vector(id, title, description)
+    WHERE id IN (
+        SELECT challenge_id FROM challenge_topics WHERE topic_id = NEW.id
+    );
+    RETURN NULL;
+END
+$$;
+"""
+
+SEARCH_VECTOR_TRIGGERS = """
+CREATE TRIGGER challenges_search_vector
+BEFORE INSERT OR UPDATE OF title, description ON challenges
+FOR EACH ROW EXECUTE FUNCTION challenges_search_vector_update();
+
+CREATE TRIGGER challenge_topics_insert_search_vector
+AFTER INSERT ON challenge_topics REFERENCING NEW TABLE AS changed_topics
+FOR EACH STATEMENT EXECUTE FUNCTION challenge_topics_search_vector_update();
+
+CREATE TRIGGER challenge_topics_delete_search_vector
+AFTER DELETE ON challenge_topics REFERENCING OLD TABLE AS changed_topics
+FOR EACH STATEMENT EXECUTE FUNCTION challenge_topics_search_vector_update();
+
+CREATE TRIGGER topics_search_vector
+AFTER UPDATE OF name ON topics
+FOR EACH ROW EXECUTE FUNCTION topics_search_vector_update();
+"""
+
+DROP_SEARCH_VECTOR = """
+DROP TRIGGER IF EXISTS topics_search_vector ON topics;
+DROP TRIGGER IF EXISTS challenge_topics_delete_search_vector ON challenge_topics;
+DROP TRIGGER IF EXISTS challenge_topics_insert_search_vector ON challenge_topics;
+DROP TRIGGER IF EXISTS challenges_search_vector ON challenges;
+DROP FUNCTION IF EXISTS topics_search_vector_update();
+DROP FUNCTION IF EXISTS challenge_topics_search_vector_update();
+DROP FUNCTION IF EXISTS challenges_search_vector_update();
+DROP FUNCTION IF EXISTS challenge_search_vector(uuid, text, text);
+"""
+
+# revision identifiers, used by Alembic.
+revision: str = 'b375d9aa05b6'
+down_revision: Union[str, None] = '6f7dfbea263a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.add_column('challenges', sa.Column('search_vector', sa.Text().with_variant(postgresql.TSVECTOR(), 'postgresql'), nullable=True))
+    op.create_index('ix_challenges_search_vector', 'challenges', ['search_vector'], unique=False, postgresql_using='gin')
+    # ### end Alembic commands ###
+
+    # other databases use the in-process index of app.api.crud.search
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.execute(SEARCH_VECTOR_FUNCTIONS)
+    op.execute(SEARCH_VECTOR_TRIGGERS)
+    op.execute(
+        "UPDATE challenges "
+        "SET search_vector = challenge_search_vector(id, title, description)"
+    )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute(DROP_SEARCH_VECTOR)
+
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.drop_index('ix_challenges_search_vector', table_name='challenges', postgresql_using='gin')
+    op.drop_column('challenges', 'search_vector')
+    # ### end Alembic commands ###
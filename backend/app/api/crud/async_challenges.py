@@ -0,0 +1,415 @@
+"""
+Async versions of `app.api.crud.challenges`, for routes using `AsyncSessionDep`.
+
+Statements are shared with the sync module so both stay in sync. They load
+the relationships read by the response models eagerly, which is required here
+since lazy loading is not available with an `AsyncSession`.
+"""
+
+from uuid import UUID
+from typing import Any, AsyncIterator, List, Optional, Sequence
+from fastapi import HTTPException, status
+from sqlalchemy.orm.exc import NoResultFound
+from sqlalchemy.exc import IntegrityError, OperationalError
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.api.models.challenges import (
+    ApprovalStatus,
+    ChallengeStatus,
+    invalidate_updated_views,
+)
+from app.api.models import Challenge, ChallengeTakers, Topic
+from app.api.crud import search
+from app.core.config import settings
+from app.api.crud.challenges import (
+    CHALLENGE_INFO_OPTIONS,
+    ChallengeSort,
+    Cursor,
+    TopicMatch,
+    available_challenges_query,
+    challenge_stats_update,
+    challenge_taken_query,
+    contributions_query,
+    resolve_topic_filter,
+    status_change_update,
+    taken_challenges_query,
+    view_challenge_query,
+)
+
+
+async def apply_stats_update(db: AsyncSession, statement) -> int:
+    """See `challenges.apply_stats_update`"""
+    slugs = (await db.exec(statement)).scalars().all()
+    invalidate_updated_views(db, slugs)
+    return len(slugs)
+
+
+async def db_available_challenges(
+    db: AsyncSession,
+    *,
+    limit: Optional[int] = None,
+    offset: int = 0,
+    after: Optional[Cursor] = None,
+    title: Optional[str] = None,
+    topics: List[str] = [],
+    topic_match: TopicMatch = "any",
+    sort: ChallengeSort = "newest",
+) -> Sequence[Challenge]:
+    """
+    Get all available challenges
+
+    See `app.api.crud.challenges.db_available_challenges`.
+
+    Raises:
+        HTTPException: 500 if there was an internal server error.
+    """
+    try:
+        topic_ids = []
+        if topics:
+            topic_ids = await db.run_sync(resolve_topic_filter, topics, topic_match)
+            if topic_ids is None:
+                return []
+        statement = available_challenges_query(
+            limit=limit,
+            offset=offset,
+            after=after,
+            matching=await db.run_sync(search.match_clause, title),
+            topic_ids=topic_ids,
+            topic_match=topic_match,
+            sort=sort,
+        )
+        return (await db.exec(statement)).all()
+    except OperationalError as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Database Connection Failed",
+        ) from e
+    except Exception as e:
+        print(e)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e)
+        ) from e
+
+
+async def db_taken_challenges(
+    db: AsyncSession,
+    *,
+    user_id: UUID,
+    challenge_status: Optional[str],
+    limit: Optional[int] = None,
+    after: Optional[Cursor] = None,
+) -> Sequence[Any]:
+    """
+    Get all challenges that the user has taken with a given status.
+
+    See `app.api.crud.challenges.db_taken_challenges`.
+
+    Raises:
+        HTTPException: 400 if the user_id is not in a valid UUID format.
+        HTTPException: 500 if there was an internal server error.
+    """
+    try:
+        query = taken_challenges_query(
+            user_id=user_id,
+            challenge_status=challenge_status,
+            limit=limit,
+            after=after,
+        )
+        return (await db.exec(query)).all()
+    except OperationalError as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Database Connection Failed",
+        ) from e
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid user_id format: Expected UUID",
+        ) from e
+    except Exception as e:
+        print(e)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR) from e
+
+
+async def db_check_challenge_taken(
+    db: AsyncSession, *, user_id: UUID, challenge_id: UUID
+) -> Optional[ChallengeTakers]:
+    """
+    Check if a user has taken a challenge.
+
+    Returns:
+        ChallengeTakers: The challenge taker object if the user has taken the challenge.
+                         None if the user has not taken the challenge.
+
+    Raises:
+        HTTPException: 500 if there was an internal server error.
+    """
+    try:
+        return (
+            await db.exec(
+                challenge_taken_query(user_id=user_id, challenge_id=challenge_id)
+            )
+        ).one_or_none()
+    except OperationalError as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Database Connection Failed",
+        ) from e
+    except Exception as e:
+        print(e)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+async def db_take_new_challenge(
+    db: AsyncSession, *, user_id: UUID, challenge_id: UUID
+) -> ChallengeTakers:
+    try:
+        new_challenge = ChallengeTakers(user_id=user_id, challenge_id=challenge_id)
+        db.add(new_challenge)
+        await apply_stats_update(db, challenge_stats_update(challenge_id, takers=1))
+        await db.commit()
+        await db.refresh(new_challenge)
+        return new_challenge
+
+    except OperationalError as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Database Connection Failed",
+        ) from e
+    except Exception as e:
+        print(e)
+        await db.rollback()
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR) from e
+
+
+async def db_update_taken_challenge(
+    db: AsyncSession,
+    *,
+    user_id: UUID,
+    challenge_id: UUID,
+    github_url: Optional[str] = None,
+    presentation_video_url: Optional[str] = None,
+    deployed_application_url: Optional[str] = None,
+    feedback: Optional[str] = None,
+    _status: ChallengeStatus,
+):
+    try:
+        taken_challenge = (
+            await db.exec(
+                challenge_taken_query(user_id=user_id, challenge_id=challenge_id)
+            )
+        ).one()
+        previous_status = taken_challenge.status
+        if github_url:
+            taken_challenge.github_url = github_url
+        if presentation_video_url:
+            taken_challenge.presentation_video_url = presentation_video_url
+        if deployed_application_url:
+            taken_challenge.deployed_application_url = deployed_application_url
+        if feedback:
+            taken_challenge.feedback = feedback
+        if _status:
+            taken_challenge.status = _status
+        stats_update = status_change_update(
+            challenge_id, previous_status, taken_challenge.status
+        )
+        if stats_update is not None:
+            await apply_stats_update(db, stats_update)
+        await db.commit()
+        await db.refresh(taken_challenge)
+        return taken_challenge
+    except OperationalError as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Database Connection Failed",
+        ) from e
+    except IntegrityError as e:
+        await db.rollback()  # Rollback transaction on exception
+        if "unique constraint" in str(e.orig):
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Duplicate Data Found. Please check your data and try again. Might be someone already submitted the solution with these URLs",
+            )
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Integrity Error occurred",
+        )
+    except Exception as e:
+        print(e)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        ) from e
+
+
+async def db_view_challenge(
+    db: AsyncSession, *, slug: Optional[str] = None, id: Optional[UUID] = None
+) -> Optional[Challenge]:
+    """
+    Get a challenge by slug or id, with its topics and contributor loaded.
+
+    Raises:
+        HTTPException: 500 if there was an internal server error.
+    """
+    try:
+        statement = view_challenge_query(slug=slug, id=id).options(
+            *CHALLENGE_INFO_OPTIONS
+        )
+        return (await db.exec(statement)).one_or_none()
+
+    except OperationalError as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Database Connection Failed",
+        ) from e
+    except Exception as e:
+        print(e)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR) from e
+
+
+async def db_create_challenge(
+    db: AsyncSession, *, contributor_id: UUID, challenge_data: dict
+) -> Challenge:
+    """
+    Create a new challenge in the database.
+
+    Returns:
+        Challenge: The newly created challenge, with its topics and contributor loaded.
+
+    Raises:
+        HTTPException: 500 if there was an internal server error.
+    """
+    try:
+        db_challenge = Challenge(**challenge_data, contributor_id=contributor_id)
+        db.add(db_challenge)
+        await db.commit()
+        return (
+            await db.exec(
+                view_challenge_query(id=db_challenge.id).options(
+                    *CHALLENGE_INFO_OPTIONS
+                )
+            )
+        ).one()
+    except OperationalError as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Database Connection Failed",
+        ) from e
+    except Exception as e:
+        print(e)
+        await db.rollback()
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR) from e
+
+
+async def db_get_topics(db: AsyncSession) -> Sequence[Topic]:
+    """
+    Get all topics.
+
+    Raises:
+        HTTPException: 500 if there was an internal server error.
+    """
+
+    try:
+        return (await db.exec(select(Topic))).all()
+    except OperationalError as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Database Connection Failed",
+        ) from e
+    except Exception as e:
+        print(e)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR) from e
+
+
+async def db_get_topic_by_id(db: AsyncSession, *, topic_id: UUID) -> Topic:
+    """
+    Get a topic by ID.
+
+    Raises:
+        HTTPException: 404 if the topic does not exist.
+        HTTPException: 500 if there was an internal server error.
+    """
+
+    try:
+        return (await db.exec(select(Topic).where(Topic.id == topic_id))).one()
+    except NoResultFound as e:
+        print(e)
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(f"No result found for the topic id: {topic_id}"),
+        ) from e
+    except Exception as e:
+        print(e)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e)
+        ) from e
+
+
+async def db_contributions(
+    db: AsyncSession,
+    *,
+    user_id: UUID,
+    approval_status: Optional[ApprovalStatus] = None,
+    limit: Optional[int] = None,
+    after: Optional[Cursor] = None,
+) -> Sequence[Challenge]:
+    """
+    Get all challenges contributed by a user.
+
+    Raises:
+        HTTPException: 500 if there was an internal server error.
+    """
+
+    try:
+        statement = contributions_query(
+            user_id=user_id, approval_status=approval_status, limit=limit, after=after
+        )
+        return (await db.exec(statement)).all()
+    except OperationalError as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Database Connection Failed",
+        ) from e
+    except Exception as e:
+        print(e)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR) from e
+
+
+async def stream_batches(db: AsyncSession, statement) -> AsyncIterator[Sequence[Any]]:
+    """
+    Rows of `statement` in batches of EXPORT_BATCH_SIZE, read from a server-side
+    cursor: memory stays flat whatever the number of rows, and the first batch
+    is available before the others are read. Selectin loads run per batch.
+    """
+    result = await db.stream(
+        statement.execution_options(yield_per=settings.EXPORT_BATCH_SIZE)
+    )
+    async for batch in result.partitions():
+        yield batch
+
+
+def stream_taken_challenges(
+    db: AsyncSession, *, user_id: UUID, challenge_status: Optional[str] = None
+) -> AsyncIterator[Sequence[Any]]:
+    """
+    Every (Challenge, ChallengeTakers) pair of a user, most recently taken
+    first, in batches. The session must stay open until they are consumed.
+    """
+    return stream_batches(
+        db, taken_challenges_query(user_id=user_id, challenge_status=challenge_status)
+    )
+
+
+async def stream_contributions(
+    db: AsyncSession,
+    *,
+    user_id: UUID,
+    approval_status: Optional[ApprovalStatus] = None,
+) -> AsyncIterator[Sequence[Challenge]]:
+    """
+    Every challenge contributed by a user, newest first, in batches. The
+    session must stay open until they are consumed.
+    """
+    statement = contributions_query(user_id=user_id, approval_status=approval_status)
+    async for batch in stream_batches(db, statement):
+        yield [row[0] for row in batch]
@@ -0,0 +1,122 @@
+"""Async versions of `app.api.crud.users`, for routes using `AsyncSessionDep`."""
+
+from typing import Optional
+from uuid import UUID
+from fastapi import HTTPException, status
+from sqlalchemy.orm import selectinload
+from sqlmodel import select, update, or_
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.api.models import User, LoginHistory
+from sqlalchemy.exc import IntegrityError
+
+
+async def db_get_user(
+    db: AsyncSession,
+    *,
+    user_id: Optional[UUID] = None,
+    username: Optional[str] = None,
+    email: Optional[str] = None
+) -> Optional[User]:
+    """find user with user_id, username or email, with the profile loaded"""
+    try:
+        return (
+            await db.exec(
+                select(User)
+                .where(
+                    or_(
+                        User.id == user_id,
+                        User.username == username,
+                        User.email == email,
+                    )
+                )
+                .options(selectinload(User.profile))
+            )
+        ).one_or_none()
+    except Exception as e:
+        print(e)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR) from e
+
+
+async def db_create_user(db: AsyncSession, *, user: dict) -> User:
+    """Create new user"""
+    try:
+        db_user = User(**user)
+        db.add(db_user)
+        await db.commit()
+        await db.refresh(db_user)
+        return db_user
+    except IntegrityError as e:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="User already exists"
+        ) from e
+    except Exception as e:
+        print(e)
+        await db.rollback()
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR) from e
+
+
+async def db_update_user(
+    db: AsyncSession,
+    *,
+    user_id: UUID,
+    first_name: Optional[str] = None,
+    last_name: Optional[str] = None,
+    username: Optional[str] = None
+) -> User:
+    """Update user information"""
+    try:
+        db_user = await db.get(User, user_id)
+        if not db_user:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
+            )
+        if first_name:
+            db_user.first_name = first_name
+        if last_name:
+            db_user.last_name = last_name
+        if username:
+            db_user.username = username
+        db.add(db_user)
+        await db.commit()
+        await db.refresh(db_user)
+        return db_user
+    except Exception as e:
+        print(e)
+        await db.rollback()
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST) from e
+
+
+async def db_add_last_login(db: AsyncSession, *, user_id: UUID) -> LoginHistory:
+    """Add last login information about the user every time they login"""
+    try:
+        db_login = LoginHistory(user_id=user_id)
+        db.add(db_login)
+        await db.commit()
+        await db.refresh(db_login)
+        return db_login
+    except Exception as e:
+        print(e)
+        await db.rollback()
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR) from e
+
+
+async def db_replace_password_hash(
+    db: AsyncSession, *, user_id: UUID, old_hash: str, new_hash: str
+) -> bool:
+    """
+    Replace the password hash of a user, unless the password changed since
+    `old_hash` was read. Returns whether the hash was replaced.
+    """
+    try:
+        result = await db.exec(
+            update(User)
+            .where(User.id == user_id, User.password == old_hash)
+            .values(password=new_hash)
+        )
+        await db.commit()
+        return result.rowcount == 1
+    except Exception as e:
+        print(e)
+        await db.rollback()
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR) from e
@@ -1,16 +1,126 @@
+from datetime import datetime
 from uuid import UUID
-from typing import Any, List, Optional, Sequence
+from typing import Any, Dict, List, Literal, Optional, Sequence, Tuple
 from fastapi import HTTPException, status
-from sqlmodel import Session, select, col, or_
+from sqlalchemy import and_, func, or_, tuple_, update
+from sqlmodel import Session, select, col
+from sqlalchemy.orm import joinedload, selectinload
 from sqlalchemy.orm.exc import NoResultFound
 from sqlalchemy.exc import IntegrityError, OperationalError
 
 
-from app.api.models.challenges import ChallengeStatus, ApprovalStatus
+from app.api.models.challenges import (
+    ApprovalStatus,
+    ChallengeStatus,
+    invalidate_updated_views,
+)
 
 # from app.api.schemas.challenges import ChallengeOutput
 from app.dependencies import SessionDep
 from app.api.models import Challenge, ChallengeTakers, Topic, ChallengeTopic
+from app.api.crud import search
+from app.api.crud.topics import topic_catalog
+
+# relationships serialized by ChallengeInfo and its subclasses, loaded with a
+# fixed number of queries instead of two lazy loads per challenge
+CHALLENGE_INFO_OPTIONS = (
+    selectinload(Challenge.topic_tags),
+    joinedload(Challenge.contributor),
+)
+
+
+# (created_at, id) of the last row of the previous page, (takers_count, id)
+# when the listing is sorted by popularity
+Cursor = Tuple[Any, UUID]
+
+# newest first, or most taken first
+ChallengeSort = Literal["newest", "popular"]
+
+SORT_KEYS = {"newest": Challenge.created_at, "popular": Challenge.takers_count}
+
+# maintained by the functions taking a challenge and updating a taken one
+COUNTERS = ("takers_count", "submissions_count", "accepted_count")
+
+# whether challenges need any or all of the requested topics
+TopicMatch = Literal["any", "all"]
+
+
+def topics_filter(topic_ids: List[UUID], match: TopicMatch = "any"):
+    """
+    Semi-join keeping the challenges tagged with any (or all) of the given
+    topics. Unlike a join it never returns a challenge twice, nor multiplies the
+    rows sorted and skipped before the page is cut.
+    """
+
+    ids = sorted(set(topic_ids))
+    if match == "all" and len(ids) > 1:
+        # challenges carrying every topic are rare, rather than probing the
+        # tags of each challenge, count the tags of the challenges of these
+        # topics using the (topic_id, challenge_id) index
+        tagged_with_all = (
+            select(ChallengeTopic.challenge_id)
+            .where(col(ChallengeTopic.topic_id).in_(ids))
+            .group_by(ChallengeTopic.challenge_id)
+            .having(func.count() == len(ids))
+        )
+        return col(Challenge.id).in_(tagged_with_all)
+    return (
+        select(ChallengeTopic)
+        .where(ChallengeTopic.challenge_id == Challenge.id)
+        .where(col(ChallengeTopic.topic_id).in_(ids))
+        .exists()
+    )
+
+
+def resolve_topic_filter(
+    db: Session, topics: List[str], match: TopicMatch = "any"
+) -> Optional[List[UUID]]:
+    """
+    Ids of the topics named `topics`, from the topic catalog. None when no
+    challenge can match: none of the topics exist, or one of them is missing
+    and challenges need all of them.
+    """
+    ids = topic_catalog.get(db).ids(db, topics)
+    if not ids or (match == "all" and len(ids) < len(set(topics))):
+        return None
+    return ids
+
+
+def available_challenges_query(
+    *,
+    limit: Optional[int] = None,
+    offset: int = 0,
+    after: Optional[Cursor] = None,
+    matching=None,
+    topic_ids: List[UUID] = [],
+    topic_match: TopicMatch = "any",
+    sort: ChallengeSort = "newest",
+):
+    """
+    Build the statement selecting approved challenges, newest or most taken
+    first.
+
+    With `after`, rows are selected from the cursor instead of skipping
+    `offset` rows, which keeps deep pages as fast as the first one.
+    `matching` is the full-text filter built by `search.match_clause`.
+    """
+    key = SORT_KEYS[sort]
+    statement = (
+        select(Challenge)
+        .where(Challenge.approval == ApprovalStatus.APPROVED)
+        .limit(limit)
+        .order_by(col(key).desc(), col(Challenge.id).desc())
+        .options(*CHALLENGE_INFO_OPTIONS)
+    )
+    if after:
+        statement = statement.where(tuple_(key, Challenge.id) < tuple_(*after))
+    elif offset:
+        statement = statement.offset(offset)
+    if matching is not None:
+        statement = statement.where(matching)
+    if topic_ids:
+        statement = statement.where(topics_filter(topic_ids, topic_match))
+    return statement
 
 
 def db_available_challenges(
@@ -18,8 +128,11 @@ def db_available_challenges(
     *,
     limit: Optional[int] = None,
     offset: int = 0,
+    after: Optional[Cursor] = None,
     title: Optional[str] = None,
     topics: List[str] = [],
+    topic_match: TopicMatch = "any",
+    sort: ChallengeSort = "newest",
 ) -> Sequence[Challenge]:
     """
     Get all available challenges
@@ -31,6 +144,17 @@ def db_available_challenges(
         db (Session): A SQLAlchemy session.
         limit (Optional[int]): The maximum number of challenges to return. Defaults to None.
         offset (Optional[int]): The number of challenges to skip in the result set. Defaults to None.
+        after (Optional[Cursor]): Return the challenges following this (created_at, id)
+            cursor, (takers_count, id) when sorted by popularity, `offset` is ignored
+            when given. Defaults to None.
+        title (Optional[str]): Only return the challenges whose title, topics or
+            description contain every word of `title`. Defaults to None.
+        topics (List[str]): Only return the challenges tagged with these topic names.
+            Defaults to [].
+        topic_match (TopicMatch): Whether challenges need "any" or "all" of `topics`.
+            Defaults to "any".
+        sort (ChallengeSort): "newest" or "popular", most taken first, from the
+            takers_count counter. Defaults to "newest".
 
     Returns:
         Sequence[Challenge]: A list of available challenges.
@@ -40,22 +164,93 @@ def db_available_challenges(
     """
 
     try:
+        topic_ids = []
+        if topics:
+            topic_ids = resolve_topic_filter(db, topics, topic_match)
+            if topic_ids is None:
+                return []
+        statement = available_challenges_query(
+            limit=limit,
+            offset=offset,
+            after=after,
+            matching=search.match_clause(db, title),
+            topic_ids=topic_ids,
+            topic_match=topic_match,
+            sort=sort,
+        )
+        return db.exec(statement).all()
+    except OperationalError as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Database Connection Failed",
+        ) from e
+    except Exception as e:
+        print(e)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e)
+        ) from e
+
+
+def search_challenges_query(*, terms: List[str], limit: int, offset: int = 0):
+    """
+    Build the statement selecting the approved challenges matching every search
+    term, most relevant first. Postgres only, see `search.SearchIndex` otherwise.
+    """
+    return (
+        select(Challenge)
+        .where(Challenge.approval == ApprovalStatus.APPROVED)
+        .where(search.fulltext_match(terms))
+        .order_by(
+            search.fulltext_rank(terms).desc(),
+            col(Challenge.created_at).desc(),
+            col(Challenge.id).desc(),
+        )
+        .limit(limit)
+        .offset(offset)
+        .options(*CHALLENGE_INFO_OPTIONS)
+    )
+
+
+def db_search_challenges(
+    db: Session, *, query: str, limit: int, offset: int = 0
+) -> Sequence[Challenge]:
+    """
+    Search the approved challenges
+
+    Every word of `query` must prefix a word of the title, topic names or
+    description of the challenge. Matches in the title rank above matches in
+    the topics, which rank above matches in the description.
+
+    Args:
+        db (Session): A SQLAlchemy session.
+        query (str): The search box input.
+        limit (int): The maximum number of challenges to return.
+        offset (int): The number of challenges to skip in the result set. Defaults to 0.
+
+    Returns:
+        Sequence[Challenge]: The matching challenges, most relevant first.
+
+    Raises:
+        HTTPException: 500 if there was an internal server error.
+    """
+    terms = search.search_terms(query)
+    if not terms:
+        return []
+
+    try:
+        if search.is_fulltext_supported(db):
+            statement = search_challenges_query(terms=terms, limit=limit, offset=offset)
+            return db.exec(statement).all()
+
+        ranked = search.search_index.search(db, terms, limit=offset + limit)[offset:]
+        ids = [id for id, _ in ranked]
         statement = (
             select(Challenge)
-            .where(Challenge.approval == ApprovalStatus.APPROVED)
-            .limit(limit)
-            .offset(offset)
-            .order_by(col(Challenge.created_at).desc())
+            .where(col(Challenge.id).in_(ids))
+            .options(*CHALLENGE_INFO_OPTIONS)
         )
-        if title:
-            statement = statement.where(col(Challenge.title).ilike(f"%{title}%"))
-        if topics:
-            statement = (
-                statement.join(ChallengeTopic)
-                .join(Topic)
-                .where(col(Topic.name).in_(topics))
-            )
-        return db.exec(statement).all()
+        challenges = {challenge.id: challenge for challenge in db.exec(statement)}
+        return [challenges[id] for id in ids if id in challenges]
     except OperationalError as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -68,8 +263,48 @@ def db_available_challenges(
         ) from e
 
 
+def taken_challenges_query(
+    *,
+    user_id: UUID,
+    challenge_status: Optional[str],
+    limit: Optional[int] = None,
+    after: Optional[Cursor] = None,
+):
+    """
+    Build the statement selecting (Challenge, ChallengeTakers) pairs of a user,
+    most recently taken first.
+    """
+    query = (
+        select(Challenge, ChallengeTakers)
+        .join(ChallengeTakers)
+        .where(ChallengeTakers.user_id == user_id)
+        .order_by(
+            col(ChallengeTakers.created_at).desc(),
+            col(ChallengeTakers.challenge_id).desc(),
+        )
+        .limit(limit)
+        .options(selectinload(Challenge.topic_tags))
+    )
+    if after:
+        query = query.where(
+            tuple_(ChallengeTakers.created_at, ChallengeTakers.challenge_id)
+            < tuple_(*after)
+        )
+
+    # Only apply the status filter if challenge_status is provided
+    if challenge_status:
+        query = query.where(ChallengeTakers.status == challenge_status)
+
+    return query
+
+
 def db_taken_challenges(
-    db: Session, *, user_id: UUID, challenge_status: Optional[str]
+    db: Session,
+    *,
+    user_id: UUID,
+    challenge_status: Optional[str],
+    limit: Optional[int] = None,
+    after: Optional[Cursor] = None,
 ) -> Sequence[Any]:
     """
     Get all challenges that the user has taken with a given status.
@@ -79,6 +314,9 @@ def db_taken_challenges(
         user_id (UUID): The ID of the user who has taken the challenge.
         challenge_status (str): The status of the challenges to retrieve. Can be one of
             'pending' or 'completed'.
+        limit (Optional[int]): The maximum number of challenges to return. Defaults to None.
+        after (Optional[Cursor]): Return the challenges taken before this
+            (taken at, challenge id) cursor. Defaults to None.
     Returns:
         A list of tuples containing the challenge ID, title, slug, difficulty tag,
         and the user's status for the challenge.
@@ -87,16 +325,12 @@ def db_taken_challenges(
         HTTPException: 500 if there was an internal server error.
     """
     try:
-        query = (
-            select(Challenge, ChallengeTakers)
-            .join(ChallengeTakers)
-            .where(ChallengeTakers.user_id == user_id)
+        query = taken_challenges_query(
+            user_id=user_id,
+            challenge_status=challenge_status,
+            limit=limit,
+            after=after,
         )
-
-        # Only apply the status filter if challenge_status is provided
-        if challenge_status:
-            query = query.where(ChallengeTakers.status == challenge_status)
-
         return db.exec(query).all()
     except OperationalError as e:
         raise HTTPException(
@@ -113,6 +347,14 @@ def db_taken_challenges(
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR) from e
 
 
+def challenge_taken_query(*, user_id: UUID, challenge_id: UUID):
+    """Build the statement selecting the ChallengeTakers row of a user."""
+    return select(ChallengeTakers).where(
+        ChallengeTakers.user_id == user_id,
+        ChallengeTakers.challenge_id == challenge_id,
+    )
+
+
 def db_check_challenge_taken(db: SessionDep, *, user_id: UUID, challenge_id: UUID):
     """
     Check if a user has taken a challenge.
@@ -131,10 +373,7 @@ def db_check_challenge_taken(db: SessionDep, *, user_id: UUID, challenge_id: UUI
     """
     try:
         return db.exec(
-            select(ChallengeTakers).where(
-                ChallengeTakers.user_id == user_id,
-                ChallengeTakers.challenge_id == challenge_id,
-            )
+            challenge_taken_query(user_id=user_id, challenge_id=challenge_id)
         ).one_or_none()
     except OperationalError as e:
         raise HTTPException(
@@ -146,12 +385,186 @@ def db_check_challenge_taken(db: SessionDep, *, user_id: UUID, challenge_id: UUI
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+def taken_statuses_query(*, user_id: UUID, challenge_ids: List[UUID]):
+    """
+    Build the statement selecting the take status of a user for each of the
+    challenges, one primary key lookup per challenge.
+    """
+    return select(ChallengeTakers.challenge_id, ChallengeTakers.status).where(
+        ChallengeTakers.user_id == user_id,
+        col(ChallengeTakers.challenge_id).in_(challenge_ids),
+    )
+
+
+def db_taken_statuses(
+    db: Session, *, user_id: UUID, challenge_ids: List[UUID]
+) -> Dict[UUID, ChallengeStatus]:
+    """
+    Get the take status of a user for many challenges at once.
+
+    Args:
+        db (Session): A SQLAlchemy session.
+        user_id (UUID): The ID of the user.
+        challenge_ids (List[UUID]): The IDs of the challenges to check.
+
+    Returns:
+        Dict[UUID, ChallengeStatus]: The status of each challenge taken by the
+            user, the challenges not taken are left out.
+
+    Raises:
+        HTTPException: 500 if there was an internal server error.
+    """
+    if not challenge_ids:
+        return {}
+    try:
+        return dict(
+            db.exec(
+                taken_statuses_query(
+                    user_id=user_id, challenge_ids=sorted(set(challenge_ids))
+                )
+            ).all()
+        )
+    except OperationalError as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Database Connection Failed",
+        ) from e
+    except Exception as e:
+        print(e)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR) from e
+
+
+def counted_as(challenge_status: Optional[ChallengeStatus]) -> Tuple[int, int]:
+    """Whether a taker in this status counts as a submission and an acceptance"""
+    submitted = challenge_status not in (None, ChallengeStatus.PENDING)
+    return int(submitted), int(challenge_status == ChallengeStatus.ACCEPTED)
+
+
+def challenge_stats_update(
+    challenge_id: UUID, *, takers: int = 0, submissions: int = 0, accepted: int = 0
+):
+    """
+    Build the statement shifting the counters of a challenge, run in the
+    transaction changing its takers with `apply_stats_update`. Incrementing in
+    the database keeps concurrent takers from overwriting each other's count.
+    """
+    return (
+        update(Challenge)
+        .where(Challenge.id == challenge_id)
+        .values(
+            takers_count=Challenge.takers_count + takers,
+            submissions_count=Challenge.submissions_count + submissions,
+            accepted_count=Challenge.accepted_count + accepted,
+            # not an edit of the challenge, keep its onupdate from running
+            updated_at=Challenge.updated_at,
+        )
+        # the cached views to drop
+        .returning(Challenge.slug)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def status_change_update(
+    challenge_id: UUID,
+    old: Optional[ChallengeStatus],
+    new: Optional[ChallengeStatus],
+):
+    """The counters update of a taker going from `old` to `new`, None if none"""
+    old_submitted, old_accepted = counted_as(old)
+    submitted, accepted = counted_as(new)
+    if (old_submitted, old_accepted) == (submitted, accepted):
+        return None
+    return challenge_stats_update(
+        challenge_id,
+        submissions=submitted - old_submitted,
+        accepted=accepted - old_accepted,
+    )
+
+
+def reconcile_stats_update():
+    """
+    Build the statement recounting the counters of every challenge from
+    challenge_takers, only writing the rows that drifted.
+    """
+
+    def count(*conditions):
+        return (
+            select(func.count())
+            .select_from(ChallengeTakers)
+            .where(ChallengeTakers.challenge_id == Challenge.id, *conditions)
+            .scalar_subquery()
+        )
+
+    takers = count()
+    submissions = count(ChallengeTakers.status != ChallengeStatus.PENDING)
+    accepted = count(ChallengeTakers.status == ChallengeStatus.ACCEPTED)
+    return (
+        update(Challenge)
+        .where(
+            or_(
+                Challenge.takers_count != takers,
+                Challenge.submissions_count != submissions,
+                Challenge.accepted_count != accepted,
+            )
+        )
+        .values(
+            takers_count=takers,
+            submissions_count=submissions,
+            accepted_count=accepted,
+            updated_at=Challenge.updated_at,
+        )
+        .returning(Challenge.slug)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def apply_stats_update(db: Session, statement) -> int:
+    """
+    Run a counters update, whose changes the cached views of the challenges
+    don't show. Returns the number of challenges updated.
+    """
+    slugs = db.exec(statement).scalars().all()
+    invalidate_updated_views(db, slugs)
+    return len(slugs)
+
+
+def db_reconcile_challenge_stats(db: Session) -> int:
+    """
+    Recount the takers, submissions and acceptances of every challenge, fixing
+    counters that drifted, e.g. after rows were changed outside the api.
+
+    Args:
+        db (Session): A SQLAlchemy session.
+
+    Returns:
+        int: The number of challenges whose counters were fixed.
+
+    Raises:
+        HTTPException: 500 if there was an internal server error.
+    """
+    try:
+        fixed = apply_stats_update(db, reconcile_stats_update())
+        db.commit()
+        return fixed
+    except OperationalError as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Database Connection Failed",
+        ) from e
+    except Exception as e:
+        print(e)
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR) from e
+
+
 def db_take_new_challenge(
     db: Session, *, user_id: UUID, challenge_id: UUID
 ) -> ChallengeTakers:
     try:
         new_challenge = ChallengeTakers(user_id=user_id, challenge_id=challenge_id)
         db.add(new_challenge)
+        apply_stats_update(db, challenge_stats_update(challenge_id, takers=1))
         db.commit()
         db.refresh(new_challenge)
         return new_challenge
@@ -180,11 +593,9 @@ def db_update_taken_challenge(
 ):
     try:
         taken_challenge = db.exec(
-            select(ChallengeTakers).where(
-                ChallengeTakers.user_id == user_id,
-                ChallengeTakers.challenge_id == challenge_id,
-            )
+            challenge_taken_query(user_id=user_id, challenge_id=challenge_id)
         ).one()
+        previous_status = taken_challenge.status
         if github_url:
             taken_challenge.github_url = github_url
         if presentation_video_url:
@@ -195,6 +606,11 @@ def db_update_taken_challenge(
             taken_challenge.feedback = feedback
         if _status:
             taken_challenge.status = _status
+        stats_update = status_change_update(
+            challenge_id, previous_status, taken_challenge.status
+        )
+        if stats_update is not None:
+            apply_stats_update(db, stats_update)
         db.commit()
         db.refresh(taken_challenge)
         return taken_challenge
@@ -221,11 +637,75 @@ def db_update_taken_challenge(
         ) from e
 
 
+def view_challenge_query(*, slug: Optional[str] = None, id: Optional[UUID] = None):
+    """Build the statement selecting a challenge by slug or id."""
+    # a single predicate, an OR across two columns can't use either index
+    if slug is not None:
+        return select(Challenge).where(Challenge.slug == slug)
+    return select(Challenge).where(Challenge.id == id)
+
+
+def user_view_query(*, slug: str, user_id: UUID):
+    """
+    Build the statement selecting a challenge by slug with its contributor and
+    topics, and the ChallengeTakers row of the user, in a single query.
+    """
+    return (
+        select(Challenge, ChallengeTakers)
+        .where(Challenge.slug == slug)
+        .outerjoin(
+            ChallengeTakers,
+            and_(
+                ChallengeTakers.challenge_id == Challenge.id,
+                ChallengeTakers.user_id == user_id,
+            ),
+        )
+        .options(joinedload(Challenge.topic_tags), joinedload(Challenge.contributor))
+    )
+
+
+def db_view_challenge_for_user(
+    db: Session, *, slug: str, user_id: UUID
+) -> Tuple[Optional[Challenge], Optional[ChallengeTakers]]:
+    """
+    Get a challenge by slug, with its topics and contributor loaded, and
+    whether the user has taken it, in one round trip.
+
+    Args:
+        db (Session): SQLAlchemy session.
+        slug (str): Slug of the challenge to retrieve.
+        user_id (UUID): The ID of the user viewing the challenge.
+
+    Returns:
+        Tuple[Optional[Challenge], Optional[ChallengeTakers]]: The challenge,
+            None if it does not exist, and the challenge taker object, None if
+            the user has not taken the challenge.
+
+    Raises:
+        HTTPException: 500 if there was an internal server error.
+    """
+    try:
+        # one row per topic, merged back into one challenge
+        row = (
+            db.exec(user_view_query(slug=slug, user_id=user_id)).unique().one_or_none()
+        )
+        return (row[0], row[1]) if row else (None, None)
+
+    except OperationalError as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Database Connection Failed",
+        ) from e
+    except Exception as e:
+        print(e)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR) from e
+
+
 def db_view_challenge(
     db: Session, *, slug: Optional[str] = None, id: Optional[UUID] = None
 ):
     """
-    Get a challenge by slug.
+    Get a challenge by slug, with its topics and contributor loaded.
 
     Args:
         db (Session): SQLAlchemy session.
@@ -240,7 +720,67 @@ def db_view_challenge(
     """
     try:
         return db.exec(
-            select(Challenge).where(or_(Challenge.slug == slug, Challenge.id == id))
+            view_challenge_query(slug=slug, id=id).options(*CHALLENGE_INFO_OPTIONS)
+        ).one_or_none()
+
+    except OperationalError as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Database Connection Failed",
+        ) from e
+    except Exception as e:
+        print(e)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR) from e
+
+
+def challenge_validators_query(*, slug: str, user_id: Optional[UUID] = None):
+    """
+    Build the statement selecting what a conditional view of the challenge
+    needs: its id, last modification time, counters, who may see it and, for a user,
+    the ChallengeTakers row of the user.
+    """
+    query = select(
+        Challenge.id,
+        func.coalesce(Challenge.updated_at, Challenge.created_at).label("updated_at"),
+        Challenge.approval,
+        Challenge.contributor_id,
+        Challenge.takers_count,
+        Challenge.submissions_count,
+        Challenge.accepted_count,
+    ).where(Challenge.slug == slug)
+    if user_id is not None:
+        query = query.add_columns(ChallengeTakers).outerjoin(
+            ChallengeTakers,
+            and_(
+                ChallengeTakers.challenge_id == Challenge.id,
+                ChallengeTakers.user_id == user_id,
+            ),
+        )
+    return query
+
+
+def db_challenge_validators(db: Session, *, slug: str, user_id: Optional[UUID] = None):
+    """
+    Get the id, last modification time, approval and contributor of a challenge,
+    without loading the challenge itself.
+
+    Args:
+        db (Session): SQLAlchemy session.
+        slug (str): Slug of the challenge.
+        user_id (Optional[UUID]): The ID of the user viewing the challenge.
+                                  Defaults to None.
+
+    Returns:
+        Row: The `id`, `updated_at`, `approval` and `contributor_id` of the
+             challenge, and with a `user_id` its `ChallengeTakers` row of the
+             user, None if the challenge does not exist.
+
+    Raises:
+        HTTPException: 500 if there was an internal server error.
+    """
+    try:
+        return db.exec(
+            challenge_validators_query(slug=slug, user_id=user_id)
         ).one_or_none()
 
     except OperationalError as e:
@@ -340,8 +880,37 @@ def db_get_topic_by_id(db: Session, *, topic_id: UUID):
         ) from e
 
 
+def contributions_query(
+    *,
+    user_id: UUID,
+    approval_status: Optional[ApprovalStatus] = None,
+    limit: Optional[int] = None,
+    after: Optional[Cursor] = None,
+):
+    """Build the statement selecting the challenges contributed by a user, newest first."""
+    statement = (
+        select(Challenge)
+        .where(Challenge.contributor_id == user_id)
+        .order_by(col(Challenge.created_at).desc(), col(Challenge.id).desc())
+        .limit(limit)
+        .options(*CHALLENGE_INFO_OPTIONS)
+    )
+    if after:
+        statement = statement.where(
+            tuple_(Challenge.created_at, Challenge.id) < tuple_(*after)
+        )
+    if approval_status:
+        statement = statement.where(Challenge.approval == approval_status)
+    return statement
+
+
 def db_contributions(
-    db: Session, *, user_id: UUID, approval_status: Optional[ApprovalStatus] = None
+    db: Session,
+    *,
+    user_id: UUID,
+    approval_status: Optional[ApprovalStatus] = None,
+    limit: Optional[int] = None,
+    after: Optional[Cursor] = None,
 ):
     """
     Get all challenges contributed by a user.
@@ -349,6 +918,9 @@ def db_contributions(
     Args:
         db (Session): SQLAlchemy session.
         user_id (UUID): The ID of the user who has contributed the challenges.
+        limit (Optional[int]): The maximum number of challenges to return. Defaults to None.
+        after (Optional[Cursor]): Return the challenges following this (created_at, id)
+            cursor. Defaults to None.
 
     Returns:
         List[Challenge]: A list of challenges contributed by the user.
@@ -358,13 +930,9 @@ def db_contributions(
     """
 
     try:
-        statement = (
-            select(Challenge)
-            .where(Challenge.contributor_id == user_id)
-            .order_by(col(Challenge.created_at).desc())
+        statement = contributions_query(
+            user_id=user_id, approval_status=approval_status, limit=limit, after=after
         )
-        if approval_status:
-            statement.where(Challenge.approval == approval_status)
         return db.exec(statement).all()
     except OperationalError as e:
         raise HTTPException(
@@ -0,0 +1,254 @@
+"""
+Bulk import of challenges, for content imported from external sources.
+
+Items are validated one by one and an invalid item is reported without
+rejecting the others. Topics are resolved from the topic catalog, the few it
+doesn't know (yet) with a single query. Challenges are then inserted in
+batches of multi-row INSERT ... RETURNING statements, their id and slug are
+generated here so no per-row round trip or ORM event is needed. A batch the
+database rejects is retried row by row, each in a savepoint, to find the
+offending items.
+"""
+
+import json
+import uuid
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+
+from fastapi import HTTPException, status
+from pydantic import ValidationError
+from slugify import slugify
+from sqlalchemy import insert, or_
+from sqlalchemy.exc import DBAPIError, OperationalError
+from sqlmodel import Session, col, select
+
+from app.api.crud.topics import topic_catalog
+from app.api.models import Challenge, ChallengeTopic, Topic
+from app.api.models.challenges import ApprovalStatus
+from app.api.schemas.challenges import (
+    ImportChallengeInput,
+    ImportedChallenge,
+    ImportItemError,
+    ImportResult,
+    ImportTopicRef,
+)
+
+# rows per INSERT, the database driver may split them further
+IMPORT_BATCH_SIZE = 500
+
+Item = Tuple[int, ImportChallengeInput]
+
+
+def parse_items(payload: bytes, ndjson: bool) -> Iterable[Tuple[int, object]]:
+    """
+    Decode an import payload into `(index, item)` pairs, a JSON array or one
+    JSON document per line. An undecodable NDJSON line becomes an item raising
+    its error when validated, an undecodable array fails the whole import.
+    """
+    if not ndjson:
+        try:
+            items = json.loads(payload)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid JSON: {e}",
+            ) from e
+        if not isinstance(items, list):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Expected a JSON array of challenges",
+            )
+        yield from enumerate(items)
+        return
+
+    index = 0
+    for line in payload.splitlines():
+        if not line.strip():
+            continue
+        try:
+            yield index, json.loads(line)
+        except ValueError as e:
+            yield index, e
+        index += 1
+
+
+def validation_detail(error: Exception) -> str:
+    if isinstance(error, ValidationError):
+        return "; ".join(
+            f"{'.'.join(map(str, e['loc'])) or 'item'}: {e['msg']}"
+            for e in error.errors()
+        )
+    return f"Invalid JSON: {error}"
+
+
+def validate_items(
+    items: Iterable[Tuple[int, object]], max_items: Optional[int] = None
+) -> Tuple[List[Item], List[ImportItemError]]:
+    valid, errors = [], []
+    for index, raw in items:
+        if max_items is not None and index >= max_items:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"At most {max_items} challenges can be imported at once",
+            )
+        try:
+            if isinstance(raw, Exception):
+                raise raw
+            valid.append((index, ImportChallengeInput.model_validate(raw)))
+        except (ValidationError, ValueError) as e:
+            errors.append(ImportItemError(index=index, detail=validation_detail(e)))
+    return valid, errors
+
+
+def resolve_topics(
+    db: Session, refs: Iterable[ImportTopicRef]
+) -> Tuple[Dict[UUID, UUID], Dict[str, UUID]]:
+    """
+    Known topic ids and names among `refs`, from the catalog and at most one
+    query for the ones the catalog doesn't know.
+    """
+    catalog = topic_catalog.get(db)
+    by_id = {id: id for id in catalog.by_id}
+    by_name = dict(catalog.by_name)
+
+    missing_ids = {ref.id for ref in refs if ref.id and ref.id not in by_id}
+    missing_names = {
+        ref.name for ref in refs if not ref.id and ref.name and ref.name not in by_name
+    }
+    if missing_ids or missing_names:
+        rows = db.exec(
+            select(Topic.id, Topic.name).where(
+                or_(col(Topic.id).in_(missing_ids), col(Topic.name).in_(missing_names))
+            )
+        ).all()
+        for id, name in rows:
+            by_id[id] = id
+            by_name[name] = id
+    return by_id, by_name
+
+
+def topic_ids_of(
+    item: ImportChallengeInput, by_id: Dict[UUID, UUID], by_name: Dict[str, UUID]
+) -> List[UUID]:
+    """Ids of the topics of `item`, raises a ValueError naming an unknown one"""
+    ids = []
+    for ref in item.topic_tags:
+        topic_id = by_id.get(ref.id) if ref.id else by_name.get(ref.name)
+        if topic_id is None:
+            raise ValueError(f"Unknown topic: {ref.id or ref.name}")
+        ids.append(topic_id)
+    return list(dict.fromkeys(ids))
+
+
+def insert_rows(db: Session, rows: List[dict], links: List[dict]) -> List[UUID]:
+    inserted = db.exec(
+        insert(Challenge).returning(Challenge.id, sort_by_parameter_order=True),
+        params=rows,
+    ).all()
+    if links:
+        db.exec(insert(ChallengeTopic), params=links)
+    return [row.id for row in inserted]
+
+
+def db_import_challenges(
+    db: Session,
+    *,
+    contributor_id: UUID,
+    items: Iterable[Tuple[int, object]],
+    max_items: Optional[int] = None,
+) -> ImportResult:
+    """
+    Import challenges contributed by a user, pending approval.
+
+    Args:
+        db (Session): A SQLAlchemy session.
+        contributor_id (UUID): The UUID of the user contributing the challenges.
+        items (Iterable[Tuple[int, object]]): `(index, item)` pairs, see `parse_items`.
+        max_items (Optional[int]): The maximum number of items. Defaults to None.
+
+    Returns:
+        ImportResult: The challenges created and the errors of the other items,
+                      by index in the payload.
+
+    Raises:
+        HTTPException: 413 if there are more than `max_items` items.
+        HTTPException: 500 if there was an internal server error.
+    """
+    valid, errors = validate_items(items, max_items)
+    created = []
+    try:
+        by_id, by_name = resolve_topics(
+            db, [ref for _, item in valid for ref in item.topic_tags]
+        )
+
+        rows = []
+        now = datetime.now()
+        for index, item in valid:
+            try:
+                topic_ids = topic_ids_of(item, by_id, by_name)
+            except ValueError as e:
+                errors.append(ImportItemError(index=index, detail=str(e)))
+                continue
+            id = uuid.uuid4()
+            rows.append(
+                (
+                    index,
+                    {
+                        "id": id,
+                        # as Challenge.generate_slug
+                        "slug": f"{slugify(item.title)}-{id}",
+                        "title": item.title,
+                        "description": item.description,
+                        "difficulty_tag": item.difficulty_tag,
+                        "contributor_id": contributor_id,
+                        "approval": ApprovalStatus.PENDING,
+                        "created_at": now,
+                    },
+                    [{"challenge_id": id, "topic_id": topic} for topic in topic_ids],
+                )
+            )
+
+        for start in range(0, len(rows), IMPORT_BATCH_SIZE):
+            batch = rows[start : start + IMPORT_BATCH_SIZE]
+            try:
+                with db.begin_nested():
+                    insert_rows(
+                        db,
+                        [row for _, row, _ in batch],
+                        [link for _, _, links in batch for link in links],
+                    )
+                succeeded = batch
+            except OperationalError:
+                raise
+            except DBAPIError:
+                # find the rows the database rejects
+                succeeded = []
+                for index, row, links in batch:
+                    try:
+                        with db.begin_nested():
+                            insert_rows(db, [row], links)
+                        succeeded.append((index, row, links))
+                    except OperationalError:
+                        raise
+                    except DBAPIError as e:
+                        errors.append(ImportItemError(index=index, detail=str(e.orig)))
+            created.extend(
+                ImportedChallenge(index=index, id=row["id"], slug=row["slug"])
+                for index, row, _ in succeeded
+            )
+        db.commit()
+
+    except OperationalError as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Database Connection Failed",
+        ) from e
+    except Exception as e:
+        print(e)
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR) from e
+
+    errors.sort(key=lambda error: error.index)
+    return ImportResult(created=created, errors=errors)
@@ -0,0 +1,229 @@
+import heapq
+import re
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from uuid import UUID
+
+from sqlalchemy import event, func, inspect
+from sqlalchemy.orm import Session as SASession
+from sqlmodel import Session, col, select
+
+from app.api.models import Challenge, ChallengeTopic, Topic
+from app.api.models.challenges import ApprovalStatus, search_vector
+
+# words longer than this are typos or garbage, and too many terms make
+# pathological queries
+MAX_TERM_LENGTH = 64
+MAX_TERMS = 8
+
+# weights of the title, topic names and description, the same as the default
+# weights ts_rank gives to the A, B and C labels of the search vector
+FIELD_WEIGHTS = (1.0, 0.4, 0.2)
+
+TERM_PATTERN = re.compile(r"[^\W_]+")
+
+
+def search_terms(query: Optional[str]) -> List[str]:
+    """Lowercased words of a search box input, safe to embed in a tsquery"""
+    if not query:
+        return []
+    terms = TERM_PATTERN.findall(query.lower())
+    return [term[:MAX_TERM_LENGTH] for term in terms[:MAX_TERMS]]
+
+
+def is_fulltext_supported(db: Session) -> bool:
+    return db.get_bind().dialect.name == "postgresql"
+
+
+def prefix_tsquery(terms: List[str]):
+    """
+    tsquery matching challenges containing every term, the terms being prefixes
+    so that a partially typed word already matches (autocomplete).
+    """
+    return func.to_tsquery("english", " & ".join(f"{term}:*" for term in terms))
+
+
+def fulltext_match(terms: List[str]):
+    return search_vector.op("@@")(prefix_tsquery(terms))
+
+
+def fulltext_rank(terms: List[str]):
+    return func.ts_rank_cd(search_vector, prefix_tsquery(terms))
+
+
+class SearchIndex:
+    """
+    In-process inverted index over the approved challenges, used instead of
+    the Postgres full-text search by databases without one (SQLite in tests and
+    local development).
+
+    It is built from the database on first use; challenges committed through an
+    ORM session afterwards are re-read lazily on the next search. Writes that
+    bypass the ORM must call `invalidate`.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._built = False
+        self._stale: Set[UUID] = set()
+        # challenge id -> term -> weight of the best field containing the term
+        self._documents: Dict[UUID, Dict[str, float]] = {}
+        # term -> challenge id -> weight
+        self._postings: Dict[str, Dict[UUID, float]] = defaultdict(dict)
+        # sorted vocabulary, for prefix lookups
+        self._terms: List[str] = []
+        self._terms_dirty = False
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def invalidate(self, ids: Optional[Iterable[UUID]] = None):
+        """Re-read the given challenges, or everything, on the next search"""
+        with self._lock:
+            if ids is None:
+                self._built = False
+            elif self._built:
+                self._stale.update(ids)
+
+    def search(
+        self, db: Session, terms: List[str], limit: Optional[int] = None
+    ) -> List[Tuple[UUID, float]]:
+        """
+        (challenge id, score) of the challenges matching every term, best first,
+        at most `limit` of them.
+        """
+        with self._lock:
+            self._refresh(db)
+            # start from the rarest term, later terms only filter its matches
+            expansions = sorted(
+                (
+                    [self._postings[word] for word in self._expand(term)]
+                    for term in terms
+                ),
+                key=lambda postings: sum(len(posting) for posting in postings),
+            )
+            if not expansions:
+                return []
+
+            scores: Dict[UUID, float] = {}
+            for posting in expansions[0]:
+                for id, weight in posting.items():
+                    if weight > scores.get(id, 0.0):
+                        scores[id] = weight
+            for postings in expansions[1:]:
+                filtered = {}
+                for id, score in scores.items():
+                    weight = max(
+                        (posting.get(id, 0.0) for posting in postings), default=0.0
+                    )
+                    if weight:
+                        filtered[id] = score + weight
+                scores = filtered
+
+        # ties broken on the id so that pages of equally ranked results are stable
+        key = lambda item: (-item[1], item[0])  # noqa: E731
+        if limit is None:
+            return sorted(scores.items(), key=key)
+        return heapq.nsmallest(limit, scores.items(), key=key)
+
+    def _expand(self, prefix: str) -> List[str]:
+        if self._terms_dirty:
+            self._terms = sorted(term for term, ids in self._postings.items() if ids)
+            self._terms_dirty = False
+        words = []
+        for index in range(bisect_left(self._terms, prefix), len(self._terms)):
+            if not self._terms[index].startswith(prefix):
+                break
+            words.append(self._terms[index])
+        return words
+
+    def _refresh(self, db: Session):
+        if self._built and not self._stale:
+            return
+        if not self._built:
+            ids = None
+            self._documents.clear()
+            self._postings.clear()
+        else:
+            ids = list(self._stale)
+            for id in ids:
+                self._remove(id)
+        self._stale.clear()
+
+        challenges = select(Challenge.id, Challenge.title, Challenge.description).where(
+            Challenge.approval == ApprovalStatus.APPROVED
+        )
+        topics = select(ChallengeTopic.challenge_id, Topic.name).join(Topic)
+        if ids is not None:
+            challenges = challenges.where(col(Challenge.id).in_(ids))
+            topics = topics.where(col(ChallengeTopic.challenge_id).in_(ids))
+
+        topic_names = defaultdict(list)
+        for challenge_id, name in db.exec(topics):
+            topic_names[challenge_id].append(name)
+        for id, title, description in db.exec(challenges):
+            self._add(id, (title, " ".join(topic_names[id]), description))
+
+        self._built = True
+        self._terms_dirty = True
+
+    def _add(self, id: UUID, fields: Tuple[str, str, str]):
+        document: Dict[str, float] = {}
+        for text, weight in zip(fields, FIELD_WEIGHTS):
+            for term in TERM_PATTERN.findall((text or "").lower()):
+                if weight > document.get(term, 0.0):
+                    document[term] = weight
+        self._documents[id] = document
+        for term, weight in document.items():
+            self._postings[term][id] = weight
+
+    def _remove(self, id: UUID):
+        for term in self._documents.pop(id, {}):
+            self._postings[term].pop(id, None)
+
+
+search_index = SearchIndex()
+
+
+@event.listens_for(SASession, "after_flush")
+def collect_changed_challenges(session, flush_context):
+    changed = session.info.setdefault("search_index_changed", set())
+    for instance in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(instance, Challenge):
+            changed.add(instance.id)
+        elif isinstance(instance, ChallengeTopic):
+            changed.add(instance.challenge_id)
+        elif (
+            isinstance(instance, Topic) and inspect(instance).attrs.name.history.deleted
+        ):
+            # a renamed topic changes the document of all its challenges
+            changed.add(None)
+
+
+@event.listens_for(SASession, "after_commit")
+def invalidate_changed_challenges(session):
+    changed = session.info.pop("search_index_changed", None)
+    if changed and None in changed:
+        search_index.invalidate()
+    elif changed:
+        search_index.invalidate(changed)
+
+
+@event.listens_for(SASession, "after_rollback")
+def discard_changed_challenges(session):
+    session.info.pop("search_index_changed", None)
+
+
+def match_clause(db: Session, query: Optional[str]):
+    """
+    Filter on the challenges matching a search box input, None when the input
+    has no searchable word.
+    """
+    terms = search_terms(query)
+    if not terms:
+        return None
+    if is_fulltext_supported(db):
+        return fulltext_match(terms)
+    return col(Challenge.id).in_([id for id, _ in search_index.search(db, terms)])
@@ -0,0 +1,184 @@
+"""
+Process-wide catalog of the topics, which are few and rarely change.
+
+Listing the topics, filtering challenges by topic name and validating the tags
+of a new challenge all read a snapshot loaded once, instead of querying the
+`topics` table on every request. A commit touching a topic bumps the catalog
+version, which reloads the snapshot of this process on its next use; other
+processes pick the change up when their snapshot expires, after
+TOPIC_CATALOG_TTL seconds. Until then, topics missing from a snapshot are
+looked up in the table before being rejected.
+"""
+
+import json
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+
+from fastapi import HTTPException, status
+from sqlalchemy import event
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session as SASession, make_transient_to_detached
+from sqlmodel import Session, col, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.api.models import Topic
+from app.core.config import settings
+from app.utils.conditional import make_etag
+
+
+@dataclass(frozen=True)
+class TopicSnapshot:
+    """Immutable view of the topics, swapped as a whole when reloaded"""
+
+    version: int
+    loaded_at: float
+    # (id, name) sorted by name
+    topics: Tuple[Tuple[UUID, str], ...]
+    by_id: Dict[UUID, str] = field(repr=False)
+    by_name: Dict[str, UUID] = field(repr=False)
+    # `/challenge/topics` response, serialized once
+    body: bytes = field(repr=False)
+    etag: str
+
+    @classmethod
+    def build(cls, version: int, rows: Iterable[Tuple[UUID, str]]):
+        topics = tuple(sorted(rows, key=lambda row: (row[1], row[0])))
+        return cls(
+            version=version,
+            loaded_at=time.monotonic(),
+            topics=topics,
+            by_id=dict(topics),
+            by_name={name: id for id, name in topics},
+            body=json.dumps(
+                [{"id": str(id), "name": name} for id, name in topics]
+            ).encode(),
+            etag=make_etag(*((str(id), name) for id, name in topics)),
+        )
+
+    def ids(self, db: Session, names: Iterable[str]) -> List[UUID]:
+        """Ids of the existing topics among `names`, unknown names are skipped"""
+        names = set(names)
+        ids = [self.by_name[name] for name in names if name in self.by_name]
+        missing = names.difference(self.by_name)
+        if missing:
+            # created by another process since the snapshot was loaded
+            ids.extend(
+                db.exec(select(Topic.id).where(col(Topic.name).in_(missing))).all()
+            )
+        return ids
+
+    def resolve(self, db: Session, ids: Iterable[UUID]) -> List[Topic]:
+        """
+        Topics attached to `db` for relationships, without loading them.
+
+        Raises:
+            HTTPException: 404 if a topic does not exist.
+        """
+        names = {}
+        for topic_id in dict.fromkeys(ids):
+            # tags of a request body are not validated, ids may be strings
+            try:
+                topic_id = UUID(str(topic_id))
+            except ValueError:
+                pass
+            names[topic_id] = self.by_id.get(topic_id)
+
+        missing = [
+            id for id, name in names.items() if name is None and isinstance(id, UUID)
+        ]
+        if missing:
+            # created by another process since the snapshot was loaded
+            statement = select(Topic.id, Topic.name).where(col(Topic.id).in_(missing))
+            names.update(db.exec(statement).all())
+
+        topics = []
+        for topic_id, name in names.items():
+            if name is None:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"No result found for the topic id: {topic_id}",
+                )
+            topic = Topic(id=topic_id, name=name)
+            make_transient_to_detached(topic)
+            topics.append(db.merge(topic, load=False))
+        return topics
+
+
+class TopicCatalog:
+    def __init__(self, ttl: int):
+        self.ttl = ttl
+        self.version = 0
+        self.loads = 0
+        self._snapshot: Optional[TopicSnapshot] = None
+        self._lock = threading.Lock()
+
+    def invalidate(self):
+        with self._lock:
+            self.version += 1
+
+    def _fresh(self) -> Optional[TopicSnapshot]:
+        snapshot = self._snapshot
+        if (
+            snapshot is not None
+            and snapshot.version == self.version
+            and time.monotonic() - snapshot.loaded_at < self.ttl
+        ):
+            return snapshot
+        return None
+
+    def load(self, db: Session) -> TopicSnapshot:
+        """Reload the snapshot from the database"""
+        # a commit during the query bumps the version, making this one stale
+        version = self.version
+        try:
+            rows = db.exec(select(Topic.id, Topic.name)).all()
+        except OperationalError as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Database Connection Failed",
+            ) from e
+        snapshot = TopicSnapshot.build(version, rows)
+        with self._lock:
+            self.loads += 1
+            current = self._snapshot
+            if current is None or current.version <= version:
+                self._snapshot = snapshot
+        return snapshot
+
+    def get(self, db: Session) -> TopicSnapshot:
+        return self._fresh() or self.load(db)
+
+    async def get_async(self, db: AsyncSession) -> TopicSnapshot:
+        return self._fresh() or await db.run_sync(self.load)
+
+
+topic_catalog = TopicCatalog(ttl=settings.TOPIC_CATALOG_TTL)
+
+
+@event.listens_for(SASession, "after_flush")
+def collect_changed_topics(session, flush_context):
+    # tagging a challenge only changes the collections of its topics
+    dirty = (
+        instance
+        for instance in session.dirty
+        if session.is_modified(instance, include_collections=False)
+    )
+    if any(
+        isinstance(instance, Topic)
+        for instance in (*session.new, *dirty, *session.deleted)
+    ):
+        session.info["topics_changed"] = True
+
+
+@event.listens_for(SASession, "after_commit")
+def invalidate_topic_catalog(session):
+    if session.info.pop("topics_changed", False):
+        topic_catalog.invalidate()
+
+
+@event.listens_for(SASession, "after_rollback")
+def discard_changed_topics(session):
+    session.info.pop("topics_changed", None)
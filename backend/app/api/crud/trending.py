@@ -0,0 +1,258 @@
+"""
+Process-wide ranking of the trending challenges, served by /challenge/trending.
+
+A take of a challenge adds TRENDING_TAKE_WEIGHT to its score and a submitted
+solution TRENDING_SUBMISSION_WEIGHT, both worth half as much every
+TRENDING_HALF_LIFE seconds. Scores are kept relative to a fixed epoch: a weight
+added at `t` counts `2 ** ((t - epoch) / half_life)`. Decay divides every score
+by the same factor, which keeps their order, so a refresh only adds the
+challenge_takers rows changed since its watermark instead of rescoring every
+take. Each worker refreshes its own ranking at most every
+TRENDING_REFRESH_INTERVAL seconds, requests meanwhile read the snapshot.
+"""
+
+import heapq
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Set, Tuple
+from uuid import UUID
+
+from fastapi import HTTPException, status
+from sqlalchemy.exc import OperationalError
+from sqlmodel import Session, col, select
+
+from app.api.crud.challenges import CHALLENGE_INFO_OPTIONS
+from app.api.models import Challenge, ChallengeTakers
+from app.api.models.challenges import ApprovalStatus, ChallengeStatus
+from app.core.config import settings
+
+# rows older than this many half-lives weigh less than 0.1% of a new one,
+# the first refresh of a worker starts there
+HORIZON_HALF_LIVES = 10
+# rows committed this long after their updated_at was set are still counted:
+# refreshes read again the rows of this window before the watermark
+COMMIT_LAG = timedelta(minutes=1)
+# scores below this, once decayed, are forgotten
+MIN_SCORE = 0.01
+# past this many half-lives from the epoch, scores are rebased on a new one
+# before the factors overflow
+REBASE_HALF_LIVES = 64
+
+
+def naive_utc_now() -> datetime:
+    """Naive UTC time, how challenge_takers timestamps are stored"""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def naive_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def changed_takers_query(*, since: datetime):
+    """
+    Build the statement selecting the takers of approved challenges changed
+    after `since`, served by the challenge_takers updated_at index.
+    """
+    return (
+        select(
+            ChallengeTakers.user_id,
+            ChallengeTakers.challenge_id,
+            ChallengeTakers.status,
+            ChallengeTakers.updated_at,
+        )
+        .join(Challenge)
+        .where(Challenge.approval == ApprovalStatus.APPROVED)
+        .where(col(ChallengeTakers.updated_at) > since)
+    )
+
+
+@dataclass(frozen=True)
+class TrendingSnapshot:
+    """Immutable ranking, swapped as a whole when refreshed"""
+
+    refreshed_at: float
+    # (challenge id, score at the refresh), best first
+    ranking: Tuple[Tuple[UUID, float], ...]
+
+    def page(self, *, limit: int, offset: int = 0) -> Tuple[Tuple[UUID, float], ...]:
+        return self.ranking[offset : offset + limit]
+
+
+class TrendingRanking:
+    def __init__(
+        self,
+        *,
+        half_life: float,
+        interval: float,
+        size: int,
+        take_weight: float,
+        submission_weight: float,
+    ):
+        self.half_life = half_life
+        self.interval = interval
+        self.size = size
+        self.weights = {
+            ChallengeStatus.PENDING: take_weight,
+            ChallengeStatus.SUBMITTED: submission_weight,
+        }
+        self.refreshes = 0
+        self._snapshot: Optional[TrendingSnapshot] = None
+        # held by the refreshing request, which alone touches the state below
+        self._lock = threading.Lock()
+        self._reset_state()
+
+    def _reset_state(self):
+        self.epoch: Optional[datetime] = None
+        self.watermark: Optional[datetime] = None
+        self.scores: Dict[UUID, float] = defaultdict(float)
+        # (user id, challenge id, updated_at) of the rows counted in the last
+        # COMMIT_LAG before the watermark, which the next refresh reads again
+        self._counted: Set[Tuple[UUID, UUID, datetime]] = set()
+
+    def reset(self):
+        """Forget every score, the next use scans the last half-lives again"""
+        with self._lock:
+            self._snapshot = None
+            self._reset_state()
+
+    def _factor(self, at: datetime) -> float:
+        return 2 ** ((at - self.epoch).total_seconds() / self.half_life)
+
+    def _fresh(self) -> Optional[TrendingSnapshot]:
+        snapshot = self._snapshot
+        if (
+            snapshot is not None
+            and time.monotonic() - snapshot.refreshed_at < self.interval
+        ):
+            return snapshot
+        return None
+
+    def _rebase(self, now: datetime):
+        factor = self._factor(now)
+        for challenge_id in self.scores:
+            self.scores[challenge_id] /= factor
+        self.epoch = now
+
+    def refresh(self, db: Session) -> TrendingSnapshot:
+        """Add the takers changed since the watermark and rank the challenges"""
+        now = naive_utc_now()
+        if self.epoch is None:
+            self.epoch = now
+            self.watermark = now - timedelta(
+                seconds=HORIZON_HALF_LIVES * self.half_life
+            )
+        elif (now - self.epoch).total_seconds() > REBASE_HALF_LIVES * self.half_life:
+            self._rebase(now)
+
+        try:
+            rows = db.exec(
+                changed_takers_query(since=self.watermark - COMMIT_LAG)
+            ).all()
+        except OperationalError as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Database Connection Failed",
+            ) from e
+
+        for user_id, challenge_id, taker_status, updated_at in rows:
+            updated_at = naive_utc(updated_at)
+            key = (user_id, challenge_id, updated_at)
+            if key in self._counted:
+                continue
+            self._counted.add(key)
+            # a pending taker was just taken, a submitted one just submitted,
+            # reviews are no activity of the takers
+            weight = self.weights.get(taker_status, 0)
+            if weight:
+                self.scores[challenge_id] += weight * self._factor(updated_at)
+            self.watermark = max(self.watermark, updated_at)
+        self._counted = {
+            key for key in self._counted if key[2] > self.watermark - COMMIT_LAG
+        }
+
+        current = self._factor(now)
+        floor = MIN_SCORE * current
+        for challenge_id in [id for id, score in self.scores.items() if score < floor]:
+            del self.scores[challenge_id]
+        best = heapq.nlargest(
+            self.size, self.scores.items(), key=lambda item: (item[1], item[0])
+        )
+        snapshot = TrendingSnapshot(
+            refreshed_at=time.monotonic(),
+            ranking=tuple((id, score / current) for id, score in best),
+        )
+        self._snapshot = snapshot
+        self.refreshes += 1
+        return snapshot
+
+    def get(self, db: Session) -> TrendingSnapshot:
+        snapshot = self._fresh()
+        if snapshot is not None:
+            return snapshot
+        # one refresh at a time, other requests keep serving the last ranking
+        if not self._lock.acquire(blocking=self._snapshot is None):
+            return self._snapshot
+        try:
+            return self._fresh() or self.refresh(db)
+        finally:
+            self._lock.release()
+
+
+trending_ranking = TrendingRanking(
+    half_life=settings.TRENDING_HALF_LIFE,
+    interval=settings.TRENDING_REFRESH_INTERVAL,
+    size=settings.TRENDING_SIZE,
+    take_weight=settings.TRENDING_TAKE_WEIGHT,
+    submission_weight=settings.TRENDING_SUBMISSION_WEIGHT,
+)
+
+
+def db_trending_challenges(
+    db: Session, *, limit: int, offset: int = 0
+) -> Tuple[List[Tuple[Challenge, float]], bool]:
+    """
+    Get a page of the trending challenges
+
+    Args:
+        db (Session): A SQLAlchemy session.
+        limit (int): The maximum number of challenges to return.
+        offset (int): The number of ranked challenges to skip. Defaults to 0.
+
+    Returns:
+        Tuple[List[Tuple[Challenge, float]], bool]: The (challenge, score)
+            pairs of the page, best first, and whether there is a next page.
+
+    Raises:
+        HTTPException: 500 if there was an internal server error.
+    """
+    snapshot = trending_ranking.get(db)
+    page = snapshot.page(limit=limit, offset=offset)
+    has_next = offset + limit < len(snapshot.ranking)
+    if not page:
+        return [], has_next
+
+    try:
+        statement = (
+            select(Challenge)
+            .where(col(Challenge.id).in_([id for id, _ in page]))
+            # rejected since it was ranked
+            .where(Challenge.approval == ApprovalStatus.APPROVED)
+            .options(*CHALLENGE_INFO_OPTIONS)
+        )
+        challenges = {challenge.id: challenge for challenge in db.exec(statement)}
+    except OperationalError as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Database Connection Failed",
+        ) from e
+    except Exception as e:
+        print(e)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e)
+        ) from e
+    return [(challenges[id], score) for id, score in page if id in challenges], has_next
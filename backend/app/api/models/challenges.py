@@ -2,13 +2,21 @@ from typing import TYPE_CHECKING, List
 import uuid, enum
 from datetime import datetime, timezone
 from sqlmodel import Field, Relationship, SQLModel, Enum as PgEnum, Column, DateTime
-from sqlalchemy import event, UniqueConstraint, String
+from sqlalchemy import event, inspect, Index, UniqueConstraint, String, Text
+from sqlalchemy.orm import Session, object_session
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from slugify import slugify
+from app.core.cache import challenge_cache
 
 if TYPE_CHECKING:
     from .users import User
 
 
+def utc_now() -> datetime:
+    """Current UTC time, a column default calling it is evaluated for each row"""
+    return datetime.now(timezone.utc)
+
+
 # Enum for status of challenge takers
 class ChallengeStatus(enum.Enum):
     ACCEPTED = "accepted"
@@ -38,11 +46,18 @@ class ChallengeTakers(SQLModel, table=True):
     updated_at: datetime = Field(
         sa_column=Column(
             DateTime,
-            default=datetime.now(timezone.utc),
-            onupdate=datetime.now(timezone.utc),
+            default=utc_now,
+            onupdate=utc_now,
         ),
     )
 
+    __table_args__ = (
+        # keyset pagination of the challenges taken by a user
+        Index("ix_challenge_takers_user_id_created_at", "user_id", "created_at", "challenge_id"),
+        # incremental refreshes of the trending ranking
+        Index("ix_challenge_takers_updated_at", "updated_at"),
+    )
+
 
 # Many to Many relationship between challenges and topics
 class ChallengeTopic(SQLModel, table=True):
@@ -55,6 +70,11 @@ class ChallengeTopic(SQLModel, table=True):
         foreign_key="topics.id", primary_key=True, ondelete="RESTRICT"
     )
 
+    __table_args__ = (
+        # challenges of a topic, the primary key only serves topics of a challenge
+        Index("ix_challenge_topics_topic_id_challenge_id", "topic_id", "challenge_id"),
+    )
+
 
 # create enum class for difficulty tags
 class DifficultyTag(enum.Enum):
@@ -111,13 +131,31 @@ class Challenge(SQLModel, table=True):
     updated_at: datetime = Field(
         sa_column=Column(
             DateTime,
-            default=datetime.now(timezone.utc),
-            onupdate=datetime.now(timezone.utc),
+            default=utc_now,
+            onupdate=utc_now,
         ),
     )
 
+    # denormalized from challenge_takers when a challenge is taken or a
+    # solution reviewed, see db_reconcile_challenge_stats
+    takers_count: int = Field(
+        default=0, nullable=False, sa_column_kwargs={"server_default": "0"}
+    )
+    # takers who submitted a solution, whatever its review
+    submissions_count: int = Field(
+        default=0, nullable=False, sa_column_kwargs={"server_default": "0"}
+    )
+    accepted_count: int = Field(
+        default=0, nullable=False, sa_column_kwargs={"server_default": "0"}
+    )
+
     __table_args__ = (
         UniqueConstraint('slug'),
+        # keyset pagination, newest first, of the listing and of contributions
+        Index("ix_challenges_approval_created_at_id", "approval", "created_at", "id"),
+        # keyset pagination of the listing, most taken first
+        Index("ix_challenges_approval_takers_count_id", "approval", "takers_count", "id"),
+        Index("ix_challenges_contributor_id_created_at_id", "contributor_id", "created_at", "id"),
     )
 
     def generate_slug(self):
@@ -128,6 +166,17 @@ class Challenge(SQLModel, table=True):
             self.slug = f"{slugify(self.title)}-{self.id}"
 
 
+# Weighted title (A), topic names (B) and description (C) document searched by
+# full-text queries. It is maintained by database triggers on Postgres (see the
+# challenge_full_text_search migration) and deliberately left unmapped so it is
+# never loaded nor written by the ORM.
+search_vector = Column(
+    "search_vector", Text().with_variant(TSVECTOR(), "postgresql"), nullable=True
+)
+Challenge.__table__.append_column(search_vector)
+Index("ix_challenges_search_vector", search_vector, postgresql_using="gin")
+
+
 # Define the SQLAlchemy event listener for 'before_insert' and 'before_update'
 def before_insert_or_update(mapper, connection, target: Challenge):
     """
@@ -142,6 +191,49 @@ event.listen(Challenge, "before_insert", before_insert_or_update)
 event.listen(Challenge, "before_update", before_insert_or_update)
 
 
+def invalidate_cached_view(mapper, connection, target: Challenge):
+    """
+    Event listener dropping the cached view of an updated or deleted challenge,
+    under its current slug and the one it had before a title change. Dropped
+    again once the transaction commits, a concurrent read may have cached the
+    old row in between.
+    """
+    slugs = {target.slug, *inspect(target).attrs.slug.history.deleted} - {None}
+    for slug in slugs:
+        challenge_cache.delete(slug)
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault("stale_challenge_slugs", set()).update(slugs)
+
+
+def invalidate_updated_views(session, slugs):
+    """
+    Drop the cached views of challenges changed by a bulk UPDATE, which runs
+    no mapper event, e.g. the counters updates. Dropped again on commit, like
+    in `invalidate_cached_view`.
+    """
+    slugs = set(slugs)
+    for slug in slugs:
+        challenge_cache.delete(slug)
+    session.info.setdefault("stale_challenge_slugs", set()).update(slugs)
+
+
+@event.listens_for(Session, "after_commit")
+def invalidate_committed_views(session: Session):
+    for slug in session.info.pop("stale_challenge_slugs", ()):
+        challenge_cache.delete(slug)
+
+
+@event.listens_for(Session, "after_rollback")
+def forget_stale_views(session: Session):
+    session.info.pop("stale_challenge_slugs", None)
+
+
+# covers approval changes, which only happen through updates
+event.listen(Challenge, "before_update", invalidate_cached_view)
+event.listen(Challenge, "after_delete", invalidate_cached_view)
+
+
 class Topic(SQLModel, table=True):
     __tablename__ = "topics"
 
@@ -1,7 +1,9 @@
 from datetime import datetime, timedelta, timezone
 from typing import Annotated, Optional
+from uuid import UUID
 from fastapi import (
     APIRouter,
+    BackgroundTasks,
     Depends,
     Form,
     HTTPException,
@@ -12,22 +14,39 @@ from fastapi import (
 from fastapi.encoders import jsonable_encoder
 from fastapi.responses import JSONResponse
 from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy.ext.asyncio import async_sessionmaker
 
 from app.core.config import settings
 from app.core.security import token as token_utils, password as password_utils
-from app.dependencies import SessionDep
+from app.dependencies import AsyncSessionDep, AsyncSessionFactoryDep, SessionDep
 from app.api.models import User, Profile
 from app.api.models.users import AccountProvider
-from app.api.crud import users as users_crud
+from app.api.crud import users as users_crud, async_users as async_users_crud
 
 from app.utils import google as google_utils
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
 
+async def rehash_password(
+    session_factory: async_sessionmaker, user_id: UUID, old_hash: str, password: str
+):
+    """Replace an outdated password hash once the login response is sent"""
+    try:
+        new_hash = await password_utils.get_password_hash_async(password)
+    except password_utils.PasswordHasherBusy:
+        return  # next login
+    async with session_factory() as db:
+        await async_users_crud.db_replace_password_hash(
+            db, user_id=user_id, old_hash=old_hash, new_hash=new_hash
+        )
+
+
 @router.post("/login/token")
-def login(
-    db: SessionDep,
+async def login(
+    db: AsyncSessionDep,
+    session_factory: AsyncSessionFactoryDep,
+    background_tasks: BackgroundTasks,
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
 ):
     try:
@@ -37,7 +56,9 @@ def login(
         # print(username_email, password)
 
         # Find user in the database
-        user = users_crud.db_get_user(db, username=username_email, email=username_email)
+        user = await async_users_crud.db_get_user(
+            db, username=username_email, email=username_email
+        )
         if user is None:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -61,12 +82,21 @@ def login(
                 detail="User doesn't have a password. Please set a password to make credentials login work.",
             )
 
+        # give the connection back to the pool while the password is checked
+        await db.commit()
+
         # Verify password
-        if not password_utils.verify_password(password, user.password):
+        if not await password_utils.verify_password_async(password, user.password):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST, detail="Incorrect password"
             )
 
+        # the hasher or its cost changed since the password was set
+        if password_utils.password_needs_rehash(user.password):
+            background_tasks.add_task(
+                rehash_password, session_factory, user.id, user.password, password
+            )
+
         # Create User/Token payload
         payload = token_utils.UserDataPayload(id=str(user.id), role=user.role.value)
         token = token_utils.Token(payload=payload)
@@ -120,13 +150,15 @@ def login(
 
         # Add last login detail
         try:
-            users_crud.db_add_last_login(db, user_id=user.id)
+            await async_users_crud.db_add_last_login(db, user_id=user.id)
         except HTTPException:
             pass
 
         # return response
         return response
 
+    except password_utils.PasswordHasherBusy:
+        raise
     except Exception as e:
         print(e)
         raise HTTPException(
@@ -202,8 +234,8 @@ def refresh_access_token(
 
 
 @router.post("/signup")
-def signup(
-    db: SessionDep,
+async def signup(
+    db: AsyncSessionDep,
     first_name: Annotated[str, Form()],
     username: Annotated[str, Form()],
     email: Annotated[str, Form()],
@@ -222,19 +254,19 @@ def signup(
         )
 
     try:
-        user = users_crud.db_get_user(db, username=username)
+        user = await async_users_crud.db_get_user(db, username=username)
         if user:
             raise HTTPException(
                 status_code=status.HTTP_409_CONFLICT, detail="Username already exists"
             )
 
-        user = users_crud.db_get_user(db, email=email)
+        user = await async_users_crud.db_get_user(db, email=email)
         if user:
             raise HTTPException(
                 status_code=status.HTTP_409_CONFLICT, detail="Email already exists"
             )
 
-        user = users_crud.db_create_user(
+        user = await async_users_crud.db_create_user(
             db,
             user={
                 "first_name": first_name,
@@ -243,7 +275,7 @@ def signup(
                 "email": email,
                 "provider": AccountProvider.CREDENTIALS,
                 "is_email_verified": True,  # TODO: Implement email verification
-                "password": password_utils.get_password_hash(password),
+                "password": await password_utils.get_password_hash_async(password),
             },
         )
         return JSONResponse(
@@ -1,29 +1,91 @@
+from datetime import datetime
 from typing import Annotated, List, Optional
 from uuid import UUID
-from fastapi import APIRouter, Body, Form, HTTPException, Query, status
+from fastapi import (
+    APIRouter,
+    Body,
+    Depends,
+    Form,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    status,
+)
 from fastapi.encoders import jsonable_encoder
 from fastapi.responses import JSONResponse
 
 
-from app.dependencies import CurrentUser, CurrentUserOrNone, SessionDep
+from app.dependencies import (
+    AsyncSessionDep,
+    AsyncSessionFactoryDep,
+    CurrentUser,
+    CurrentUserOrNone,
+    SessionDep,
+)
 from app.api.models.challenges import ApprovalStatus, ChallengeStatus
-from app.api.crud import users as users_crud, challenges as challenges_crud
+from app.api.crud import (
+    users as users_crud,
+    async_users as async_users_crud,
+    challenges as challenges_crud,
+    async_challenges as async_challenges_crud,
+    imports as imports_crud,
+    trending as trending_crud,
+)
+from app.api.crud.topics import topic_catalog
 from app.api.schemas import challenges as challenges_schemas
+from app.core.cache import challenge_cache
+from app.core.config import settings
+from app.utils.conditional import (
+    is_not_modified,
+    make_etag,
+    not_modified,
+    set_validators,
+    to_utc,
+)
+from app.utils.export import ExportFormat, export_response
+from app.utils.pagination import decode_cursor, paginate
 
 router = APIRouter(prefix="/challenge", tags=["challenges"])
 
 
+def listing_etag(request: Request, challenges, *extra) -> str:
+    """
+    ETag of a page of challenges, from the query and what was modified last on
+    each challenge, counters included, computed before the page is serialized.
+    """
+    return make_etag(
+        request.url.query,
+        *(
+            (
+                challenge.id,
+                to_utc(challenge.updated_at or challenge.created_at),
+                *(getattr(challenge, name) for name in challenges_crud.COUNTERS),
+            )
+            for challenge in challenges
+        ),
+        *extra,
+    )
+
+
 @router.get(
     "/available",
     response_model=challenges_schemas.PaginatedChallengeInfo
     | List[challenges_schemas.ChallengeInfo],
 )
 def available_challenges(
+    request: Request,
+    response: Response,
     db: SessionDep,
+    current_user: CurrentUserOrNone,
     limit: Optional[int] = None,
     offset: int = 0,
+    cursor: Optional[str] = None,
     title: Optional[str] = None,
     topics: List[str] = Query([]),
+    topic_match: challenges_crud.TopicMatch = "any",
+    sort: challenges_crud.ChallengeSort = "newest",
+    taken_status: bool = False,
 ):
     """
     Get all available challenges
@@ -49,34 +111,200 @@ def available_challenges(
                 id: str,
             },
             "created_at": datetime
-            "updated_at": datetime
+            "updated_at": datetime,
+            "takers_count": int,
+            "submissions_count": int,
+            "accepted_count": int,
+            "acceptance_rate": float | null
         }
     ]
     ```
 
+    `sort` is "newest" (default), or "popular" for the most taken challenges
+    first.
+
     The `limit` and `offset` parameters can be used to paginate the result set.
     If `limit` is provided, at most `limit` challenges will be returned.
     If `offset` is provided, the result set will be offset by `offset` challenges.
+
+    Deep pages are cheaper with `cursor`: pass the `nextCursor` of the previous
+    page instead of an `offset` and the listing continues right after it.
+
+    `topics` keeps the challenges tagged with any of the given topic names, or
+    with all of them when `topic_match` is "all".
+
+    With `taken_status=true` and a `limit`, the page of a logged in user also
+    maps the challenges they took to their status in `takenStatuses`, sparing
+    a `/challenge/taken-challenges-info` request.
+
+    Responses carry an `ETag`, send it back in `If-None-Match` to get a 304
+    when the page didn't change.
     """
-    challenges = challenges_crud.db_available_challenges(
-        db, limit=limit, offset=offset, title=title, topics=topics
-    )
+    after = decode_cursor(cursor)
+    sort_key = challenges_crud.SORT_KEYS[sort].key
+    # a cursor of one sort can't continue the other one
+    if after and isinstance(after[0], datetime) != (sort == "newest"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        )
 
     if limit is None or offset is None:
+        challenges = challenges_crud.db_available_challenges(
+            db,
+            offset=offset,
+            after=after,
+            title=title,
+            topics=topics,
+            topic_match=topic_match,
+            sort=sort,
+        )
+        etag = listing_etag(request, challenges)
+        if is_not_modified(request, etag):
+            return not_modified(etag)
+        set_validators(response, etag)
         return challenges
 
+    # one extra row tells whether there is a next page
+    challenges, next_cursor = paginate(
+        challenges_crud.db_available_challenges(
+            db,
+            limit=limit + 1,
+            offset=offset,
+            after=after,
+            title=title,
+            topics=topics,
+            topic_match=topic_match,
+            sort=sort,
+        ),
+        limit,
+        lambda challenge: (getattr(challenge, sort_key), challenge.id),
+    )
+
+    extra, cache_control = [next_cursor], "no-cache"
+    taken_statuses = None
+    if taken_status and current_user:
+        taken_statuses = challenges_crud.db_taken_statuses(
+            db,
+            user_id=UUID(current_user.id),
+            challenge_ids=[challenge.id for challenge in challenges],
+        )
+        extra.append(sorted((str(id), s.value) for id, s in taken_statuses.items()))
+        # the statuses make the page user specific
+        cache_control = "private, no-cache"
+
+    etag = listing_etag(request, challenges, *extra)
+    if is_not_modified(request, etag):
+        return not_modified(etag, cache_control=cache_control)
+    set_validators(response, etag, cache_control=cache_control)
+
     return {
         "data": challenges,
+        "hasPrev": offset > 0 or after is not None,
+        "hasNext": next_cursor is not None,
+        "nextCursor": next_cursor,
+        "takenStatuses": taken_statuses,
+    }
+
+
+@router.get(
+    "/trending", response_model=challenges_schemas.PaginatedTrendingChallengeInfo
+)
+def trending_challenges(
+    request: Request,
+    response: Response,
+    db: SessionDep,
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+):
+    """
+    Get the trending challenges
+
+    Challenges ranked by their recent takes and submitted solutions, the most
+    recent ones weighing the most. The ranking is refreshed every minute.
+
+    The response has the structure of `/challenge/available` pages, each
+    challenge with its `trending_score`.
+    """
+    ranked, has_next = trending_crud.db_trending_challenges(
+        db, limit=limit, offset=offset
+    )
+
+    # scores decay continuously, the page is only modified when it's reordered
+    etag = listing_etag(request, [challenge for challenge, _ in ranked], has_next)
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+    set_validators(response, etag)
+
+    return {
+        "data": [
+            challenges_schemas.TrendingChallengeInfo.model_validate(
+                {
+                    **{
+                        name: getattr(challenge, name)
+                        for name in challenges_schemas.ChallengeInfo.model_fields
+                    },
+                    "trending_score": round(score, 3),
+                },
+                from_attributes=True,
+            )
+            for challenge, score in ranked
+        ],
         "hasPrev": offset > 0,
-        "hasNext": len(challenges) == limit,
+        "hasNext": has_next,
     }
 
 
+@router.get("/search", response_model=challenges_schemas.PaginatedChallengeInfo)
+def search_challenges(
+    db: SessionDep,
+    q: str = Query(max_length=256),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+):
+    """
+    Search the available challenges
+
+    Every word of `q` must start a word of the title, the topic names or the
+    description of a challenge, so partially typed words already match. The
+    results are ranked by relevance, title matches first.
+    """
+    challenges = challenges_crud.db_search_challenges(
+        db, query=q, limit=limit + 1, offset=offset
+    )
+
+    return {
+        "data": challenges[:limit],
+        "hasPrev": offset > 0,
+        "hasNext": len(challenges) > limit,
+    }
+
+
+def challenge_taken_output(challenge, taker) -> challenges_schemas.ChallengesTaken:
+    """Response object of a (Challenge, ChallengeTakers) pair"""
+    return challenges_schemas.ChallengesTaken(
+        id=challenge.id,
+        title=challenge.title,
+        slug=challenge.slug,
+        difficulty_tag=challenge.difficulty_tag,
+        topic_tags=challenge.topic_tags,
+        status=taker.status,
+        github_url=taker.github_url,
+        presentation_video_url=taker.presentation_video_url,
+        deployed_application_url=taker.deployed_application_url,
+    )
+
+
 @router.get(
-    "/{username}/taken-all", response_model=List[challenges_schemas.ChallengesTaken]
+    "/{username}/taken-all",
+    response_model=challenges_schemas.PaginatedChallengesTaken
+    | List[challenges_schemas.ChallengesTaken],
 )
 def challenges_taken_by_user(
-    db: SessionDep, username: str, challenge_status: Optional[str] = None
+    db: SessionDep,
+    username: str,
+    challenge_status: Optional[str] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
 ):
     """
     Get all challenges that the current user has taken
@@ -104,32 +332,37 @@ def challenges_taken_by_user(
     - "pending": The user has not completed the challenge
     - "accepted": The user has completed the challenge
     - "rejected": The solution has been rejected
+
+    When `limit` is provided the result is paginated newest first and wrapped in
+    `{"data": [...], "hasNext": bool, "nextCursor": str | null}`.
     """
+    after = decode_cursor(cursor)
 
     try:
         user = users_crud.db_get_user(db, username=username)
         challenges = challenges_crud.db_taken_challenges(
-            db, user_id=user.id, challenge_status=challenge_status
+            db,
+            user_id=user.id,
+            challenge_status=challenge_status,
+            limit=limit + 1 if limit is not None else None,
+            after=after,
         )
 
-        # Transform the query result into the expected response format
-        result = []
-        for challenge, taker in challenges:
-            # Create the response object using the data from the database
-            result.append(
-                challenges_schemas.ChallengesTaken(
-                    id=challenge.id,
-                    title=challenge.title,
-                    slug=challenge.slug,
-                    difficulty_tag=challenge.difficulty_tag,
-                    topic_tags=challenge.topic_tags,  # Ensure this is properly retrieved from the Challenge
-                    status=taker.status,
-                    github_url=taker.github_url,
-                    presentation_video_url=taker.presentation_video_url,
-                    deployed_application_url=taker.deployed_application_url,
-                )
+        next_cursor = None
+        if limit is not None:
+            challenges, next_cursor = paginate(
+                challenges, limit, lambda row: (row[1].created_at, row[0].id)
             )
 
+        # Transform the query result into the expected response format
+        result = [challenge_taken_output(*row) for row in challenges]
+
+        if limit is not None:
+            return {
+                "data": result,
+                "hasNext": next_cursor is not None,
+                "nextCursor": next_cursor,
+            }
         return result
     except Exception as e:
         print(e)
@@ -138,6 +371,44 @@ def challenges_taken_by_user(
         )
 
 
+@router.get("/{username}/taken-all/export")
+async def export_challenges_taken_by_user(
+    db: AsyncSessionDep,
+    session_factory: AsyncSessionFactoryDep,
+    username: str,
+    challenge_status: Optional[str] = None,
+    export_format: ExportFormat = Query("ndjson", alias="format"),
+):
+    """
+    Download every challenge taken by a user
+
+    Streams the items of `/{username}/taken-all`, most recently taken first,
+    as NDJSON (one JSON object per line, default) or as CSV with `format=csv`,
+    where topic tags are names separated by ";". Rows are read from the
+    database in batches and sent as they come, whatever their number.
+    """
+    user = await async_users_crud.db_get_user(db, username=username)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
+        )
+
+    async def batches():
+        # the session of the request is closed before the body is sent
+        async with session_factory() as export_db:
+            async for rows in async_challenges_crud.stream_taken_challenges(
+                export_db, user_id=user.id, challenge_status=challenge_status
+            ):
+                yield [challenge_taken_output(*row) for row in rows]
+
+    return export_response(
+        batches(),
+        model=challenges_schemas.ChallengesTaken,
+        export_format=export_format,
+        filename=f"{username}-challenges-taken",
+    )
+
+
 @router.post("/taken-challenge-info")
 def taken_challenge_info(
     db: SessionDep,
@@ -150,21 +421,60 @@ def taken_challenge_info(
         )
 
 
-@router.get("/view/{slug}", response_model=challenges_schemas.ViewChallengeOutput)
-def get_challenge(db: SessionDep, slug: str, current_user: CurrentUserOrNone):
+@router.post("/taken-challenges-info", response_model=challenges_schemas.TakenStatuses)
+def taken_challenges_info(
+    db: SessionDep,
+    current_user: CurrentUserOrNone,
+    challenge_ids: Annotated[List[UUID], Body(embed=True, max_length=100)],
+):
+    """
+    Take status of the current user for many challenges at once
 
-    challenge = challenges_crud.db_view_challenge(db, slug=slug)
-    if not challenge:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Challenge not found"
-        )
+    Takes the ids of the challenges shown, e.g. the cards of a listing page,
+    up to 100 of them:
+    ```json
+    {
+        "challenge_ids": [str]
+    }
+    ```
 
-    accepted = None
-    if current_user:
-        accepted = challenges_crud.db_check_challenge_taken(
-            db, user_id=UUID(current_user.id), challenge_id=challenge.id
+    and maps those taken by the user to their status, in a single query:
+    ```json
+    {
+        "statuses": {
+            challenge_id: "pending" | "submitted" | "accepted" | "rejected"
+        }
+    }
+    ```
+
+    The mapping is empty when the user is not logged in.
+    """
+    if not current_user:
+        return {"statuses": {}}
+    return {
+        "statuses": challenges_crud.db_taken_statuses(
+            db, user_id=UUID(current_user.id), challenge_ids=challenge_ids
         )
+    }
+
+
+def view_validators(challenge_id: UUID, updated_at: datetime, accepted, counters):
+    """
+    ETag and Last-Modified of a challenge view, the take status of the user and
+    the counters, which don't change updated_at, are part of the response so
+    they are part of the validators too.
+    """
+    last_modified = updated_at
+    taken = None
+    if accepted:
+        taken_at = accepted.updated_at or accepted.created_at
+        last_modified = max(to_utc(updated_at), to_utc(taken_at))
+        taken = (accepted.status.value, to_utc(taken_at).timestamp())
+    etag = make_etag(challenge_id, to_utc(updated_at).timestamp(), taken, *counters)
+    return etag, last_modified
+
 
+def check_view_access(challenge, current_user):
     if challenge.approval != ApprovalStatus.APPROVED and str(
         challenge.contributor_id
     ) != str(current_user.id if current_user else ""):
@@ -172,7 +482,93 @@ def get_challenge(db: SessionDep, slug: str, current_user: CurrentUserOrNone):
             status_code=403, detail="You don't have access to see this challenge"
         )
 
-    return {"challenge": challenge, "accepted_challenge": accepted}
+
+def serialize_challenge(challenge) -> dict:
+    """JSON document of a loaded challenge, cached when it is approved"""
+    output = challenges_schemas.ChallengeOutput.model_validate(
+        challenge, from_attributes=True
+    ).model_dump(mode="json")
+    if challenge.approval == ApprovalStatus.APPROVED:
+        challenge_cache.set(challenge.slug, output)
+    return output
+
+
+@router.get("/view/{slug}", response_model=challenges_schemas.ViewChallengeOutput)
+def get_challenge(
+    request: Request, db: SessionDep, slug: str, current_user: CurrentUserOrNone
+):
+    """
+    View a challenge. Approved challenges are served from the challenge cache,
+    whether the user took the challenge is looked up on every request.
+
+    Responses carry an `ETag` and a `Last-Modified` header, send them back in
+    `If-None-Match` / `If-Modified-Since` to get a 304 when nothing changed.
+    """
+    user_id = UUID(current_user.id) if current_user else None
+    accepted = None
+    challenge = challenge_cache.get(slug)
+    if challenge is not None:
+        challenge_id = UUID(challenge["id"])
+        updated_at = datetime.fromisoformat(challenge["updated_at"])
+        counters = [challenge.get(name, 0) for name in challenges_crud.COUNTERS]
+        if user_id:
+            accepted = challenges_crud.db_check_challenge_taken(
+                db, user_id=user_id, challenge_id=challenge_id
+            )
+    else:
+        conditional = (
+            "if-none-match" in request.headers or "if-modified-since" in request.headers
+        )
+        # a revalidation is answered from a few columns when nothing changed,
+        # otherwise the challenge and the take status come in one query
+        if conditional:
+            row = challenges_crud.db_challenge_validators(
+                db, slug=slug, user_id=user_id
+            )
+            if row and user_id:
+                accepted = row.ChallengeTakers
+        elif user_id:
+            row, accepted = challenges_crud.db_view_challenge_for_user(
+                db, slug=slug, user_id=user_id
+            )
+        else:
+            row = challenges_crud.db_view_challenge(db, slug=slug)
+        if not row:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Challenge not found"
+            )
+        check_view_access(row, current_user)
+
+        challenge_id, updated_at = row.id, row.updated_at or row.created_at
+        counters = [getattr(row, name) for name in challenges_crud.COUNTERS]
+        if not conditional:
+            challenge = serialize_challenge(row)
+
+    etag, last_modified = view_validators(challenge_id, updated_at, accepted, counters)
+    # the take status makes the response user specific
+    cache_control = "private, no-cache"
+    # the user comes from the bearer token or the access_token cookie
+    vary = "Authorization, Cookie"
+    if is_not_modified(request, etag, last_modified):
+        response = not_modified(etag, last_modified, cache_control)
+        response.headers["Vary"] = vary
+        return response
+
+    if challenge is None:
+        loaded = challenges_crud.db_view_challenge(db, slug=slug)
+        if not loaded:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Challenge not found"
+            )
+        challenge = serialize_challenge(loaded)
+
+    # the cached challenge is already serialized, skip validating it again
+    response = JSONResponse(
+        {"challenge": challenge, "accepted_challenge": jsonable_encoder(accepted)}
+    )
+    set_validators(response, etag, last_modified, cache_control)
+    response.headers["Vary"] = vary
+    return response
 
 
 @router.post("/create-new", response_model=challenges_schemas.ChallengeOutput)
@@ -221,18 +617,18 @@ def create_new_challenge(
         }
 
     Raises:
+        HTTPException: 404 if a topic does not exist.
         HTTPException: 500 if there was an internal server error.
     """
-    try:
-        # Convert Pydantic topic schemas to ORM models
-        topic_ids = [
-            challenges_crud.db_get_topic_by_id(db, topic_id=topic.id)
-            for topic in new_challenge.topic_tags
-        ]
+    # Resolve the submitted topics from the catalog, unknown ids are a 404
+    topics = topic_catalog.get(db).resolve(
+        db, (topic.id for topic in new_challenge.topic_tags)
+    )
 
+    try:
         # Prepare the challenge data for ORM creation
         challenge_data = new_challenge.model_dump()
-        challenge_data["topic_tags"] = topic_ids  # replace with ORM models, not dicts
+        challenge_data["topic_tags"] = topics  # replace with ORM models, not dicts
 
         # Create challenge using ORM-compatible data
         challenge = challenges_crud.db_create_challenge(
@@ -247,6 +643,66 @@ def create_new_challenge(
         ) from e
 
 
+async def read_body(request: Request) -> bytes:
+    return await request.body()
+
+
+@router.post(
+    "/import",
+    response_model=challenges_schemas.ImportResult,
+    openapi_extra={
+        "requestBody": {
+            "content": {
+                "application/json": {
+                    "schema": {
+                        "type": "array",
+                        "items": challenges_schemas.ImportChallengeInput.model_json_schema(),
+                    }
+                },
+                "application/x-ndjson": {"schema": {"type": "string"}},
+            },
+            "required": True,
+        }
+    },
+)
+def import_challenges(
+    request: Request,
+    db: SessionDep,
+    current_user: CurrentUser,
+    payload: Annotated[bytes, Depends(read_body)],
+):
+    """
+    Create many challenges at once, pending approval like `/create-new`.
+
+    The body is a JSON array of challenges, or one challenge per line with the
+    `application/x-ndjson` content type. Each challenge is shaped like the body
+    of `/create-new`, its topics may be given by `id` or by `name`.
+
+    response:
+        {
+            created: [{ index: int, id: str, slug: str }]
+            errors: [{ index: int, detail: str }]
+        }
+
+    `index` is the position of the challenge in the body, invalid challenges
+    are reported in `errors` and don't prevent the others from being created.
+
+    Raises:
+        HTTPException: 400 if the body is not a JSON array.
+        HTTPException: 413 if there are more than IMPORT_MAX_ITEMS challenges.
+        HTTPException: 500 if there was an internal server error.
+    """
+    ndjson = request.headers.get("content-type", "").startswith(
+        ("application/x-ndjson", "application/jsonl")
+    )
+    return imports_crud.db_import_challenges(
+        db,
+        contributor_id=UUID(current_user.id),
+        items=imports_crud.parse_items(payload, ndjson),
+        max_items=settings.IMPORT_MAX_ITEMS,
+    )
+
+
 @router.post("/take-new")
 def take_challenge(
     db: SessionDep,
@@ -343,18 +799,89 @@ def submit_challenge_solution(
 
 @router.get(
     "/your-contributions",
-    response_model=List[challenges_schemas.ContributedChallengeInfo],
+    response_model=challenges_schemas.PaginatedContributedChallengeInfo
+    | List[challenges_schemas.ContributedChallengeInfo],
 )
 def your_contributions(
     db: SessionDep,
     current_user: CurrentUser,
     approval_status: Optional[ApprovalStatus] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
 ):
-    return challenges_crud.db_contributions(
-        db, user_id=UUID(current_user.id), approval_status=approval_status
+    after = decode_cursor(cursor)
+
+    if limit is None:
+        return challenges_crud.db_contributions(
+            db,
+            user_id=UUID(current_user.id),
+            approval_status=approval_status,
+            after=after,
+        )
+
+    challenges, next_cursor = paginate(
+        challenges_crud.db_contributions(
+            db,
+            user_id=UUID(current_user.id),
+            approval_status=approval_status,
+            limit=limit + 1,
+            after=after,
+        ),
+        limit,
+        lambda challenge: (challenge.created_at, challenge.id),
     )
+    return {
+        "data": challenges,
+        "hasNext": next_cursor is not None,
+        "nextCursor": next_cursor,
+    }
 
 
-@router.get("/topics")
-def get_topics(db: SessionDep):
-    return challenges_crud.db_get_topics(db)
+@router.get("/your-contributions/export")
+async def export_your_contributions(
+    session_factory: AsyncSessionFactoryDep,
+    current_user: CurrentUser,
+    approval_status: Optional[ApprovalStatus] = None,
+    export_format: ExportFormat = Query("ndjson", alias="format"),
+):
+    """
+    Download every challenge contributed by the current user
+
+    Streams the items of `/your-contributions`, newest first, as NDJSON
+    (default) or CSV with `format=csv`, see `/{username}/taken-all/export`.
+    """
+
+    async def batches():
+        async with session_factory() as db:
+            async for challenges in async_challenges_crud.stream_contributions(
+                db, user_id=UUID(current_user.id), approval_status=approval_status
+            ):
+                yield [
+                    challenges_schemas.ContributedChallengeInfo.model_validate(
+                        challenge, from_attributes=True
+                    )
+                    for challenge in challenges
+                ]
+
+    return export_response(
+        batches(),
+        model=challenges_schemas.ContributedChallengeInfo,
+        export_format=export_format,
+        filename="contributions",
+    )
+
+
+@router.get("/topics", response_model=List[challenges_schemas.TopicSchema])
+async def get_topics(request: Request, db: AsyncSessionDep):
+    """
+    Get all topics, sorted by name, from the topic catalog. Responses carry an
+    `ETag`, send it back in `If-None-Match` to get a 304 when no topic was added
+    or renamed.
+    """
+    catalog = await topic_catalog.get_async(db)
+    if is_not_modified(request, catalog.etag):
+        return not_modified(catalog.etag)
+    # serialized when the catalog was loaded
+    response = Response(catalog.body, media_type="application/json")
+    set_validators(response, catalog.etag)
+    return response
@@ -5,9 +5,9 @@ from fastapi import APIRouter, Form, HTTPException, status
 from fastapi.responses import JSONResponse, Response
 
 from app.core.security.password import get_password_hash
-from app.dependencies import CurrentUser, SessionDep
+from app.dependencies import AsyncSessionDep, CurrentUser, SessionDep
 from app.api.schemas import UserOutput
-from app.api.crud import users as users_crud
+from app.api.crud import users as users_crud, async_users as async_users_crud
 
 router = APIRouter(prefix="/user", tags=["users"])
 
@@ -22,16 +22,16 @@ def me(db: SessionDep, current_user: CurrentUser) -> UserOutput:
 
 
 @router.get("/{username}")
-def user_by_username(db: SessionDep, username: str) -> UserOutput:
-    user = users_crud.db_get_user(db, username=username)
+async def user_by_username(db: AsyncSessionDep, username: str) -> UserOutput:
+    user = await async_users_crud.db_get_user(db, username=username)
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
     return user
 
 
 @router.get("/check-username-availability/{username}")
-def check_username_availability(db: SessionDep, username: str):
-    user = users_crud.db_get_user(db, username=username)
+async def check_username_availability(db: AsyncSessionDep, username: str):
+    user = await async_users_crud.db_get_user(db, username=username)
     if user:
         return {"isAvailable": False}
     return {"isAvailable": True}
@@ -1,7 +1,7 @@
 from datetime import datetime
-from typing import List, Literal, Optional
+from typing import Dict, List, Literal, Optional
 from uuid import UUID
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, computed_field
 from app.api.models.challenges import (
     ApprovalStatus,
     ChallengeTakers,
@@ -33,6 +33,37 @@ class NewChallengeInput(BaseModel):
     topic_tags: List[Topic]
 
 
+class ImportTopicRef(BaseModel):
+    # a topic is referenced by id, as in NewChallengeInput, or by name
+    id: Optional[UUID] = None
+    name: Optional[str] = None
+
+
+class ImportChallengeInput(BaseModel):
+    """One challenge of a bulk import, shaped like NewChallengeInput"""
+
+    title: str = Field(min_length=1, max_length=180)
+    description: str
+    difficulty_tag: DifficultyTag
+    topic_tags: List[ImportTopicRef] = []
+
+
+class ImportedChallenge(BaseModel):
+    index: int
+    id: UUID
+    slug: str
+
+
+class ImportItemError(BaseModel):
+    index: int
+    detail: str
+
+
+class ImportResult(BaseModel):
+    created: List[ImportedChallenge]
+    errors: List[ImportItemError]
+
+
 class ChallengeInfo(BaseModel):
     id: UUID
     title: str
@@ -42,18 +73,51 @@ class ChallengeInfo(BaseModel):
     contributor: Contributor
     created_at: datetime
     updated_at: datetime
+    takers_count: int = 0
+    submissions_count: int = 0
+    accepted_count: int = 0
+
+    @computed_field
+    @property
+    def acceptance_rate(self) -> Optional[float]:
+        """Share of the submitted solutions accepted, None before any submission"""
+        if not self.submissions_count:
+            return None
+        return round(self.accepted_count / self.submissions_count, 4)
 
 
 class PaginatedChallengeInfo(BaseModel):
     data: List[ChallengeInfo]
     hasPrev: bool
     hasNext: bool
+    # pass as `cursor` to get the next page, None on the last page
+    nextCursor: Optional[str] = None
+    # with `taken_status`, the status of the challenges of the page taken by
+    # the current user
+    takenStatuses: Optional[Dict[UUID, ChallengeStatus]] = None
+
+
+class TrendingChallengeInfo(ChallengeInfo):
+    # decayed takes and submissions, comparable within a response only
+    trending_score: float
+
+
+class PaginatedTrendingChallengeInfo(BaseModel):
+    data: List[TrendingChallengeInfo]
+    hasPrev: bool
+    hasNext: bool
 
 
 class ContributedChallengeInfo(ChallengeInfo):
     approval: ApprovalStatus
 
 
+class PaginatedContributedChallengeInfo(BaseModel):
+    data: List[ContributedChallengeInfo]
+    hasNext: bool
+    nextCursor: Optional[str] = None
+
+
 class ChallengeOutput(ChallengeInfo):
     description: str
 
@@ -92,6 +156,17 @@ class ChallengesTaken(BaseModel):
         from_attributes = True
 
 
+class PaginatedChallengesTaken(BaseModel):
+    data: List[ChallengesTaken]
+    hasNext: bool
+    nextCursor: Optional[str] = None
+
+
+class TakenStatuses(BaseModel):
+    # challenge id -> status, the challenges not taken are left out
+    statuses: Dict[UUID, ChallengeStatus]
+
+
 class ChallengeSolutionInput(BaseModel):
     challenge_id: UUID
     github_url: str
@@ -0,0 +1,159 @@
+import json
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Optional
+
+from cachetools import TTLCache
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class CacheBackend(ABC):
+    """Shared store behind the in-process cache, values are JSON documents"""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[Any]: ...
+
+    @abstractmethod
+    def set(self, key: str, value: Any, ttl: int): ...
+
+    @abstractmethod
+    def delete(self, key: str): ...
+
+
+class RedisCacheBackend(CacheBackend):
+    def __init__(self, client, prefix: str = "cache:"):
+        self.client = client
+        self.prefix = prefix
+
+    def get(self, key: str) -> Optional[Any]:
+        value = self.client.get(self.prefix + key)
+        return None if value is None else json.loads(value)
+
+    def set(self, key: str, value: Any, ttl: int):
+        self.client.set(self.prefix + key, json.dumps(value), ex=ttl)
+
+    def delete(self, key: str):
+        self.client.delete(self.prefix + key)
+
+
+class ReadThroughCache:
+    """
+    Bounded in-process LRU of JSON documents, optionally backed by a shared
+    backend so that the workers fill the cache for each other.
+
+    Entries live for `ttl` seconds in the shared backend and `local_ttl`
+    seconds in process: an invalidation only reaches the other workers'
+    memory when their copy expires, keep `local_ttl` short when several
+    workers share a backend.
+
+    Backend errors are logged and otherwise ignored: a failed read is a
+    miss, a failed write or delete only reaches the in-process cache, so an
+    unreachable backend never fails a request or a commit.
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl: int,
+        local_ttl: Optional[int] = None,
+        backend: Optional[CacheBackend] = None,
+    ):
+        self.ttl = ttl
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._local = TTLCache(
+            maxsize=max(maxsize, 1),
+            ttl=ttl if local_ttl is None else local_ttl,
+            timer=time.monotonic,
+        )
+        self.enabled = maxsize > 0
+
+    def get(self, key: str) -> Optional[Any]:
+        if not self.enabled:
+            return None
+        with self._lock:
+            value = self._local.get(key)
+        if value is None and self.backend is not None:
+            try:
+                value = self.backend.get(key)
+            except Exception:
+                logger.exception("Cache backend read of %s failed", key)
+            if value is not None:
+                with self._lock:
+                    self._local[key] = value
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, key: str, value: Any):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._local[key] = value
+        if self.backend is not None:
+            try:
+                self.backend.set(key, value, self.ttl)
+            except Exception:
+                logger.exception("Cache backend write of %s failed", key)
+
+    def delete(self, key: str):
+        with self._lock:
+            self._local.pop(key, None)
+        if self.backend is not None:
+            try:
+                self.backend.delete(key)
+            except Exception:
+                logger.exception("Cache backend delete of %s failed", key)
+
+    def clear(self):
+        """Empty the in-process cache, the shared backend is left alone"""
+        with self._lock:
+            self._local.clear()
+            self.hits = self.misses = 0
+
+    def info(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._local),
+                "maxsize": self._local.maxsize if self.enabled else 0,
+            }
+
+
+def cache_backend_from_uri(uri: Optional[str]) -> Optional[CacheBackend]:
+    """
+    Create the shared cache backend described by `uri`, None when no URI is set.
+    """
+    if not uri:
+        return None
+
+    if uri.startswith(("redis://", "rediss://", "unix://")):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError(
+                "Install the `redis` package to use a Redis cache backend"
+            ) from e
+        return RedisCacheBackend(redis.Redis.from_url(uri))
+
+    raise ValueError(f"Unsupported cache backend: {uri}")
+
+
+# serialized ChallengeOutput of approved challenges, keyed by slug
+challenge_cache = ReadThroughCache(
+    maxsize=settings.CHALLENGE_CACHE_SIZE,
+    ttl=settings.CHALLENGE_CACHE_TTL,
+    local_ttl=settings.CHALLENGE_CACHE_LOCAL_TTL,
+    backend=cache_backend_from_uri(settings.CACHE_BACKEND_URI),
+)
@@ -15,6 +15,24 @@ DAY = 24 * HOUR
 class Settings:
 
     DATABASE_URI: Optional[str] = os.getenv("DATABASE_URI")
+    # derived from DATABASE_URI (asyncpg / aiosqlite) when not set
+    ASYNC_DATABASE_URI: Optional[str] = os.getenv("ASYNC_DATABASE_URI")
+
+    # DATABASE POOL
+    # "queue" keeps connections open between requests, "null" opens one per
+    # checkout, for serverless deployments (vercel) where processes are frozen
+    DB_POOL_MODE = os.getenv("DB_POOL_MODE", "queue")
+    # connections kept open per process and engine, by default the
+    # DB_MAX_CONNECTIONS budget of the database split between the workers
+    DB_POOL_SIZE: Optional[int] = (
+        int(os.environ["DB_POOL_SIZE"]) if os.getenv("DB_POOL_SIZE") else None
+    )
+    DB_MAX_CONNECTIONS = int(os.getenv("DB_MAX_CONNECTIONS", 20))
+    WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", 1))  # uvicorn workers
+    DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 5))
+    DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 10))  # in seconds
+    DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 30 * MINUTE))  # in seconds
+    DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
     api_v1_str: Optional[str] = os.getenv("API_V1_STR") or "/api/v1"
 
     # TOKEN SPECIFIC CONFIG
@@ -24,6 +42,92 @@ class Settings:
     REFRESH_TOKEN_NAME = "refresh_token"
     ACCESS_TOKEN_EXPIRE_TIME = 15 * MINUTE
     REFRESH_TOKEN_EXPIRE_TIME = 15 * DAY
+    # verified tokens kept per process until they expire, 0 disables the cache
+    TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", 10_000))
+
+    # PASSWORD HASHING
+    # bcrypt | pbkdf2_sha256 (with few iterations, to make tests cheap), hashes
+    # made with another hasher or cost are replaced on the next login
+    PASSWORD_HASHER = os.getenv("PASSWORD_HASHER", "bcrypt")
+    BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", 12))  # cost, doubles per round
+    PBKDF2_ITERATIONS = int(os.getenv("PBKDF2_ITERATIONS", 600_000))
+    # threads dedicated to hashing, and hashes allowed to wait for one of them
+    # before logins and signups are refused with a 503
+    PASSWORD_HASH_WORKERS = int(
+        os.getenv("PASSWORD_HASH_WORKERS", min(4, os.cpu_count() or 1))
+    )
+    PASSWORD_HASH_QUEUE_SIZE = int(os.getenv("PASSWORD_HASH_QUEUE_SIZE", 32))
+    # niceness of the hashing threads (linux), 0 keeps the process priority
+    PASSWORD_HASH_NICE = int(os.getenv("PASSWORD_HASH_NICE", 10))
+
+    # CACHE
+    # redis://host:port/db shares cached documents between workers
+    CACHE_BACKEND_URI: Optional[str] = os.getenv("CACHE_BACKEND_URI")
+    # challenges served by /challenge/view/{slug} kept per process, 0 disables
+    CHALLENGE_CACHE_SIZE = int(os.getenv("CHALLENGE_CACHE_SIZE", 1024))
+    CHALLENGE_CACHE_TTL = int(os.getenv("CHALLENGE_CACHE_TTL", 5 * MINUTE))
+    # lifetime of the in-process copy, how long other workers may serve a
+    # challenge updated elsewhere when a shared backend is used
+    CHALLENGE_CACHE_LOCAL_TTL = int(
+        os.getenv(
+            "CHALLENGE_CACHE_LOCAL_TTL",
+            10 * SECOND if os.getenv("CACHE_BACKEND_URI") else 5 * MINUTE,
+        )
+    )
+
+    # seconds before a worker reloads topics changed by another worker
+    TOPIC_CATALOG_TTL = int(os.getenv("TOPIC_CATALOG_TTL", 5 * MINUTE))
+
+    # CHALLENGE STATS
+    # seconds between recounts of the challenge counters by one of the workers,
+    # 0 leaves it to `python -m app.reconcile_challenge_stats` (e.g. cron)
+    CHALLENGE_STATS_RECONCILE_INTERVAL = int(
+        os.getenv("CHALLENGE_STATS_RECONCILE_INTERVAL", 6 * HOUR)
+    )
+
+    # TRENDING
+    # seconds after which a take or a submission weighs half as much
+    TRENDING_HALF_LIFE = int(os.getenv("TRENDING_HALF_LIFE", 3 * DAY))
+    TRENDING_TAKE_WEIGHT = float(os.getenv("TRENDING_TAKE_WEIGHT", 1))
+    TRENDING_SUBMISSION_WEIGHT = float(os.getenv("TRENDING_SUBMISSION_WEIGHT", 3))
+    # seconds between refreshes of the ranking of each worker
+    TRENDING_REFRESH_INTERVAL = int(os.getenv("TRENDING_REFRESH_INTERVAL", MINUTE))
+    # challenges ranked, deeper pages of /challenge/trending are empty
+    TRENDING_SIZE = int(os.getenv("TRENDING_SIZE", 500))
+
+    # IMPORTS
+    # challenges accepted by one POST /challenge/import
+    IMPORT_MAX_ITEMS = int(os.getenv("IMPORT_MAX_ITEMS", 2000))
+
+    # EXPORTS
+    # rows fetched per round trip by streamed exports, each batch is sent as
+    # soon as it is read
+    EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", 500))
+
+    # OBSERVABILITY
+    # queries slower than this many milliseconds are logged, empty disables
+    SLOW_QUERY_THRESHOLD: Optional[float] = (
+        float(os.getenv("SLOW_QUERY_THRESHOLD", 200))
+        if os.getenv("SLOW_QUERY_THRESHOLD") != ""
+        else None
+    )
+    # a statement run this many times in one request is logged, 0 disables
+    SQL_REPEATED_QUERY_THRESHOLD = int(os.getenv("SQL_REPEATED_QUERY_THRESHOLD", 10))
+    # Server-Timing header with the database time of each response
+    SERVER_TIMING: bool = os.getenv("SERVER_TIMING", "true").lower() == "true"
+
+    # METRICS
+    # directory shared by the uvicorn workers, emptied before they start, so
+    # that /metrics reports all of them, unset when running a single process
+    METRICS_MULTIPROC_DIR: Optional[str] = os.getenv("METRICS_MULTIPROC_DIR")
+    # seconds between copies of cache and pool stats into the shared metrics
+    METRICS_REFRESH_INTERVAL = float(os.getenv("METRICS_REFRESH_INTERVAL", 1))
+    # bearer token scrapers must send to /metrics, which shows pool, cache and
+    # rate limiter internals; without one /metrics is disabled in production
+    METRICS_TOKEN: Optional[str] = os.getenv("METRICS_TOKEN")
+    METRICS_ENABLED: bool = (
+        bool(METRICS_TOKEN) or os.getenv("PYTHON_MODE", "development") != "production"
+    )
 
     # COOKIE SPECIFIC CONFIG
     COOKIE_SECURE: bool = os.getenv("PYTHON_MODE", "development") == "production"
@@ -42,6 +146,10 @@ class Settings:
     TIME_WINDOW = int(
         os.getenv("TIME_WINDOW", 1 * MINUTE)
     )  # in seconds, by default 60 seconds
+    # fixed-window | sliding-log | sliding-window | token-bucket
+    RATE_LIMIT_ALGORITHM = os.getenv("RATE_LIMIT_ALGORITHM", "fixed-window")
+    # memory:// keeps counters per process, redis://host:port/db shares them
+    RATE_LIMIT_STORAGE_URI = os.getenv("RATE_LIMIT_STORAGE_URI", "memory://")
 
 
 settings = Settings()
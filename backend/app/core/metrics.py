@@ -0,0 +1,482 @@
+"""
+Prometheus metrics, exported in the OpenMetrics text format.
+
+Metric values live in a store shared by the whole registry. In a single
+process it is a dict. With `METRICS_MULTIPROC_DIR` set, e.g. when uvicorn runs
+several workers, each process keeps its values in memory mapped files of that
+directory instead, and the process answering a scrape merges the files of all
+of them: counters and histograms are summed over every process that ever ran,
+gauges over the processes still alive.
+
+Values owned by other components (cache hits, pool usage, ...) are copied
+into metrics by collectors, when scraped or, with several processes, at most
+every `METRICS_REFRESH_INTERVAL` seconds after a request. Counts copied with
+`Counter.set` are added as the increase since the previous copy, so that they
+sum like any counter: the file of a dead worker keeps what it counted, the
+worker replacing it counts from zero, and a component resetting its count
+doesn't make the counter go backwards.
+"""
+
+import glob
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from app.core.config import settings
+
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+# request latencies, in seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+# sample name and labels
+Key = Tuple[str, Labels]
+
+
+class DictValues:
+    """Values of the current process only"""
+
+    multiprocess = False
+
+    def __init__(self):
+        self._values: Dict[Key, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, kind: str, key: Key, amount: float) -> None:
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def set(self, kind: str, key: Key, value: float) -> None:
+        with self._lock:
+            self._values[key] = value
+
+    def items(self) -> Iterable[Tuple[Key, float]]:
+        with self._lock:
+            return list(self._values.items())
+
+
+_HEADER = struct.Struct("Q")  # bytes used, header included
+_LENGTH = struct.Struct("I")
+_VALUE = struct.Struct("d")
+
+
+def read_entries(buffer, used: int) -> Iterable[Tuple[Key, int, float]]:
+    """`(key, value offset, value)` of the entries of a values file"""
+    position = _HEADER.size
+    while position < used:
+        (length,) = _LENGTH.unpack_from(buffer, position)
+        start = position + _LENGTH.size
+        name, labels = json.loads(bytes(buffer[start : start + length]))
+        offset = start + length + (-(_LENGTH.size + length) % 8)
+        (value,) = _VALUE.unpack_from(buffer, offset)
+        yield (name, tuple(map(tuple, labels))), offset, value
+        position = offset + _VALUE.size
+
+
+def read_values(path: str) -> Dict[Key, float]:
+    with open(path, "rb") as file:
+        data = file.read()
+    if len(data) < _HEADER.size:
+        return {}
+    (used,) = _HEADER.unpack_from(data)
+    return {key: value for key, _, value in read_entries(data, used)}
+
+
+class MmapValues:
+    """
+    Values in a memory mapped file, readable by other processes. Entries are
+    only appended: key length, JSON key padded to 8 bytes, then the double.
+    """
+
+    INITIAL_SIZE = 64 * 1024
+
+    def __init__(self, path: str):
+        self._lock = threading.Lock()
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        size = max(os.fstat(self._fd).st_size, self.INITIAL_SIZE)
+        os.ftruncate(self._fd, size)
+        self._mmap = mmap.mmap(self._fd, size)
+        self._used = _HEADER.unpack_from(self._mmap)[0] or _HEADER.size
+        self._offsets = {
+            key: offset for key, offset, _ in read_entries(self._mmap, self._used)
+        }
+
+    def _grow(self, size: int) -> None:
+        self._mmap.close()
+        os.ftruncate(self._fd, size)
+        self._mmap = mmap.mmap(self._fd, size)
+
+    def _offset(self, key: Key) -> int:
+        offset = self._offsets.get(key)
+        if offset is not None:
+            return offset
+
+        encoded = json.dumps(key).encode()
+        padding = -(_LENGTH.size + len(encoded)) % 8
+        size = _LENGTH.size + len(encoded) + padding + _VALUE.size
+        if self._used + size > len(self._mmap):
+            self._grow(max(2 * len(self._mmap), self._used + size))
+        _LENGTH.pack_into(self._mmap, self._used, len(encoded))
+        start = self._used + _LENGTH.size
+        self._mmap[start : start + len(encoded)] = encoded
+        offset = start + len(encoded) + padding
+        _VALUE.pack_into(self._mmap, offset, 0.0)
+        # readers only look at entries before `used`, update it last
+        self._used += size
+        _HEADER.pack_into(self._mmap, 0, self._used)
+        self._offsets[key] = offset
+        return offset
+
+    def inc(self, key: Key, amount: float) -> None:
+        with self._lock:
+            offset = self._offset(key)
+            (value,) = _VALUE.unpack_from(self._mmap, offset)
+            _VALUE.pack_into(self._mmap, offset, value + amount)
+
+    def set(self, key: Key, value: float) -> None:
+        with self._lock:
+            _VALUE.pack_into(self._mmap, self._offset(key), value)
+
+
+def pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class MultiProcessValues:
+    """
+    Values of all the processes using `directory`, one file per process and
+    kind ("counter" or "gauge"). The directory must be emptied before the
+    workers start, as with the prometheus_client multiprocess mode.
+    """
+
+    multiprocess = True
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._pid: Optional[int] = None
+        self._files: Dict[str, MmapValues] = {}
+        self._lock = threading.Lock()
+
+    def _file(self, kind: str) -> MmapValues:
+        pid = os.getpid()
+        if pid != self._pid:
+            # first use, or a worker forked after the import
+            with self._lock:
+                self._pid, self._files = pid, {}
+        values = self._files.get(kind)
+        if values is None:
+            with self._lock:
+                values = self._files.get(kind)
+                if values is None:
+                    path = os.path.join(self.directory, f"{kind}_{pid}.db")
+                    values = self._files[kind] = MmapValues(path)
+        return values
+
+    def inc(self, kind: str, key: Key, amount: float) -> None:
+        self._file(kind).inc(key, amount)
+
+    def set(self, kind: str, key: Key, value: float) -> None:
+        self._file(kind).set(key, value)
+
+    def items(self) -> Iterable[Tuple[Key, float]]:
+        totals: Dict[Key, float] = {}
+        for path in glob.glob(os.path.join(self.directory, "*.db")):
+            kind, _, pid = os.path.basename(path)[: -len(".db")].rpartition("_")
+            if kind == "gauge" and not pid_alive(int(pid)):
+                continue
+            for key, value in read_values(path).items():
+                totals[key] = totals.get(key, 0.0) + value
+        return totals.items()
+
+
+def format_value(value: float) -> str:
+    value = float(value)
+    if value == float("inf"):
+        return "+Inf"
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+def format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    escaped = (
+        (name, value.replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\""))
+        for name, value in labels
+    )
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+
+class Registry:
+    def __init__(self, values=None, refresh_interval: float = 1.0):
+        self.values = values if values is not None else DictValues()
+        self.refresh_interval = refresh_interval
+        self.metrics: List["Metric"] = []
+        self.collectors: List[Callable[[], None]] = []
+        self._refreshed_at = 0.0
+
+    def register(self, metric: "Metric") -> None:
+        self.metrics.append(metric)
+
+    def add_collector(self, collector: Callable[[], None]) -> Callable[[], None]:
+        """Register a function copying values of a component into metrics"""
+        self.collectors.append(collector)
+        return collector
+
+    def refresh(self) -> None:
+        self._refreshed_at = time.monotonic()
+        for collector in self.collectors:
+            collector()
+
+    def maybe_refresh(self) -> None:
+        """
+        Run the collectors if they didn't run for `refresh_interval`, so that
+        with several processes the scraped one sees recent values of others.
+        """
+        if not self.values.multiprocess:
+            return
+        if time.monotonic() - self._refreshed_at >= self.refresh_interval:
+            self.refresh()
+
+    def render(self) -> str:
+        self.refresh()
+        samples: Dict[str, List[Tuple[Labels, float]]] = defaultdict(list)
+        for (name, labels), value in self.values.items():
+            samples[name].append((labels, value))
+
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            for name, labels, value in metric.samples(samples):
+                lines.append(f"{name}{format_labels(labels)} {format_value(value)}")
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+
+class Metric:
+    type = "unknown"
+    # file of the values, in multiprocess mode
+    kind = "counter"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        registry: Optional[Registry] = None,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.registry = registry if registry is not None else REGISTRY
+        self.registry.register(self)
+        self._children: Dict[tuple, object] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values):
+        """The metric for these label values, created once and reused"""
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.get(values)
+                if child is None:
+                    labels = tuple(zip(self.labelnames, map(str, values)))
+                    child = self._children[values] = self._child(labels)
+        return child
+
+    def _child(self, labels: Labels):
+        raise NotImplementedError
+
+    def sample_names(self) -> Tuple[str, ...]:
+        return (self.name,)
+
+    def samples(self, samples: Dict[str, List[Tuple[Labels, float]]]):
+        for name in self.sample_names():
+            for labels, value in sorted(samples.get(name, ())):
+                yield name, labels, value
+
+
+class _Value:
+    def __init__(self, metric: Metric, name: str, labels: Labels):
+        self._values = metric.registry.values
+        self._kind = metric.kind
+        self._key = (name, labels)
+
+    def inc(self, amount: float = 1) -> None:
+        self._values.inc(self._kind, self._key, amount)
+
+    def set(self, value: float) -> None:
+        self._values.set(self._kind, self._key, value)
+
+
+class _CounterValue(_Value):
+    def __init__(self, metric: Metric, name: str, labels: Labels):
+        super().__init__(metric, name, labels)
+        self._lock = threading.Lock()
+        self._mirrored = 0.0
+
+    def set(self, value: float) -> None:
+        """Add the increase of a count kept by another component"""
+        with self._lock:
+            # a count lower than the previous one was reset
+            increase = value - self._mirrored if value >= self._mirrored else value
+            self._mirrored = value
+        # even when 0, so that the sample is rendered
+        self.inc(increase)
+
+
+class Counter(Metric):
+    """
+    Monotonic count. `set` mirrors a count kept by another component, like
+    the hits of a cache.
+    """
+
+    type = "counter"
+
+    def _child(self, labels: Labels) -> _CounterValue:
+        return _CounterValue(self, f"{self.name}_total", labels)
+
+    def sample_names(self) -> Tuple[str, ...]:
+        return (f"{self.name}_total",)
+
+
+class _GaugeValue(_Value):
+    def dec(self, amount: float = 1) -> None:
+        self.inc(-amount)
+
+
+class Gauge(Metric):
+    type = "gauge"
+    kind = "gauge"
+
+    def _child(self, labels: Labels) -> _GaugeValue:
+        return _GaugeValue(self, self.name, labels)
+
+
+class _HistogramValue:
+    def __init__(self, metric: "Histogram", labels: Labels):
+        self._values = metric.registry.values
+        self._upper_bounds = metric.upper_bounds
+        # buckets are counted apart and accumulated when rendered
+        self._buckets = [
+            (f"{metric.name}_bucket", labels + (("le", format_value(bound)),))
+            for bound in metric.upper_bounds
+        ]
+        self._sum = (f"{metric.name}_sum", labels)
+        self._count = (f"{metric.name}_count", labels)
+
+    def observe(self, value: float) -> None:
+        bucket = self._buckets[bisect_left(self._upper_bounds, value)]
+        self._values.inc("counter", bucket, 1)
+        self._values.inc("counter", self._sum, value)
+        self._values.inc("counter", self._count, 1)
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, *args, buckets: Sequence[float] = DEFAULT_BUCKETS, **kwargs):
+        self.upper_bounds = [*sorted(buckets), float("inf")]
+        super().__init__(*args, **kwargs)
+
+    def _child(self, labels: Labels) -> _HistogramValue:
+        return _HistogramValue(self, labels)
+
+    def samples(self, samples: Dict[str, List[Tuple[Labels, float]]]):
+        bucket_name = f"{self.name}_bucket"
+        order = {format_value(bound): i for i, bound in enumerate(self.upper_bounds)}
+        buckets: Dict[Labels, List[float]] = defaultdict(
+            lambda: [0.0] * len(self.upper_bounds)
+        )
+        for labels, value in samples.get(bucket_name, ()):
+            le = labels[-1][1]
+            buckets[labels[:-1]][order[le]] += value
+        sums = dict(samples.get(f"{self.name}_sum", ()))
+        for labels in sorted(buckets):
+            total = 0.0
+            for bound, count in zip(self.upper_bounds, buckets[labels]):
+                total += count
+                yield bucket_name, labels + (("le", format_value(bound)),), total
+            yield f"{self.name}_count", labels, total
+            yield f"{self.name}_sum", labels, sums.get(labels, 0.0)
+
+
+REGISTRY = Registry(
+    values=(
+        MultiProcessValues(settings.METRICS_MULTIPROC_DIR)
+        if settings.METRICS_MULTIPROC_DIR
+        else DictValues()
+    ),
+    refresh_interval=settings.METRICS_REFRESH_INTERVAL,
+)
+
+HTTP_REQUESTS = Counter(
+    "http_requests",
+    "Requests handled, by route template and status code.",
+    ("method", "route", "status"),
+)
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Time to handle a request, by route template.",
+    ("method", "route"),
+)
+HTTP_REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress", "Requests being handled.", ("method",)
+)
+RATE_LIMITED_REQUESTS = Counter(
+    "rate_limited_requests",
+    "Requests rejected by the rate limiter, by policy path.",
+    ("policy",),
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out_connections", "Connections in use.", ("engine",)
+)
+DB_POOL_SIZE = Gauge(
+    "db_pool_size", "Connections kept open by queue pools.", ("engine",)
+)
+DB_POOL_OVERFLOW = Gauge(
+    "db_pool_overflow_connections",
+    "Connections opened past the size of queue pools.",
+    ("engine",),
+)
+DB_POOL_CHECKOUT_WAIT = Counter(
+    "db_pool_checkout_wait_seconds",
+    "Time spent getting a connection from the pool, divided by "
+    "db_pool_checkouts_total it is the average wait.",
+    ("engine",),
+)
+DB_POOL_CHECKOUTS = Counter(
+    "db_pool_checkouts", "Connections checked out of the pool.", ("engine",)
+)
+DB_POOL_TIMEOUTS = Counter(
+    "db_pool_timeouts", "Checkouts given up waiting for a connection.", ("engine",)
+)
+CACHE_HITS = Counter("cache_hits", "Lookups answered by a cache.", ("cache",))
+CACHE_MISSES = Counter("cache_misses", "Lookups missing from a cache.", ("cache",))
+CACHE_ENTRIES = Gauge("cache_entries", "Entries kept by a cache.", ("cache",))
+TOPIC_CATALOG_LOADS = Counter(
+    "topic_catalog_loads", "Topic catalog (re)loads from the database."
+)
+TRENDING_REFRESHES = Counter(
+    "trending_refreshes", "Incremental refreshes of the trending ranking."
+)
+PASSWORD_HASH_PENDING = Gauge(
+    "password_hash_pending", "Password hashes running or waiting for a thread."
+)
+PASSWORD_HASH_REJECTED = Counter(
+    "password_hash_rejected",
+    "Logins and signups refused because the hashing threads were busy.",
+)
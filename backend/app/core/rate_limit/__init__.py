@@ -0,0 +1,8 @@
+from .storage import (
+    RateLimitStorage,
+    MemoryStorage,
+    RedisStorage,
+    storage_from_uri,
+)
+from .algorithms import RateLimitResult, ALGORITHMS
+from .policies import RateLimitPolicy, RateLimitPolicies
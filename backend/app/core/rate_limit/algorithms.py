@@ -0,0 +1,123 @@
+import math
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, NamedTuple
+
+from .storage import RateLimitStorage
+
+
+class RateLimitResult(NamedTuple):
+    allowed: bool
+    limit: int
+    remaining: int
+    reset_after: int  # seconds before the client gets its full quota back
+
+
+class RateLimitAlgorithm(ABC):
+    """Decide whether a hit is allowed given `limit` hits per `window` seconds"""
+
+    @abstractmethod
+    async def hit(
+        self, storage: RateLimitStorage, key: str, limit: int, window: int
+    ) -> RateLimitResult: ...
+
+
+class FixedWindow(RateLimitAlgorithm):
+    """
+    Count hits in a window starting with the first hit of the client.
+
+    The cheapest algorithm, but a client can burst up to twice the limit
+    around the boundary between two windows.
+    """
+
+    async def hit(self, storage, key, limit, window):
+        count, reset_in = await storage.incr(key, window)
+        return RateLimitResult(
+            allowed=count <= limit,
+            limit=limit,
+            remaining=max(limit - count, 0),
+            reset_after=math.ceil(reset_in),
+        )
+
+
+class SlidingLog(RateLimitAlgorithm):
+    """
+    Keep the timestamp of every hit of the last window.
+
+    Exact, but memory grows with the limit, keep it for small limits such
+    as login attempts.
+    """
+
+    async def hit(self, storage, key, limit, window):
+        allowed, count, reset_in = await storage.acquire_entry(key, limit, window)
+        return RateLimitResult(
+            allowed=allowed,
+            limit=limit,
+            remaining=max(limit - count, 0),
+            reset_after=math.ceil(reset_in),
+        )
+
+
+class SlidingWindowCounter(RateLimitAlgorithm):
+    """
+    Weight the count of the previous window by how much of it still
+    overlaps the sliding window and add the count of the current one.
+
+    Two counters per client, no boundary bursts, at the cost of assuming
+    the hits of the previous window were evenly spread.
+    """
+
+    async def hit(self, storage, key, limit, window):
+        now = time.time()
+        current_window = int(now // window)
+        current_key = f"{key}:{current_window}"
+        elapsed = now - current_window * window
+        weight = (window - elapsed) / window
+
+        # the counter must outlive its own window to weigh in the next one
+        allowed, previous, current = await storage.acquire_window(
+            current_key, f"{key}:{current_window - 1}", limit, weight, 2 * window
+        )
+        estimate = previous * weight + current
+
+        # hits of a window stop counting once the following window is over
+        if current:
+            reset_after = 2 * window - elapsed
+        elif previous:
+            reset_after = window - elapsed
+        else:
+            reset_after = 0
+
+        return RateLimitResult(
+            allowed=allowed,
+            limit=limit,
+            remaining=max(math.floor(limit - estimate), 0),
+            reset_after=math.ceil(reset_after),
+        )
+
+
+class TokenBucket(RateLimitAlgorithm):
+    """
+    Refill a bucket of `limit` tokens at `limit / window` tokens per second.
+
+    Allows short bursts up to `limit` while keeping the average rate, which
+    suits cheap read endpoints browsed in bursts.
+    """
+
+    async def hit(self, storage, key, limit, window):
+        refill_rate = limit / window
+        allowed, tokens = await storage.acquire_token(key, limit, refill_rate)
+        return RateLimitResult(
+            allowed=allowed,
+            limit=limit,
+            remaining=math.floor(tokens),
+            reset_after=math.ceil((limit - tokens) / refill_rate),
+        )
+
+
+ALGORITHMS: Dict[str, RateLimitAlgorithm] = {
+    "fixed-window": FixedWindow(),
+    "sliding-log": SlidingLog(),
+    "sliding-window": SlidingWindowCounter(),
+    "token-bucket": TokenBucket(),
+}
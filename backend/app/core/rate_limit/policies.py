@@ -0,0 +1,68 @@
+from dataclasses import dataclass
+from typing import Dict, Literal, Optional, Tuple
+
+from .algorithms import ALGORITHMS, RateLimitAlgorithm
+
+
+@dataclass(frozen=True)
+class RateLimitPolicy:
+    """
+    Allow `limit` requests per `window` seconds.
+
+    Args:
+        limit (int): Number of requests allowed per window.
+        window (int): Length of the window in seconds.
+        algorithm (str): One of "fixed-window", "sliding-log",
+            "sliding-window" or "token-bucket". Defaults to "fixed-window".
+        key (str): "ip" counts requests per client ip, "user" counts them per
+            authenticated user and falls back to the ip for anonymous
+            requests. Defaults to "ip".
+    """
+
+    limit: int
+    window: int
+    algorithm: Literal[
+        "fixed-window", "sliding-log", "sliding-window", "token-bucket"
+    ] = "fixed-window"
+    key: Literal["ip", "user"] = "ip"
+
+    def __post_init__(self):
+        if self.limit < 1 or self.window < 1:
+            raise ValueError("Rate limit and window must be positive")
+        if self.algorithm not in ALGORITHMS:
+            raise ValueError(f"Unknown rate limit algorithm: {self.algorithm}")
+        if self.key not in ("ip", "user"):
+            raise ValueError(f"Unknown rate limit key: {self.key}")
+
+    @property
+    def strategy(self) -> RateLimitAlgorithm:
+        return ALGORITHMS[self.algorithm]
+
+
+class RateLimitPolicies:
+    """
+    Table of policies keyed by route path prefix.
+
+    A request uses the policy with the longest prefix matching its path,
+    e.g. "/challenge" covers a whole router and "/auth/login/token" a single
+    route. Requests matching no prefix use the default policy, counted per
+    path.
+    """
+
+    def __init__(
+        self,
+        default: RateLimitPolicy,
+        policies: Optional[Dict[str, RateLimitPolicy]] = None,
+    ):
+        self.default = default
+        # longest prefixes first so the most specific policy wins
+        self.policies = sorted(
+            (policies or {}).items(), key=lambda item: len(item[0]), reverse=True
+        )
+
+    def match(self, path: str) -> Tuple[str, RateLimitPolicy]:
+        """Return the scope the requests are counted in and its policy"""
+        for prefix, policy in self.policies:
+            if path == prefix or path.startswith(prefix.rstrip("/") + "/"):
+                return prefix, policy
+        return path, self.default
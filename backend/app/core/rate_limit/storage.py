@@ -0,0 +1,351 @@
+import math
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Any, Deque, Dict, List, Tuple
+
+
+class RateLimitStorage(ABC):
+    """
+    Backend used by the rate limiter to keep its counters.
+
+    Every entry lives for a number of seconds after which it disappears and
+    the next hit starts a fresh one.
+    """
+
+    @abstractmethod
+    async def incr(self, key: str, expiry: int, amount: int = 1) -> Tuple[int, float]:
+        """
+        Increment the counter stored at `key`.
+
+        Args:
+            key (str): Counter key.
+            expiry (int): Lifetime in seconds of the counter if it is created
+                by this call.
+            amount (int): Value to add to the counter. Defaults to 1.
+
+        Returns:
+            Tuple[int, float]: The counter value after the increment and the
+            number of seconds left before it expires.
+        """
+
+    @abstractmethod
+    async def get(self, key: str) -> int:
+        """Return the value of the counter stored at `key`, 0 if missing."""
+
+    @abstractmethod
+    async def acquire_entry(
+        self, key: str, limit: int, expiry: int
+    ) -> Tuple[bool, int, float]:
+        """
+        Record a hit in the moving window log stored at `key`.
+
+        The hit is only recorded if less than `limit` hits were recorded in
+        the last `expiry` seconds.
+
+        Returns:
+            Tuple[bool, int, float]: Whether the hit was recorded, the number
+            of hits in the window and the number of seconds before the oldest
+            hit leaves the window.
+        """
+
+    @abstractmethod
+    async def acquire_window(
+        self, key: str, previous_key: str, limit: int, weight: float, expiry: int
+    ) -> Tuple[bool, int, int]:
+        """
+        Increment the counter stored at `key` if the hits it holds plus
+        `weight` times those of the counter stored at `previous_key` are less
+        than `limit`.
+
+        Args:
+            key (str): Counter of the current window.
+            previous_key (str): Counter of the previous window.
+            limit (int): Hits allowed in the weighted window.
+            weight (float): Share of the previous window still overlapping
+                the sliding one.
+            expiry (int): Lifetime in seconds of the counter if it is created
+                by this call.
+
+        Returns:
+            Tuple[bool, int, int]: Whether the hit was counted and the values
+            of the previous and current counters.
+        """
+
+    @abstractmethod
+    async def acquire_token(
+        self, key: str, capacity: int, refill_rate: float, cost: int = 1
+    ) -> Tuple[bool, float]:
+        """
+        Take `cost` tokens from the bucket stored at `key`.
+
+        A missing bucket starts full with `capacity` tokens and gains
+        `refill_rate` tokens per second.
+
+        Returns:
+            Tuple[bool, float]: Whether the tokens were taken and the number
+            of tokens left in the bucket.
+        """
+
+    @abstractmethod
+    async def reset(self) -> None:
+        """Drop every counter kept by the storage."""
+
+
+class MemoryStorage(RateLimitStorage):
+    """
+    In-process storage backed by a timing wheel.
+
+    Counters are kept in a dict and their keys are registered in a one second
+    wide bucket of the wheel matching their expiry time. Every call sweeps the
+    buckets that became due since the previous call, so each key is visited at
+    most once when it expires and the cost of expiring stays amortized O(1)
+    instead of scanning every active client on every request.
+
+    Counters are local to the process, use `RedisStorage` to share limits
+    between several workers.
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, List[Any]] = {}  # key -> [value, expires_at]
+        self._buckets: Dict[int, List[str]] = {}  # tick -> keys expiring then
+        self._next_tick: int = int(time.time())
+
+    def _expire(self, now: float) -> None:
+        tick = int(now)
+        if tick < self._next_tick:
+            return
+
+        # after a long idle period it is cheaper to visit the few buckets left
+        # than to walk every tick elapsed since the last sweep
+        if tick - self._next_tick > len(self._buckets):
+            due = [t for t in self._buckets if t <= tick]
+        else:
+            due = range(self._next_tick, tick + 1)
+
+        for t in due:
+            for key in self._buckets.pop(t, ()):
+                entry = self._entries.get(key)
+                # the key may have been re-created or extended since
+                if entry is not None and entry[1] <= now:
+                    del self._entries[key]
+
+        self._next_tick = tick + 1
+
+    def _get_entry(self, key: str, now: float):
+        self._expire(now)
+        entry = self._entries.get(key)
+        if entry is not None and entry[1] <= now:
+            del self._entries[key]
+            return None
+        return entry
+
+    def _set_expiry(self, key: str, entry: List[Any], expires_at: float) -> None:
+        entry[1] = expires_at
+        self._buckets.setdefault(math.ceil(expires_at), []).append(key)
+
+    async def incr(self, key: str, expiry: int, amount: int = 1) -> Tuple[int, float]:
+        now = time.time()
+        entry = self._get_entry(key, now)
+        if entry is None:
+            entry = self._entries[key] = [0, None]
+            self._set_expiry(key, entry, now + expiry)
+
+        entry[0] += amount
+        return int(entry[0]), entry[1] - now
+
+    async def get(self, key: str) -> int:
+        entry = self._get_entry(key, time.time())
+        return int(entry[0]) if entry is not None else 0
+
+    async def acquire_entry(
+        self, key: str, limit: int, expiry: int
+    ) -> Tuple[bool, int, float]:
+        now = time.time()
+        entry = self._get_entry(key, now)
+        if entry is None:
+            entry = self._entries[key] = [deque(), None]
+
+        hits: Deque[float] = entry[0]
+        while hits and hits[0] <= now - expiry:
+            hits.popleft()
+
+        allowed = len(hits) < limit
+        if allowed:
+            hits.append(now)
+            self._set_expiry(key, entry, now + expiry)
+
+        return allowed, len(hits), hits[0] + expiry - now
+
+    async def acquire_window(
+        self, key: str, previous_key: str, limit: int, weight: float, expiry: int
+    ) -> Tuple[bool, int, int]:
+        previous = await self.get(previous_key)
+        current = await self.get(key)
+        allowed = previous * weight + current < limit
+        if allowed:
+            current, _ = await self.incr(key, expiry)
+        return allowed, previous, current
+
+    async def acquire_token(
+        self, key: str, capacity: int, refill_rate: float, cost: int = 1
+    ) -> Tuple[bool, float]:
+        now = time.time()
+        entry = self._get_entry(key, now)
+        if entry is None:
+            entry = self._entries[key] = [[float(capacity), now], None]
+
+        bucket = entry[0]
+        tokens = min(capacity, bucket[0] + (now - bucket[1]) * refill_rate)
+        allowed = tokens >= cost
+        if allowed:
+            tokens -= cost
+        bucket[0], bucket[1] = tokens, now
+
+        # once refilled the bucket is the same as a missing one
+        self._set_expiry(key, entry, now + (capacity - tokens) / refill_rate)
+        return allowed, tokens
+
+    async def reset(self) -> None:
+        self._entries.clear()
+        self._buckets.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class RedisStorage(RateLimitStorage):
+    """
+    Storage shared by every worker through a Redis server.
+
+    Works with any client exposing the `redis.asyncio.Redis` interface.
+    Moving window logs, sliding window counters and token buckets are updated
+    by Lua scripts so that each hit is a single atomic round trip.
+    """
+
+    ACQUIRE_ENTRY_SCRIPT = """
+    local key = KEYS[1]
+    local limit, expiry, now = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+    redis.call('ZREMRANGEBYSCORE', key, '-inf', now - expiry)
+    local count = redis.call('ZCARD', key)
+    local allowed = 0
+    if count < limit then
+        redis.call('ZADD', key, now, ARGV[4])
+        redis.call('PEXPIRE', key, math.ceil(expiry * 1000))
+        count = count + 1
+        allowed = 1
+    end
+    local oldest = redis.call('ZRANGE', key, 0, 0, 'WITHSCORES')
+    local reset = expiry
+    if oldest[2] then reset = tonumber(oldest[2]) + expiry - now end
+    return {allowed, count, tostring(reset)}
+    """
+
+    ACQUIRE_WINDOW_SCRIPT = """
+    local limit, weight, expiry = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+    local previous = tonumber(redis.call('GET', KEYS[2])) or 0
+    local current = tonumber(redis.call('GET', KEYS[1])) or 0
+    local allowed = 0
+    if previous * weight + current < limit then
+        current = redis.call('INCR', KEYS[1])
+        if current == 1 then redis.call('EXPIRE', KEYS[1], expiry) end
+        allowed = 1
+    end
+    return {allowed, previous, current}
+    """
+
+    ACQUIRE_TOKEN_SCRIPT = """
+    local key = KEYS[1]
+    local capacity, rate = tonumber(ARGV[1]), tonumber(ARGV[2])
+    local now, cost = tonumber(ARGV[3]), tonumber(ARGV[4])
+    local bucket = redis.call('HMGET', key, 'tokens', 'ts')
+    local tokens = tonumber(bucket[1]) or capacity
+    local ts = tonumber(bucket[2]) or now
+    tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+    local allowed = 0
+    if tokens >= cost then
+        tokens = tokens - cost
+        allowed = 1
+    end
+    redis.call('HSET', key, 'tokens', tostring(tokens), 'ts', tostring(now))
+    redis.call('PEXPIRE', key, math.max(1, math.ceil((capacity - tokens) / rate * 1000)))
+    return {allowed, tostring(tokens)}
+    """
+
+    def __init__(self, client: Any, prefix: str = "ratelimit:"):
+        self.client = client
+        self.prefix = prefix
+        self._acquire_entry = client.register_script(self.ACQUIRE_ENTRY_SCRIPT)
+        self._acquire_window = client.register_script(self.ACQUIRE_WINDOW_SCRIPT)
+        self._acquire_token = client.register_script(self.ACQUIRE_TOKEN_SCRIPT)
+
+    async def incr(self, key: str, expiry: int, amount: int = 1) -> Tuple[int, float]:
+        key = self.prefix + key
+        async with self.client.pipeline(transaction=True) as pipe:
+            # SET NX only sets the expiry when the counter is created
+            pipe.set(key, 0, ex=expiry, nx=True)
+            pipe.incrby(key, amount)
+            pipe.pttl(key)
+            _, count, ttl = await pipe.execute()
+
+        return int(count), max(ttl, 0) / 1000
+
+    async def get(self, key: str) -> int:
+        value = await self.client.get(self.prefix + key)
+        return int(value) if value is not None else 0
+
+    async def acquire_entry(
+        self, key: str, limit: int, expiry: int
+    ) -> Tuple[bool, int, float]:
+        now = time.time()
+        allowed, count, reset_in = await self._acquire_entry(
+            keys=[self.prefix + key],
+            args=[limit, expiry, now, f"{now}:{uuid.uuid4().hex}"],
+        )
+        return bool(allowed), int(count), float(reset_in)
+
+    async def acquire_window(
+        self, key: str, previous_key: str, limit: int, weight: float, expiry: int
+    ) -> Tuple[bool, int, int]:
+        allowed, previous, current = await self._acquire_window(
+            keys=[self.prefix + key, self.prefix + previous_key],
+            args=[limit, weight, expiry],
+        )
+        return bool(allowed), int(previous), int(current)
+
+    async def acquire_token(
+        self, key: str, capacity: int, refill_rate: float, cost: int = 1
+    ) -> Tuple[bool, float]:
+        allowed, tokens = await self._acquire_token(
+            keys=[self.prefix + key],
+            args=[capacity, refill_rate, time.time(), cost],
+        )
+        return bool(allowed), float(tokens)
+
+    async def reset(self) -> None:
+        keys = [key async for key in self.client.scan_iter(match=f"{self.prefix}*")]
+        if keys:
+            await self.client.delete(*keys)
+
+
+def storage_from_uri(uri: str) -> RateLimitStorage:
+    """
+    Create the storage described by `uri`.
+
+    `memory://` returns an in-process storage, `redis://` and `rediss://`
+    URIs return a storage connected to that Redis server.
+    """
+    if uri.startswith("memory://"):
+        return MemoryStorage()
+
+    if uri.startswith(("redis://", "rediss://", "unix://")):
+        try:
+            from redis import asyncio as redis_asyncio
+        except ImportError as e:
+            raise RuntimeError(
+                "Install the `redis` package to use a Redis rate limit storage"
+            ) from e
+        return RedisStorage(redis_asyncio.from_url(uri))
+
+    raise ValueError(f"Unsupported rate limit storage: {uri}")
@@ -1,13 +1,218 @@
+import asyncio
+import base64
+import hashlib
+import hmac
+import os
+import secrets
+import sys
+import threading
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
 import bcrypt
 
+from app.core.config import settings
+
+
+class PasswordHasherBusy(Exception):
+    """Too many password hashes are pending, the request should be retried later"""
+
+
+class PasswordHasher(ABC):
+    """One hashing algorithm at a given cost"""
+
+    algorithm: str
+
+    @abstractmethod
+    def hash(self, password: str) -> str: ...
+
+    @abstractmethod
+    def verify(self, password: str, hashed_password: str) -> bool: ...
+
+    @abstractmethod
+    def identifies(self, hashed_password: str) -> bool:
+        """Whether `hashed_password` was produced by this algorithm"""
+
+    @abstractmethod
+    def needs_rehash(self, hashed_password: str) -> bool:
+        """Whether `hashed_password` was produced with another cost"""
+
+
+class BcryptHasher(PasswordHasher):
+    algorithm = "bcrypt"
+
+    def __init__(self, rounds: int):
+        self.rounds = rounds
+
+    def hash(self, password: str) -> str:
+        salt = bcrypt.gensalt(rounds=self.rounds)
+        return bcrypt.hashpw(password.encode("utf-8"), salt).decode("utf-8")
+
+    def verify(self, password: str, hashed_password: str) -> bool:
+        return bcrypt.checkpw(password.encode("utf-8"), hashed_password.encode("utf-8"))
+
+    def identifies(self, hashed_password: str) -> bool:
+        return hashed_password.startswith(("$2a$", "$2b$", "$2y$"))
+
+    def needs_rehash(self, hashed_password: str) -> bool:
+        # $2b$<rounds>$<salt and hash>
+        return int(hashed_password.split("$")[2]) != self.rounds
+
+
+class Pbkdf2Hasher(PasswordHasher):
+    """
+    PBKDF2-SHA256, mostly for tests where a low iteration count makes hashing
+    nearly free: bcrypt can't go below 4 rounds.
+    """
+
+    algorithm = "pbkdf2_sha256"
+
+    def __init__(self, iterations: int):
+        self.iterations = iterations
+
+    def _derive(self, password: str, salt: str, iterations: int) -> str:
+        key = hashlib.pbkdf2_hmac(
+            "sha256", password.encode("utf-8"), salt.encode("ascii"), iterations
+        )
+        return base64.b64encode(key).decode("ascii")
+
+    def hash(self, password: str) -> str:
+        salt = secrets.token_urlsafe(16)
+        key = self._derive(password, salt, self.iterations)
+        return f"{self.algorithm}${self.iterations}${salt}${key}"
+
+    def verify(self, password: str, hashed_password: str) -> bool:
+        _, iterations, salt, key = hashed_password.split("$")
+        return hmac.compare_digest(self._derive(password, salt, int(iterations)), key)
+
+    def identifies(self, hashed_password: str) -> bool:
+        return hashed_password.startswith(f"{self.algorithm}$")
+
+    def needs_rehash(self, hashed_password: str) -> bool:
+        return int(hashed_password.split("$")[1]) != self.iterations
+
+
+class PasswordHashers:
+    """
+    Hashes new passwords with the preferred hasher and verifies existing hashes
+    with whichever hasher produced them, so that changing the algorithm or its
+    cost only upgrades hashes as users log in.
+    """
+
+    def __init__(self, preferred: PasswordHasher, *others: PasswordHasher):
+        self.preferred = preferred
+        self.hashers = (preferred, *others)
+
+    def identify(self, hashed_password: str) -> Optional[PasswordHasher]:
+        for hasher in self.hashers:
+            if hasher.identifies(hashed_password):
+                return hasher
+        return None
+
+    def hash(self, password: str) -> str:
+        return self.preferred.hash(password)
+
+    def verify(self, password: str, hashed_password: str) -> bool:
+        hasher = self.identify(hashed_password)
+        return hasher is not None and hasher.verify(password, hashed_password)
+
+    def needs_rehash(self, hashed_password: str) -> bool:
+        hasher = self.identify(hashed_password)
+        return hasher is not self.preferred or hasher.needs_rehash(hashed_password)
+
+
+HASHERS = {
+    BcryptHasher.algorithm: BcryptHasher(settings.BCRYPT_ROUNDS),
+    Pbkdf2Hasher.algorithm: Pbkdf2Hasher(settings.PBKDF2_ITERATIONS),
+}
+
+if settings.PASSWORD_HASHER not in HASHERS:
+    raise ValueError(
+        f"Unknown PASSWORD_HASHER {settings.PASSWORD_HASHER!r}, "
+        f"expected one of {', '.join(HASHERS)}"
+    )
+
+password_hashers = PasswordHashers(
+    HASHERS[settings.PASSWORD_HASHER],
+    *(hasher for name, hasher in HASHERS.items() if name != settings.PASSWORD_HASHER),
+)
+
 
 def get_password_hash(password: str) -> str:
-    # Generate a salt and hash the password
-    salt = bcrypt.gensalt()
-    hashed_password = bcrypt.hashpw(password.encode("utf-8"), salt)
-    return hashed_password.decode("utf-8")  # Convert from bytes to string
+    return password_hashers.hash(password)
 
 
 def verify_password(raw_password: str, hashed_password: str) -> bool:
     # Verify the raw password against the hashed password
-    return bcrypt.checkpw(raw_password.encode("utf-8"), hashed_password.encode("utf-8"))
+    return password_hashers.verify(raw_password, hashed_password)
+
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    """Whether a verified hash should be replaced, the hasher or its cost changed"""
+    return password_hashers.needs_rehash(hashed_password)
+
+
+def lower_thread_priority():
+    """
+    Lower the scheduling priority of the calling thread, so that when cores are
+    scarce hashing yields the CPU to request handling. Linux only: elsewhere
+    the priority is per process and is left alone.
+    """
+    if sys.platform == "linux" and settings.PASSWORD_HASH_NICE:
+        try:
+            os.setpriority(
+                os.PRIO_PROCESS, threading.get_native_id(), settings.PASSWORD_HASH_NICE
+            )
+        except OSError:
+            pass
+
+
+class PasswordPool:
+    """
+    Dedicated threads for password hashing, bcrypt releases the GIL while it
+    works. Keeping it off the shared threadpool means a login burst can't stall
+    the other sync endpoints, and bounding the pending work lets us refuse
+    logins right away instead of queueing them for seconds.
+    """
+
+    def __init__(self, workers: int, queue_size: int):
+        self.workers = workers
+        self.max_pending = workers + queue_size
+        self.pending = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers,
+            thread_name_prefix="password",
+            initializer=lower_thread_priority,
+        )
+
+    def _done(self, future):
+        with self._lock:
+            self.pending -= 1
+
+    async def run(self, fn, *args):
+        """Run `fn(*args)` on the pool, raise PasswordHasherBusy when it is full"""
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                raise PasswordHasherBusy()
+            self.pending += 1
+        # released when the hash is done, even if the request was cancelled
+        future = self._executor.submit(fn, *args)
+        future.add_done_callback(self._done)
+        return await asyncio.wrap_future(future)
+
+
+password_pool = PasswordPool(
+    workers=settings.PASSWORD_HASH_WORKERS, queue_size=settings.PASSWORD_HASH_QUEUE_SIZE
+)
+
+
+async def get_password_hash_async(password: str) -> str:
+    return await password_pool.run(get_password_hash, password)
+
+
+async def verify_password_async(raw_password: str, hashed_password: str) -> bool:
+    return await password_pool.run(verify_password, raw_password, hashed_password)
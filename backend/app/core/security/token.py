@@ -1,7 +1,11 @@
+import hashlib
+import threading
+import time
 from datetime import datetime, timedelta, timezone
 from typing import Literal, Optional
 
 import jwt
+from cachetools import TLRUCache
 from fastapi import HTTPException, status
 from pydantic import BaseModel, ValidationError
 from app.core.config import settings
@@ -73,12 +77,78 @@ class Token(BaseModel):
         return self.create_token(token_type="refresh", expires_delta=expires_delta)
 
 
+class TokenCache:
+    """
+    Bounded LRU cache of verified token payloads, so that a token sent with
+    every request is only verified once. Entries are keyed by the SHA-256
+    digest of the token, rather than the credential itself, and expire with
+    the token.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._cache = TLRUCache(
+            maxsize=max(maxsize, 1),
+            ttu=lambda key, payload, now: payload.exp.timestamp(),
+            timer=time.time,
+        )
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> Optional[TokenPayload]:
+        if not self.maxsize:
+            return None
+        with self._lock:
+            payload = self._cache.get(self._key(token))
+            if payload is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return payload
+
+    def set(self, token: str, payload: TokenPayload):
+        if not self.maxsize:
+            return
+        with self._lock:
+            self._cache[self._key(token)] = payload
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+            self.hits = self.misses = 0
+
+    def info(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._cache),
+                "maxsize": self.maxsize,
+            }
+
+
+token_cache = TokenCache(maxsize=settings.TOKEN_CACHE_SIZE)
+
+
 def decode_token(token: str) -> TokenPayload:
     """
     Decode the JWT token and return the payload.
+
+    Access tokens verified before are served from `token_cache` until they
+    expire. Refresh tokens are only sent to get a new access token and live
+    for days, they are verified every time instead of filling the cache.
     """
+    payload = token_cache.get(token)
+    if payload is not None:
+        return payload
+
     try:
-        return TokenPayload(**jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM]))
+        payload = TokenPayload(**jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM]))
     except (jwt.DecodeError, ValidationError) as e:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -90,6 +160,10 @@ def decode_token(token: str) -> TokenPayload:
             detail="Token has Expired",
         ) from e
 
+    if payload.token_type == "access":
+        token_cache.set(token, payload)
+    return payload
+
 
 def get_user_payload(token_payload: TokenPayload) -> UserDataPayload:
     """Returns the user payload/info from token payload"""
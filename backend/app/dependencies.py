@@ -4,14 +4,15 @@ import jwt
 from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlmodel import Session
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlmodel.ext.asyncio.session import AsyncSession
 from pydantic import ValidationError
 
 
 from app.core.security.token import UserDataPayload, decode_token, get_user_payload
-from app.core.database import get_db
+from app.core.database import get_db, get_async_db, get_async_session_factory
 from app.core.config import settings
 
-
 # auto_error=false will not throw error if token not found in authorization header
 # which gives us the flexibility to authenticate using cookies
 oauth2_scheme = OAuth2PasswordBearer(
@@ -20,9 +21,15 @@ oauth2_scheme = OAuth2PasswordBearer(
 
 
 SessionDep = Annotated[Session, Depends(get_db)]
+AsyncSessionDep = Annotated[AsyncSession, Depends(get_async_db)]
+AsyncSessionFactoryDep = Annotated[
+    async_sessionmaker, Depends(get_async_session_factory)
+]
 
 
-def get_current_user(
+# async: decoding is CPU only and mostly served by the token cache, cheaper
+# inline than a round trip through the threadpool
+async def get_current_user(
     request: Request,
     token: Annotated[Optional[str], Depends(oauth2_scheme)],
 ) -> UserDataPayload:
@@ -51,7 +58,7 @@ def get_current_user(
         raise
 
 
-def get_current_user_or_none(
+async def get_current_user_or_none(
     request: Request, token: Annotated[Optional[str], Depends(oauth2_scheme)]
 ) -> Optional[UserDataPayload]:
     try:
@@ -0,0 +1,57 @@
+"""
+Import challenges from a JSON array or NDJSON file, as POST /challenge/import.
+
+    python -m app.import_challenges challenges.ndjson --contributor username
+
+The challenges are contributed by `--contributor` and pending approval. Files
+ending in .ndjson or .jsonl are read one challenge per line, use `-` to read
+stdin.
+"""
+
+import argparse
+import sys
+
+from fastapi import HTTPException
+from sqlmodel import Session
+
+from app.api.crud import imports as imports_crud, users as users_crud
+from app.core.database import engine
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("path", help="JSON or NDJSON file, - for stdin")
+    parser.add_argument("--contributor", required=True, help="username")
+    parser.add_argument("--ndjson", action="store_true", help="one challenge per line")
+    args = parser.parse_args()
+
+    if args.path == "-":
+        payload = sys.stdin.buffer.read()
+    else:
+        with open(args.path, "rb") as file:
+            payload = file.read()
+    ndjson = args.ndjson or args.path.endswith((".ndjson", ".jsonl"))
+
+    with Session(engine) as db:
+        contributor = users_crud.db_get_user(db, username=args.contributor)
+        if contributor is None:
+            sys.exit(f"No user named {args.contributor}")
+
+        try:
+            result = imports_crud.db_import_challenges(
+                db,
+                contributor_id=contributor.id,
+                items=imports_crud.parse_items(payload, ndjson),
+            )
+        except HTTPException as e:
+            sys.exit(e.detail)
+
+    for error in result.errors:
+        print(f"challenge {error.index}: {error.detail}", file=sys.stderr)
+    print(f"Imported {len(result.created)} challenges, {len(result.errors)} errors")
+    if result.errors:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
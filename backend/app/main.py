@@ -1,20 +1,63 @@
-from fastapi import FastAPI
+import asyncio
+import hmac
+import logging
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from app.middlewares import RateLimiterMiddleware
+from fastapi.responses import JSONResponse, Response
+from app.middlewares import (
+    MetricsMiddleware,
+    QueryStatsMiddleware,
+    RateLimiterMiddleware,
+)
 from app.api.routes import UserRouter, AuthRouter, ChallengeRouter
-from app.core.config import settings
+from app.core.config import settings, MINUTE, HOUR
+from app.core.rate_limit import RateLimitPolicy, storage_from_uri
+from app.api.crud.topics import topic_catalog
+from app.api.crud.trending import trending_ranking
+from app.core.cache import challenge_cache
+from app.core.database import get_async_session_factory, get_pools_status
+from app.core import metrics
+from app.core.security.password import password_pool
+from app.core.security.token import token_cache
+from app.reconcile_challenge_stats import reconcile_periodically
+from app.core.security.password import PasswordHasherBusy
 
+logger = logging.getLogger(__name__)
 
 description = """
 ### Learn Development by solving challenges posted by Industry experts 🐱‍💻
 
 """
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # load the topic catalog and the trending ranking before the first request
+    # needs them
+    try:
+        async with get_async_session_factory()() as db:
+            await topic_catalog.get_async(db)
+            await db.run_sync(trending_ranking.get)
+    except Exception:
+        logger.exception("Warming the topic catalog and trending ranking failed")
+
+    reconcile = None
+    if settings.CHALLENGE_STATS_RECONCILE_INTERVAL:
+        reconcile = asyncio.create_task(
+            reconcile_periodically(settings.CHALLENGE_STATS_RECONCILE_INTERVAL)
+        )
+    yield
+    if reconcile is not None:
+        reconcile.cancel()
+
+
 app = FastAPI(
     root_path=f"{settings.api_v1_str}",
     title="Learn Dev API",
     description=description,
     debug=True,
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -25,12 +68,55 @@ app.add_middleware(
     allow_headers=settings.ALLOW_HEADERS,
 )
 
+rate_limit_storage = storage_from_uri(settings.RATE_LIMIT_STORAGE_URI)
+
 app.add_middleware(
     RateLimiterMiddleware,
-    requests_limit=settings.REQUESTS_LIMIT,
-    time_window=settings.TIME_WINDOW,
+    default_policy=RateLimitPolicy(
+        limit=settings.REQUESTS_LIMIT,
+        window=settings.TIME_WINDOW,
+        algorithm=settings.RATE_LIMIT_ALGORITHM,
+    ),
+    # keyed by route path prefix, the longest matching prefix wins
+    policies={
+        # password checks are expensive and a brute force target
+        "/auth/login/token": RateLimitPolicy(
+            limit=10, window=MINUTE, algorithm="sliding-log"
+        ),
+        "/auth/signup": RateLimitPolicy(
+            limit=5, window=MINUTE, algorithm="sliding-log"
+        ),
+        "/challenge/create-new": RateLimitPolicy(limit=20, window=HOUR, key="user"),
+        "/challenge/import": RateLimitPolicy(limit=10, window=HOUR, key="user"),
+        # cheap listing pages are browsed in bursts
+        "/challenge/available": RateLimitPolicy(
+            limit=300, window=MINUTE, algorithm="token-bucket", key="user"
+        ),
+        "/challenge/trending": RateLimitPolicy(
+            limit=300, window=MINUTE, algorithm="token-bucket"
+        ),
+        "/challenge/topics": RateLimitPolicy(
+            limit=300, window=MINUTE, algorithm="token-bucket"
+        ),
+    },
+    storage=rate_limit_storage,
 )
 
+# added last to wrap the others, their time is part of the measures
+app.add_middleware(QueryStatsMiddleware, server_timing=settings.SERVER_TIMING)
+app.add_middleware(MetricsMiddleware)
+
+
+@app.exception_handler(PasswordHasherBusy)
+async def password_hasher_busy_handler(request: Request, exc: PasswordHasherBusy):
+    # shed logins and signups instead of queueing them behind a burst
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Too many password checks in progress, retry shortly"},
+        headers={"Retry-After": "1"},
+    )
+
+
 app.include_router(UserRouter)
 app.include_router(AuthRouter)
 app.include_router(ChallengeRouter)
@@ -39,3 +125,47 @@ app.include_router(ChallengeRouter)
 @app.get("/api/v1/")
 async def health_check():
     return "up and running"
+
+
+@metrics.REGISTRY.add_collector
+def collect_component_metrics():
+    for name, status in get_pools_status().items():
+        metrics.DB_POOL_CHECKED_OUT.labels(name).set(status["checked_out"])
+        metrics.DB_POOL_CHECKOUTS.labels(name).set(status["checkouts"])
+        metrics.DB_POOL_TIMEOUTS.labels(name).set(status["timeouts"])
+        metrics.DB_POOL_CHECKOUT_WAIT.labels(name).set(
+            status["checkout_time_total_ms"] / 1000
+        )
+        if "size" in status:
+            metrics.DB_POOL_SIZE.labels(name).set(status["size"])
+            metrics.DB_POOL_OVERFLOW.labels(name).set(status["overflow"])
+    for name, info in [
+        ("token", token_cache.info()),
+        ("challenge", challenge_cache.info()),
+    ]:
+        metrics.CACHE_HITS.labels(name).set(info["hits"])
+        metrics.CACHE_MISSES.labels(name).set(info["misses"])
+        metrics.CACHE_ENTRIES.labels(name).set(info["size"])
+    metrics.TOPIC_CATALOG_LOADS.labels().set(topic_catalog.loads)
+    metrics.TRENDING_REFRESHES.labels().set(trending_ranking.refreshes)
+    metrics.PASSWORD_HASH_PENDING.labels().set(password_pool.pending)
+    metrics.PASSWORD_HASH_REJECTED.labels().set(password_pool.rejected)
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics_endpoint(request: Request):
+    """
+    Metrics of all the workers, in the OpenMetrics text format. Only served
+    with METRICS_ENABLED, and to clients sending METRICS_TOKEN when one is set.
+    """
+    if not settings.METRICS_ENABLED:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+    if settings.METRICS_TOKEN:
+        authorization = request.headers.get("authorization", "")
+        token = authorization[7:] if authorization[:7].lower() == "bearer " else ""
+        if not hmac.compare_digest(token.encode(), settings.METRICS_TOKEN.encode()):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+    return Response(metrics.REGISTRY.render(), media_type=metrics.CONTENT_TYPE)
@@ -1,79 +1,243 @@
+import logging
 import time
-from fastapi import FastAPI, Request, Response, HTTPException
-from starlette.middleware.base import BaseHTTPMiddleware
+from typing import Dict, List, Optional, Tuple
 
+from starlette.requests import cookie_parser
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
-class RateLimiterMiddleware(BaseHTTPMiddleware):
-    request_counters: dict[str, dict] = {}
+from app.core.database import track_queries
+from app.core.metrics import (
+    HTTP_REQUEST_DURATION,
+    HTTP_REQUESTS,
+    HTTP_REQUESTS_IN_PROGRESS,
+    RATE_LIMITED_REQUESTS,
+    REGISTRY,
+    Registry,
+)
+from app.core.rate_limit import (
+    MemoryStorage,
+    RateLimitPolicies,
+    RateLimitPolicy,
+    RateLimitStorage,
+)
+from app.core.security.token import decode_token
 
-    def __init__(self, app: FastAPI, requests_limit: int, time_window: int):
-        super().__init__(app)
-        self.requests_limit = requests_limit
-        self.time_window = time_window  # in seconds
+logger = logging.getLogger(__name__)
+request_logger = logging.getLogger("app.requests")
 
-    async def dispatch(self, request: Request, call_next) -> Response:
-        client_ip = request.client.host if request.client else "127.0.0.1"
-        route_path = request.url.path
-        current_time = int(time.time())
-        key = f"{client_ip}:{route_path}"
+
+class RateLimiterMiddleware:
+    """
+    Pure ASGI rate limiter.
+
+    Rejected requests are answered with a 429 straight from the ASGI scope,
+    allowed ones get their `X-RateLimit-*` headers added to the
+    `http.response.start` message, so the response body is never buffered
+    nor re-streamed.
+    """
+
+    RATE_LIMITED_BODY = b"Rate limit exceeded. Please try again later."
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        default_policy: RateLimitPolicy,
+        policies: Optional[Dict[str, RateLimitPolicy]] = None,
+        storage: Optional[RateLimitStorage] = None,
+    ):
+        self.app = app
+        self.policies = RateLimitPolicies(default_policy, policies)
+        self.storage = storage if storage is not None else MemoryStorage()
+
+    def get_user_id(self, scope: Scope) -> Optional[str]:
+        """Return the id of the authenticated user, None for anonymous requests"""
+        token = None
+        for name, value in scope["headers"]:
+            if name == b"authorization" and value[:7].lower() == b"bearer ":
+                token = value[7:].decode("latin-1")
+                break
+            if name == b"cookie" and token is None:
+                token = cookie_parser(value.decode("latin-1")).get("access_token")
+        if not token:
+            return None
 
         try:
-            if key not in self.request_counters:
-                self.request_counters[key] = {"timestamp": current_time, "count": 1}
-            else:
-                if (
-                    current_time - self.request_counters[key]["timestamp"]
-                    > self.time_window
-                ):
-                    self.request_counters[key] = {"timestamp": current_time, "count": 1}
-                else:
-                    if self.request_counters[key]["count"] >= self.requests_limit:
-                        return Response(
-                            status_code=429,
-                            content="Rate limit exceeded. Please try again later.",
-                            headers={
-                                "X-RateLimit-Limit": str(self.requests_limit),
-                                "X-RateLimit-Remaining": str(0),
-                                "X-RateLimit-Reset": str(
-                                    self.time_window
-                                    - (
-                                        current_time
-                                        - self.request_counters[key]["timestamp"]
-                                    )
-                                ),
-                            },
-                        )
-                    else:
-                        self.request_counters[key]["count"] += 1
-
-            # Clean up expired client data (optional)
-            expired_keys = [
-                k
-                for k in self.request_counters
-                if current_time - self.request_counters[k]["timestamp"]
-                > self.time_window
-            ]
-            for k in expired_keys:
-                del self.request_counters[k]
-
-            # Prepare the response
-            response = await call_next(request)
-
-            # Add headers for rate limiting
-            remaining_requests = (
-                self.requests_limit - self.request_counters[key]["count"]
+            return decode_token(token=token).sub.id
+        except Exception:
+            return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        client = scope.get("client")
+        client_ip = client[0] if client else "127.0.0.1"
+
+        # match policies against the route path, without the api prefix
+        route_path = scope["path"]
+        root_path = scope.get("root_path", "")
+        if root_path and route_path.startswith(root_path):
+            route_path = route_path[len(root_path) :] or "/"
+
+        path_scope, policy = self.policies.match(route_path)
+
+        identity = f"ip:{client_ip}"
+        if policy.key == "user":
+            user_id = self.get_user_id(scope)
+            if user_id:
+                identity = f"user:{user_id}"
+
+        key = f"{policy.algorithm}:{identity}:{path_scope}"
+        try:
+            result = await policy.strategy.hit(
+                self.storage, key, policy.limit, policy.window
             )
-            response.headers["X-RateLimit-Limit"] = str(self.requests_limit)
-            response.headers["X-RateLimit-Remaining"] = str(remaining_requests)
-            response.headers["X-RateLimit-Reset"] = str(
-                self.time_window
-                - (current_time - self.request_counters[key]["timestamp"])
+        except Exception:
+            # an unreachable storage must not take the whole api down
+            logger.exception("Rate limit storage failed, letting %s through", key)
+            await self.app(scope, receive, send)
+            return
+
+        headers: List[Tuple[bytes, bytes]] = [
+            (b"x-ratelimit-limit", str(result.limit).encode()),
+            (b"x-ratelimit-remaining", str(result.remaining).encode()),
+            (b"x-ratelimit-reset", str(result.reset_after).encode()),
+        ]
+
+        if not result.allowed:
+            RATE_LIMITED_REQUESTS.labels(path_scope).inc()
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": 429,
+                    "headers": [
+                        (b"content-type", b"text/plain; charset=utf-8"),
+                        (b"content-length", str(len(self.RATE_LIMITED_BODY)).encode()),
+                        (b"retry-after", str(result.reset_after).encode()),
+                        *headers,
+                    ],
+                }
             )
+            await send({"type": "http.response.body", "body": self.RATE_LIMITED_BODY})
+            return
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message = {
+                    **message,
+                    "headers": [*message.get("headers", ()), *headers],
+                }
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
 
-            return response
 
-        except HTTPException as e:
-            raise e  # Re-raise known HTTP exceptions
-        except Exception as e:
-            print(f"Unexpected error: {e}")
-            raise HTTPException(status_code=500, detail="Internal Server Error")
+class QueryStatsMiddleware:
+    """
+    Pure ASGI middleware counting the SQL statements of each request and the
+    time spent on them, see `app.core.database.track_queries`.
+
+    They are sent in a `Server-Timing` header, for the browser dev tools, and
+    logged with the request once the response is complete. Statements run
+    while a streamed body is sent are only part of the log.
+    """
+
+    def __init__(self, app: ASGIApp, server_timing: bool = True):
+        self.app = app
+        self.server_timing = server_timing
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status_code = 500
+
+        with track_queries() as stats:
+
+            async def send_with_timing(message: Message) -> None:
+                nonlocal status_code
+                if message["type"] == "http.response.start":
+                    status_code = message["status"]
+                    if self.server_timing:
+                        elapsed = (time.perf_counter() - start) * 1000
+                        timing = (
+                            f'db;dur={stats.duration * 1000:.1f};desc="{stats.count} queries", '
+                            f"app;dur={elapsed:.1f}"
+                        )
+                        message = {
+                            **message,
+                            "headers": [
+                                *message.get("headers", ()),
+                                (b"server-timing", timing.encode()),
+                            ],
+                        }
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_timing)
+            finally:
+                duration = (time.perf_counter() - start) * 1000
+                request_logger.info(
+                    "%s %s %d %.1fms, %d queries in %.1fms",
+                    scope["method"],
+                    scope["path"],
+                    status_code,
+                    duration,
+                    stats.count,
+                    stats.duration * 1000,
+                    extra={
+                        "method": scope["method"],
+                        "path": scope["path"],
+                        "status_code": status_code,
+                        "duration_ms": round(duration, 2),
+                        "db_queries": stats.count,
+                        "db_time_ms": round(stats.duration * 1000, 2),
+                    },
+                )
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording request counts and latencies by route
+    template, e.g. /challenge/view/{slug} rather than every slug, see
+    `app.core.metrics`.
+    """
+
+    # anything else is counted as OTHER, labels must stay few
+    METHODS = {"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"}
+
+    def __init__(self, app: ASGIApp, registry: Registry = REGISTRY):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"] if scope["method"] in self.METHODS else "OTHER"
+        in_progress = HTTP_REQUESTS_IN_PROGRESS.labels(method)
+        in_progress.inc()
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            duration = time.perf_counter() - start
+            in_progress.dec()
+            # set by the router on the scope it was given, once matched
+            route = scope.get("route")
+            template = getattr(route, "path", "<unmatched>")
+            HTTP_REQUEST_DURATION.labels(method, template).observe(duration)
+            HTTP_REQUESTS.labels(method, template, status_code).inc()
+            self.registry.maybe_refresh()
@@ -0,0 +1,128 @@
+"""
+Recount the takers, submissions and acceptances counters of the challenges.
+
+    python -m app.reconcile_challenge_stats
+
+The counters are kept up to date by the api, this fixes the ones that drifted,
+e.g. after challenge_takers rows were edited by hand. One worker also runs it
+every `CHALLENGE_STATS_RECONCILE_INTERVAL` seconds, the one holding a Postgres
+advisory lock.
+"""
+
+import argparse
+import asyncio
+import logging
+from typing import Optional
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.pool import NullPool
+from sqlmodel import Session
+
+from app.api.crud import challenges as challenges_crud
+from app.core.database import engine
+
+logger = logging.getLogger(__name__)
+
+# any number no other advisory lock of the database uses
+RECONCILE_LOCK_KEY = 0x5EC0_0C0A
+
+
+class ReconcileLock:
+    """
+    Postgres session advisory lock electing the worker running the periodic
+    reconcile.
+
+    The worker holding it keeps a connection of its own open, outside of the
+    pool. The lock goes with that connection, when the worker exits or the
+    database restarts, and another worker takes it at its next attempt. Other
+    databases have no such lock, every process reconciles, which is fine
+    for the single process of a SQLite setup.
+    """
+
+    def __init__(self, bind: Engine, key: int = RECONCILE_LOCK_KEY):
+        self.bind = bind
+        self.key = key
+        self._lock_engine: Optional[Engine] = None
+        self._connection: Optional[Connection] = None
+
+    def acquire(self) -> bool:
+        """Whether this process holds the lock, trying to take it if not"""
+        if self.bind.dialect.name != "postgresql":
+            return True
+
+        if self._connection is not None:
+            try:
+                self._connection.exec_driver_sql("SELECT 1")
+                return True
+            except DBAPIError:
+                # the connection was lost, and the lock with it
+                self.release()
+
+        if self._lock_engine is None:
+            self._lock_engine = create_engine(
+                self.bind.url, poolclass=NullPool, isolation_level="AUTOCOMMIT"
+            )
+        connection = self._lock_engine.connect()
+        try:
+            held = connection.execute(
+                text("SELECT pg_try_advisory_lock(:key)"), {"key": self.key}
+            ).scalar()
+        except Exception:
+            connection.close()
+            raise
+        if not held:
+            connection.close()
+            return False
+        self._connection = connection
+        return True
+
+    def release(self) -> None:
+        if self._connection is not None:
+            connection, self._connection = self._connection, None
+            try:
+                connection.close()
+            except DBAPIError:
+                pass
+
+
+def reconcile(bind: Engine = engine) -> int:
+    with Session(bind) as db:
+        return challenges_crud.db_reconcile_challenge_stats(db)
+
+
+async def reconcile_periodically(interval: float, bind: Engine = engine):
+    """
+    Reconcile every `interval` seconds until cancelled, with the lifespan,
+    if this worker holds the reconcile lock.
+    """
+    lock = ReconcileLock(bind)
+    try:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                if not await asyncio.to_thread(lock.acquire):
+                    continue
+                # a full recount, keep it off the event loop
+                fixed = await asyncio.to_thread(reconcile, bind)
+                if fixed:
+                    logger.info(
+                        "Reconciled the counters of %d challenges",
+                        fixed,
+                        extra={"challenges": fixed},
+                    )
+            except Exception:
+                logger.exception("Reconciling the challenge counters failed")
+    finally:
+        lock.release()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.parse_args()
+    print(f"Reconciled the counters of {reconcile()} challenges")
+
+
+if __name__ == "__main__":
+    main()
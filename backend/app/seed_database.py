@@ -1,43 +1,54 @@
-import random, uuid
-from app.api.models import User, Challenge, Topic
-from app.api.models import users as users_model, challenges as challenges_model
-from app.core.security.password import get_password_hash
-from app.core.database import engine
-from sqlmodel import Session
-from faker import Faker
-
-fake = Faker()
+"""
+Fill the database with generated users, challenges, topics, challenge takers
+and login history, from a handful of rows for local development to millions
+for load tests and query plans.
 
-PASSWORD = "password"
-HASHED_PASSWORD = get_password_hash(PASSWORD)
-
-# list of 10 title for web development challenges
-TITLES = [
-    "Build a responsive navigation bar",
-    "Implement a search bar with autocomplete",
-    "Create a carousel with lazy loading",
-    "Build a simple blog using Next.js",
-    "Implement a login system with JWT",
-    "Create a simple e-commerce store",
-    "Build a weather app with API integration",
-    "Create a simple chatbot with natural language processing",
-    "Implement a simple game with physics engine",
-    "Build a simple web scraper with beautifulsoup",
-]
+    python -m app.seed_database
+    python -m app.seed_database --users 1000000 --challenges 200000 --seed 7
 
-# description of the project
-description = """
-## Description
+The data is deterministic for a given seed and sizes: ids are derived from the
+seed and the row number, so rows are generated one chunk at a time without
+keeping what was already inserted in memory. Popularity follows Zipf laws: a
+few challenges are taken by many users and tagged topics concentrate on a few
+names, as do contributions on a few contributors.
 
-Description about the project. Like what minimum feature it should have
+Rows are inserted with multi-row INSERTs, or with COPY on Postgres through
+psycopg2, into empty tables expected to exist (alembic upgrade head), or pass
+`--create-tables`.
+"""
 
-## Resources
+import argparse
+import csv
+import enum
+import hashlib
+import io
+import random
+import time
+import uuid
+from array import array
+from bisect import bisect_left
+from datetime import datetime, timedelta
+from itertools import accumulate, islice
+from typing import Callable, Iterable, Iterator, Optional
 
-[Wikipedia](https://wikipedia.org)
+from slugify import slugify
+from sqlalchemy import Engine, Table, insert
+from sqlmodel import Session, SQLModel
 
+from app.api.models import (
+    Challenge,
+    ChallengeTakers,
+    ChallengeTopic,
+    LoginHistory,
+    Topic,
+    User,
+)
+from app.api.crud import challenges as challenges_crud
+from app.api.models import users as users_model, challenges as challenges_model
+from app.core.database import engine as default_engine
+from app.core.security.password import get_password_hash
 
-**Happing Coding 😃**
-"""
+PASSWORD = "password"
 
 # List of Topic and technologies
 TOPIC_NAME = [
@@ -62,66 +73,424 @@ TOPIC_NAME = [
     "mongodb",
 ]
 
+FIRST_NAMES = [
+    "ada", "alan", "barbara", "brian", "dennis", "donald", "edsger", "frances",
+    "grace", "guido", "hedy", "james", "john", "ken", "linus", "margaret",
+    "niklaus", "radia", "richard", "shafi", "sophie", "tim", "yukihiro", "zoe",
+]  # fmt: skip
+LAST_NAMES = [
+    "allen", "backus", "cerf", "dijkstra", "floyd", "goldwasser", "hamilton",
+    "hopper", "kay", "kernighan", "knuth", "lamarr", "liskov", "lovelace",
+    "matsumoto", "perlman", "ritchie", "rossum", "stallman", "thompson",
+    "torvalds", "turing", "wilson", "wirth",
+]  # fmt: skip
 
-def populate_database():
+TITLE_VERBS = ["Build", "Create", "Implement", "Design", "Clone", "Refactor"]
+TITLE_ADJECTIVES = [
+    "responsive", "real-time", "offline-first", "accessible", "minimal",
+    "scalable", "secure", "animated", "collaborative", "serverless",
+]  # fmt: skip
+TITLE_THINGS = [
+    "navigation bar", "search bar with autocomplete", "image carousel", "blog",
+    "login system", "e-commerce store", "weather app", "chatbot", "game",
+    "web scraper", "kanban board", "markdown editor", "url shortener",
+    "chat application", "dashboard", "file uploader", "payment form",
+    "rate limiter", "recommendation feed", "notification center",
+]  # fmt: skip
 
-    print("Started populating database")
-    with Session(engine) as db:
-        try:
-            print("Database session created.")
-            # populate users
-            users = [
-                User(
-                    id=uuid.uuid4(),
-                    first_name=fake.first_name(),
-                    last_name=fake.last_name(),
-                    username=fake.user_name(),
-                    email=fake.email(),
-                    password=HASHED_PASSWORD,
-                    role=users_model.UserRole.USER,
-                    provider=users_model.AccountProvider.CREDENTIALS,
-                    is_email_verified=True,
+SENTENCES = [
+    "Users should be able to sign up and log in.",
+    "Persist the data so that it survives a page reload.",
+    "The layout must work on mobile and desktop screens.",
+    "Handle loading and error states gracefully.",
+    "Write tests for the most important features.",
+    "Deploy the application and share the link.",
+    "Keep the interface keyboard accessible.",
+    "Paginate long lists instead of rendering everything at once.",
+    "Validate every input on the client and on the server.",
+    "Document how to run the project locally.",
+]
+
+# description of the project
+DESCRIPTION = """
+## Description
+
+{requirements}
+
+## Resources
+
+[Wikipedia](https://wikipedia.org)
+
+
+**Happing Coding 😃**
+"""
+
+# approval of generated challenges, most are approved
+APPROVALS = (
+    (challenges_model.ApprovalStatus.APPROVED, 0.85),
+    (challenges_model.ApprovalStatus.PENDING, 0.1),
+    (challenges_model.ApprovalStatus.REJECTED, 0.05),
+)
+TAKE_STATUSES = (
+    (challenges_model.ChallengeStatus.PENDING, 0.5),
+    (challenges_model.ChallengeStatus.SUBMITTED, 0.2),
+    (challenges_model.ChallengeStatus.ACCEPTED, 0.2),
+    (challenges_model.ChallengeStatus.REJECTED, 0.1),
+)
+DIFFICULTIES = (
+    (challenges_model.DifficultyTag.BEGINNER, 0.4),
+    (challenges_model.DifficultyTag.INTERMEDIATE, 0.3),
+    (challenges_model.DifficultyTag.ADVANCE, 0.2),
+    (challenges_model.DifficultyTag.EXPERT, 0.1),
+)
+
+# generated activity spans this period, ending at `now`
+HISTORY = timedelta(days=2 * 365)
+
+
+class Zipf:
+    """
+    Sampler of ranks 0..n-1, the rank k being drawn with a probability
+    proportional to 1 / (k + 1) ** s. Keeps n cumulative weights, 8 bytes each.
+    """
+
+    def __init__(self, n: int, s: float):
+        self.cum_weights = array("d", accumulate((k + 1) ** -s for k in range(n)))
+
+    def __call__(self, rng: random.Random) -> int:
+        return bisect_left(self.cum_weights, rng.random() * self.cum_weights[-1])
+
+    def distinct(self, rng: random.Random, k: int) -> list:
+        """Up to `k` distinct ranks, fewer when popular ranks keep coming back"""
+        ranks = set()
+        if not self.cum_weights:
+            return []
+        for _ in range(k * 4):
+            ranks.add(self(rng))
+            if len(ranks) == k:
+                break
+        return sorted(ranks)
+
+
+def weighted(rng: random.Random, choices) -> enum.Enum:
+    values, weights = zip(*choices)
+    return rng.choices(values, weights)[0]
+
+
+def geometric(rng: random.Random, mean: float) -> int:
+    """Count of events averaging `mean`, most rows having few and some many"""
+    if mean <= 0:
+        return 0
+    p = 1 / (mean + 1)
+    count = 0
+    while rng.random() > p:
+        count += 1
+    return count
+
+
+class Generator:
+    """
+    Rows of the generated dataset, one table at a time. Each row is built from
+    a random generator seeded by the seed, the table and the row number, so any
+    row can be rebuilt without the others.
+    """
+
+    def __init__(
+        self,
+        *,
+        users: int,
+        challenges: int,
+        topics: int = len(TOPIC_NAME),
+        contributors: float = 0.05,
+        takes_per_user: float = 5,
+        logins_per_user: float = 3,
+        zipf: float = 1.1,
+        seed: int = 0,
+        now: Optional[datetime] = None,
+    ):
+        self.users = users
+        self.challenges = challenges
+        self.topics = topics
+        self.contributors = max(1, int(users * contributors))
+        self.takes_per_user = takes_per_user
+        self.logins_per_user = logins_per_user
+        self.seed = seed
+        self.now = now or datetime(2024, 1, 1)
+        self.start = self.now - HISTORY
+        self.challenge_popularity = Zipf(challenges, zipf)
+        self.topic_popularity = Zipf(topics, zipf)
+        self.contributor_activity = Zipf(self.contributors, zipf)
+        self.password = get_password_hash(PASSWORD)
+
+    def rng(self, table: str, i: int) -> random.Random:
+        return random.Random(f"{self.seed}:{table}:{i}")
+
+    def id(self, table: str, i: int) -> uuid.UUID:
+        digest = hashlib.blake2b(f"{self.seed}:{table}:{i}".encode(), digest_size=16)
+        return uuid.UUID(bytes=digest.digest(), version=4)
+
+    def at(self, fraction: float) -> datetime:
+        return self.start + HISTORY * fraction
+
+    def topic_name(self, i: int) -> str:
+        if i < len(TOPIC_NAME):
+            return TOPIC_NAME[i]
+        return f"{TOPIC_NAME[i % len(TOPIC_NAME)]} {i // len(TOPIC_NAME)}"
+
+    def user_rows(self) -> Iterator[dict]:
+        for i in range(self.users):
+            rng = self.rng("users", i)
+            first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+            username = f"{first}.{last}.{i}"
+            yield {
+                "id": self.id("users", i),
+                "first_name": first.title(),
+                "last_name": last.title(),
+                "username": username,
+                "email": f"{username}@example.com",
+                "password": self.password,
+                "role": users_model.UserRole.USER,
+                "provider": users_model.AccountProvider.CREDENTIALS,
+                "is_email_verified": True,
+                "is_super_user": False,
+                "is_active": True,
+                "blocked": False,
+                "created_at": self.at(i / self.users * 0.5),
+            }
+
+    def topic_rows(self) -> Iterator[dict]:
+        for i in range(self.topics):
+            yield {"id": self.id("topics", i), "name": self.topic_name(i)}
+
+    def challenge_created_at(self, i: int) -> datetime:
+        # challenges are created over the second half of the history
+        return self.at(0.5 + i / self.challenges * 0.5)
+
+    def challenge_rows(self) -> Iterator[dict]:
+        for i in range(self.challenges):
+            rng = self.rng("challenges", i)
+            id = self.id("challenges", i)
+            title = " ".join(
+                (
+                    rng.choice(TITLE_VERBS),
+                    "a",
+                    rng.choice(TITLE_ADJECTIVES),
+                    rng.choice(TITLE_THINGS),
                 )
-                for _ in range(10)
-            ]
-            print("List of users created.")
-
-            # populate topics
-            topics = [
-                Topic(id=uuid.uuid4(), name=TOPIC_NAME[i])
-                for i in range(len(TOPIC_NAME))
-            ]
-            print("List of topics created.")
-
-            # populate challenges
-            challenges = [
-                Challenge(
-                    id=uuid.uuid4(),
-                    title=TITLES[i],
-                    description=description,
-                    contributor=random.choice(users),
-                    difficulty_tag=random.choice(
-                        [challenges_model.DifficultyTag.BEGINNER, challenges_model.DifficultyTag.INTERMEDIATE, challenges_model.DifficultyTag.ADVANCE, challenges_model.DifficultyTag.EXPERT]
+            )
+            requirements = " ".join(rng.sample(SENTENCES, rng.randint(2, 6)))
+            approval = weighted(rng, APPROVALS)
+            created_at = self.challenge_created_at(i)
+            yield {
+                "id": id,
+                "title": title,
+                "slug": f"{slugify(title)}-{id}",
+                "description": DESCRIPTION.format(requirements=requirements),
+                "difficulty_tag": weighted(rng, DIFFICULTIES),
+                "contributor_id": self.id("users", self.contributor_activity(rng)),
+                "approval": approval,
+                "approver_id": None,
+                "created_at": created_at,
+                "updated_at": created_at,
+            }
+
+    def challenge_topic_rows(self) -> Iterator[dict]:
+        for i in range(self.challenges):
+            rng = self.rng("challenge_topics", i)
+            for topic in self.topic_popularity.distinct(rng, rng.randint(1, 4)):
+                yield {
+                    "challenge_id": self.id("challenges", i),
+                    "topic_id": self.id("topics", topic),
+                }
+
+    def challenge_taker_rows(self) -> Iterator[dict]:
+        for i in range(self.users):
+            rng = self.rng("challenge_takers", i)
+            user_id = self.id("users", i)
+            taken = self.challenge_popularity.distinct(
+                rng, geometric(rng, self.takes_per_user)
+            )
+            for challenge in taken:
+                challenge_id = self.id("challenges", challenge)
+                created_at = self.challenge_created_at(challenge)
+                created_at += (self.now - created_at) * rng.random()
+                status = weighted(rng, TAKE_STATUSES)
+                submitted = status != challenges_model.ChallengeStatus.PENDING
+                # unique per user and challenge, as the real urls would be
+                project = f"{user_id.hex[:12]}/{challenge_id.hex[:12]}"
+                yield {
+                    "user_id": user_id,
+                    "challenge_id": challenge_id,
+                    "status": status,
+                    "github_url": (
+                        f"https://github.com/{project}" if submitted else None
                     ),
-                    topic_tags=random.choices(topics, k=random.randint(1, 3)),
-                )
-                for i in range(10)
-            ]
-            print("List of challenges created")
-
-            print("seeding into database")
-            # seed database
-            db.add_all(users)
-            db.add_all(topics)
-            db.add_all(challenges)
-            db.commit()
-            print("Database seeded successfully 👍.")
-        except Exception as e:
-            db.rollback()
-            print("Seeding Failed")
-            print(e)
-            raise
+                    "presentation_video_url": None,
+                    "deployed_application_url": (
+                        f"https://{project.replace('/', '-')}.example.com"
+                        if submitted
+                        else None
+                    ),
+                    "feedback": None,
+                    "created_at": created_at,
+                    "updated_at": created_at,
+                }
+
+    def login_history_rows(self) -> Iterator[dict]:
+        span = HISTORY.total_seconds() * 0.5
+        for i in range(self.users):
+            rng = self.rng("login_histories", i)
+            user_id = self.id("users", i)
+            count = geometric(rng, self.logins_per_user)
+            # distinct instants, the primary key is (user_id, last_logged_in)
+            for offset in sorted(rng.sample(range(int(span)), count)):
+                yield {
+                    "user_id": user_id,
+                    "last_logged_in": self.now - timedelta(seconds=offset),
+                }
+
+    def tables(self) -> Iterable[tuple]:
+        """(table, rows) pairs in foreign key order"""
+        return (
+            (User.__table__, self.user_rows),
+            (Topic.__table__, self.topic_rows),
+            (Challenge.__table__, self.challenge_rows),
+            (ChallengeTopic.__table__, self.challenge_topic_rows),
+            (ChallengeTakers.__table__, self.challenge_taker_rows),
+            (LoginHistory.__table__, self.login_history_rows),
+        )
+
+
+def chunked(rows: Iterable[dict], size: int) -> Iterator[list]:
+    rows = iter(rows)
+    while chunk := list(islice(rows, size)):
+        yield chunk
+
+
+def copy_value(value) -> Optional[str]:
+    if value is None:
+        return None
+    if isinstance(value, enum.Enum):
+        # Enum columns store the member names
+        return value.name
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def copy_chunk(connection, table: Table, chunk: list):
+    """COPY the rows of `chunk` into `table`, Postgres with psycopg2 only"""
+    columns = list(chunk[0])
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in chunk:
+        # an unquoted empty field is NULL in the CSV format of COPY
+        writer.writerow(["" if v is None else v for v in map(copy_value, row.values())])
+    buffer.seek(0)
+    with connection.connection.cursor() as cursor:
+        cursor.copy_expert(
+            f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)",
+            buffer,
+        )
+
+
+def insert_rows(
+    engine: Engine,
+    table: Table,
+    rows: Iterable[dict],
+    chunk_size: int,
+    use_copy: bool,
+    progress: Callable[[str, int], None],
+) -> int:
+    count = 0
+    # one transaction per table, commits are slow and chunks are not
+    with engine.begin() as connection:
+        for chunk in chunked(rows, chunk_size):
+            if use_copy:
+                copy_chunk(connection, table, chunk)
+            else:
+                connection.execute(insert(table), chunk)
+            count += len(chunk)
+            progress(table.name, count)
+    return count
+
+
+def populate_database(
+    users: int = 10,
+    challenges: int = 10,
+    *,
+    seed: int = 0,
+    chunk_size: int = 5000,
+    engine: Engine = default_engine,
+    create_tables: bool = False,
+    verbose: bool = True,
+    **options,
+) -> dict:
+    """
+    Generate and insert the dataset, see `Generator` for the `options`.
+
+    Returns:
+        dict: The number of rows inserted by table name.
+    """
+    if create_tables:
+        SQLModel.metadata.create_all(engine)
+    # COPY is much faster than INSERT, but psycopg2 only
+    use_copy = engine.dialect.name == "postgresql" and engine.driver == "psycopg2"
+
+    def progress(table: str, count: int):
+        if verbose:
+            print(f"\r{table}: {count} rows", end="", flush=True)
+
+    generator = Generator(users=users, challenges=challenges, seed=seed, **options)
+    counts = {}
+    for table, rows in generator.tables():
+        started = time.perf_counter()
+        counts[table.name] = insert_rows(
+            engine, table, rows(), chunk_size, use_copy, progress
+        )
+        if verbose:
+            elapsed = time.perf_counter() - started
+            print(f"\r{table.name}: {counts[table.name]} rows in {elapsed:.1f}s")
+
+    # takers are generated apart from their challenges, count them in one go
+    with Session(engine) as db:
+        challenges_crud.db_reconcile_challenge_stats(db)
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--challenges", type=int, default=10)
+    parser.add_argument("--topics", type=int, default=len(TOPIC_NAME))
+    parser.add_argument(
+        "--contributors", type=float, default=0.05, help="share of the users"
+    )
+    parser.add_argument("--takes-per-user", type=float, default=5, help="mean")
+    parser.add_argument("--logins-per-user", type=float, default=3, help="mean")
+    parser.add_argument("--zipf", type=float, default=1.1, help="popularity skew")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    parser.add_argument("--create-tables", action="store_true")
+    args = parser.parse_args()
+
+    print("Started populating database")
+    populate_database(
+        args.users,
+        args.challenges,
+        topics=args.topics,
+        contributors=args.contributors,
+        takes_per_user=args.takes_per_user,
+        logins_per_user=args.logins_per_user,
+        zipf=args.zipf,
+        seed=args.seed,
+        chunk_size=args.chunk_size,
+        create_tables=args.create_tables,
+    )
+    print(f"Database seeded successfully 👍. Every password is {PASSWORD!r}")
 
 
 if __name__ == "__main__":
-    populate_database()
+    main()
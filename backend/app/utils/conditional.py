@@ -0,0 +1,78 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+
+from fastapi import Request, Response, status
+
+
+def make_etag(*parts) -> str:
+    """Weak entity tag of the `str()` of `parts`, the body is JSON so only weak"""
+    digest = hashlib.blake2b(digest_size=12)
+    for part in parts:
+        digest.update(str(part).encode())
+        digest.update(b"\0")
+    return f'W/"{digest.hexdigest()}"'
+
+
+def to_utc(value: datetime) -> datetime:
+    """Timestamps are stored without timezone, in UTC"""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def http_date(value: datetime) -> str:
+    return format_datetime(to_utc(value).replace(microsecond=0), usegmt=True)
+
+
+def is_not_modified(
+    request: Request, etag: str, last_modified: Optional[datetime] = None
+) -> bool:
+    """
+    Whether the client copy is still fresh: `If-None-Match` takes precedence
+    over `If-Modified-Since`, which is only honoured for `last_modified`.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        # weak comparison, W/"x" matches "x"
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return etag.removeprefix("W/") in tags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is None or last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        return False
+    # HTTP dates have a one second resolution
+    return to_utc(last_modified).replace(microsecond=0) <= since
+
+
+def set_validators(
+    response: Response,
+    etag: str,
+    last_modified: Optional[datetime] = None,
+    cache_control: str = "no-cache",
+):
+    """
+    Add the validators to `response`, `no-cache` lets clients keep the body but
+    makes them revalidate it on every use.
+    """
+    response.headers["ETag"] = etag
+    if last_modified is not None:
+        response.headers["Last-Modified"] = http_date(last_modified)
+    response.headers["Cache-Control"] = cache_control
+
+
+def not_modified(
+    etag: str, last_modified: Optional[datetime] = None, cache_control="no-cache"
+) -> Response:
+    response = Response(status_code=status.HTTP_304_NOT_MODIFIED)
+    set_validators(response, etag, last_modified, cache_control)
+    return response
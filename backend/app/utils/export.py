@@ -0,0 +1,109 @@
+"""
+Streamed exports of response models, as NDJSON or CSV.
+
+Routes pass batches of models, usually one per batch of rows read from a
+server-side cursor, see `async_challenges.stream_batches`. Each batch is
+encoded and sent before the next one is read, so neither the rows nor the
+response body are held in memory as a whole.
+"""
+
+import csv
+import io
+import json
+from typing import AsyncIterator, List, Literal, Sequence, Type
+
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+ExportFormat = Literal["ndjson", "csv"]
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv; charset=utf-8"}
+
+Batches = AsyncIterator[Sequence[BaseModel]]
+
+# first characters making spreadsheets read a cell as a formula
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def csv_columns(model: Type[BaseModel]) -> List[str]:
+    """Columns of `model` rows, nested models flattened as `<field>_<subfield>`"""
+    columns = []
+    for name, field in model.model_fields.items():
+        if isinstance(field.annotation, type) and issubclass(
+            field.annotation, BaseModel
+        ):
+            columns.extend(f"{name}_{sub}" for sub in field.annotation.model_fields)
+        else:
+            columns.append(name)
+    return columns + list(model.model_computed_fields)
+
+
+def csv_cell(value):
+    """
+    `value` quoted with a leading "'" when a spreadsheet would run it as a
+    formula, exported titles and descriptions are written by users.
+    """
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def csv_row(document: dict) -> dict:
+    """
+    Flat row of a JSON document: nested objects become prefixed columns and
+    lists of objects, like topic tags, their names separated by ";".
+    """
+    row = {}
+    for name, value in document.items():
+        if isinstance(value, dict):
+            row.update({f"{name}_{key}": item for key, item in value.items()})
+        elif isinstance(value, list):
+            row[name] = ";".join(
+                item["name"] if isinstance(item, dict) else str(item) for item in value
+            )
+        else:
+            row[name] = value
+    return {name: csv_cell(value) for name, value in row.items()}
+
+
+async def encode_ndjson(batches: Batches) -> AsyncIterator[bytes]:
+    async for batch in batches:
+        if batch:
+            yield "".join(
+                json.dumps(item.model_dump(mode="json")) + "\n" for item in batch
+            ).encode()
+
+
+async def encode_csv(batches: Batches, columns: List[str]) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=columns, extrasaction="ignore")
+    # the header goes out before the first query
+    writer.writeheader()
+    yield buffer.getvalue().encode()
+    async for batch in batches:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(csv_row(item.model_dump(mode="json")) for item in batch)
+        if buffer.tell():
+            yield buffer.getvalue().encode()
+
+
+def export_response(
+    batches: Batches,
+    *,
+    model: Type[BaseModel],
+    export_format: ExportFormat,
+    filename: str,
+) -> StreamingResponse:
+    """Download of the models of `batches`, as `<filename>.<format>`"""
+    if export_format == "csv":
+        body = encode_csv(batches, csv_columns(model))
+    else:
+        body = encode_ndjson(batches)
+    return StreamingResponse(
+        body,
+        media_type=MEDIA_TYPES[export_format],
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}.{export_format}"'
+        },
+    )
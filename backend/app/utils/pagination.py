@@ -0,0 +1,52 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Callable, List, Optional, Sequence, Tuple, TypeVar, Union
+from uuid import UUID
+
+from fastapi import HTTPException, status
+
+T = TypeVar("T")
+
+
+def encode_cursor(key: Union[datetime, int], id: UUID) -> str:
+    """
+    Opaque cursor pointing right after the row `(key, id)`, `key` being the
+    sort key of the listing: a creation time or a count.
+    """
+    value = key.isoformat() if isinstance(key, datetime) else key
+    raw = json.dumps([value, str(id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(
+    cursor: Optional[str],
+) -> Optional[Tuple[Union[datetime, int], UUID]]:
+    """Inverse of `encode_cursor`, raises a 400 for cursors we didn't issue"""
+    if cursor is None:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        key, id = json.loads(raw)
+        if isinstance(key, str):
+            key = datetime.fromisoformat(key)
+        elif type(key) is not int:
+            raise ValueError(f"Invalid cursor key: {key!r}")
+        return key, UUID(id)
+    except (ValueError, TypeError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        ) from e
+
+
+def paginate(
+    rows: Sequence[T], limit: int, cursor_of: Callable[[T], Tuple[Any, UUID]]
+) -> Tuple[List[T], Optional[str]]:
+    """
+    Split the `limit + 1` rows fetched for a page into the page itself and the
+    cursor of the next page, None on the last page.
+    """
+    page = list(rows[:limit])
+    if len(rows) <= limit:
+        return page, None
+    return page, encode_cursor(*cursor_of(page[-1]))
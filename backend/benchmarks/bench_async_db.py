@@ -0,0 +1,102 @@
+"""
+Requests/sec of the same lookup served by a sync and an async route.
+
+The sync route runs `users_crud.db_get_user` on Starlette's threadpool with
+`SessionDep`, the async one awaits `async_users_crud.db_get_user` with
+`AsyncSessionDep`. Use a Postgres `DATABASE_URI` for meaningful numbers, the
+default throwaway SQLite file serializes every query anyway.
+
+    DATABASE_URI=postgresql://... python -m benchmarks.bench_async_db --concurrency 200
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+os.environ.setdefault(
+    "DATABASE_URI", f"sqlite:///{tempfile.mkdtemp()}/bench_async_db.sqlite"
+)
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+import httpx  # noqa: E402
+from fastapi import FastAPI  # noqa: E402
+from sqlmodel import Session, SQLModel  # noqa: E402
+
+from app.api.crud import (
+    users as users_crud,
+    async_users as async_users_crud,
+)  # noqa: E402
+from app.api.models import User  # noqa: E402
+from app.core.database import engine, get_async_engine  # noqa: E402
+from app.dependencies import AsyncSessionDep, SessionDep  # noqa: E402
+
+USERNAME = "bench-async-db"
+
+app = FastAPI()
+
+
+@app.get("/sync/{username}")
+def sync_user(db: SessionDep, username: str):
+    return users_crud.db_get_user(db, username=username).id
+
+
+@app.get("/async/{username}")
+async def async_user(db: AsyncSessionDep, username: str):
+    return (await async_users_crud.db_get_user(db, username=username)).id
+
+
+def seed():
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as db:
+        if users_crud.db_get_user(db, username=USERNAME) is None:
+            db.add(
+                User(
+                    first_name="Bench",
+                    last_name="Mark",
+                    username=USERNAME,
+                    email=f"{USERNAME}@example.com",
+                )
+            )
+            db.commit()
+
+
+async def drive(path: str, requests: int, concurrency: int) -> float:
+    """Return the number of requests per second"""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench"
+    ) as client:
+
+        async def worker(queue):
+            for _ in queue:
+                response = await client.get(path)
+                response.raise_for_status()
+
+        async def run(count: int):
+            queue = iter(range(count))
+            await asyncio.gather(*(worker(queue) for _ in range(concurrency)))
+
+        await run(concurrency)  # warm up the connection pools
+        start = time.perf_counter()
+        await run(requests)
+        return requests / (time.perf_counter() - start)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    args = parser.parse_args()
+
+    seed()
+    for kind in ("sync", "async"):
+        rate = await drive(f"/{kind}/{USERNAME}", args.requests, args.concurrency)
+        print(f"{kind:<6} route: {rate:8.0f} requests/sec")
+
+    await get_async_engine().dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,87 @@
+"""
+Per-request overhead of authenticating with `CurrentUser`, with and without
+the verified token cache.
+
+Drives a bare FastAPI app through the ASGI harness of `bench_rate_limiter`
+(no network, no HTTP client), comparing a route depending on `CurrentUser`
+with a public one, every request carrying the same access token.
+
+    python -m benchmarks.bench_auth --requests 20000
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+os.environ.setdefault("DATABASE_URI", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+from fastapi import FastAPI  # noqa: E402
+
+from app.core.security.token import Token, UserDataPayload, token_cache  # noqa: E402
+from app.dependencies import CurrentUser  # noqa: E402
+from benchmarks.bench_rate_limiter import make_receive, make_scope, send  # noqa: E402
+
+app = FastAPI()
+
+
+@app.get("/public")
+async def public():
+    return None
+
+
+@app.get("/private")
+async def private(current_user: CurrentUser):
+    return None
+
+
+async def run(path: str, token: str, requests: int) -> float:
+    """Return the mean time per request in microseconds"""
+    scope = make_scope(path)
+    scope["headers"].append((b"authorization", f"Bearer {token}".encode()))
+    for _ in range(200):
+        await app(dict(scope), make_receive(), send)
+
+    start = time.perf_counter()
+    for _ in range(requests):
+        await app(dict(scope), make_receive(), send)
+    return (time.perf_counter() - start) / requests * 1e6
+
+
+def measure(path: str, token: str, requests: int, repeat: int) -> float:
+    return statistics.median(
+        asyncio.run(run(path, token, requests)) for _ in range(repeat)
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    token = Token(payload=UserDataPayload(id="bench", role="user"))
+    token = token.create_access_token().token
+    baseline = measure("/public", token, args.requests, args.repeat)
+
+    maxsize = token_cache.maxsize
+    token_cache.maxsize = 0
+    uncached = measure("/private", token, args.requests, args.repeat)
+
+    token_cache.maxsize = maxsize
+    token_cache.clear()
+    cached = measure("/private", token, args.requests, args.repeat)
+    info = token_cache.info()
+
+    print(f"public route           : {baseline:8.1f} us/request")
+    print(f"authenticated, no cache: {uncached:8.1f} us/request")
+    print(f"  auth overhead        : {uncached - baseline:8.1f} us/request")
+    print(f"authenticated, cached  : {cached:8.1f} us/request")
+    print(f"  auth overhead        : {cached - baseline:8.1f} us/request")
+    print(f"cache hits {info['hits']}, misses {info['misses']}")
+
+
+if __name__ == "__main__":
+    main()
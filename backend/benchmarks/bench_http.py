@@ -0,0 +1,364 @@
+"""
+End-to-end HTTP benchmark of `app.main:app` against a seeded database.
+
+Seeds a throwaway SQLite database with `app.seed_database` (or uses
+`DATABASE_URI` as is with `--no-seed`), then drives the key endpoints through
+the whole app, middlewares included, with `--concurrency` clients. Each
+scenario runs on its own and reports throughput, latency percentiles and SQL
+statements per request. `--output` writes them as JSON, `--compare` checks
+them against a previous run and exits with 1 on regressions.
+
+    python -m benchmarks.bench_http --output before.json
+    python -m benchmarks.bench_http --compare before.json
+    DATABASE_URI=postgresql://... python -m benchmarks.bench_http --no-seed
+
+Rate limiting is disabled, logins would only measure it.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from typing import Callable, Dict, List, Optional
+
+os.environ.setdefault(
+    "DATABASE_URI", f"sqlite:///{tempfile.mkdtemp()}/bench_http.sqlite"
+)
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+import httpx  # noqa: E402
+from sqlalchemy import event, func, inspect, text  # noqa: E402
+from sqlmodel import Session, select  # noqa: E402
+
+from app.api.models import Challenge, ChallengeTakers, User  # noqa: E402
+from app.api.models.challenges import ApprovalStatus  # noqa: E402
+from app.core.database import engine, get_async_engine  # noqa: E402
+from app.core.security.token import Token, UserDataPayload  # noqa: E402
+from app.main import app  # noqa: E402
+from app.seed_database import PASSWORD, populate_database  # noqa: E402
+from benchmarks.bench_rate_limiter import use_middleware  # noqa: E402
+
+PERCENTILES = (50, 90, 95, 99)
+
+
+class Fixtures:
+    """Slugs, usernames and cursors requested by the scenarios"""
+
+    def __init__(self, slugs: list, usernames: list, user_id: str, topics: list):
+        self.slugs = slugs
+        self.usernames = usernames
+        self.topics = topics
+        self.cursors: List[str] = []
+        token = Token(payload=UserDataPayload(id=user_id, role="user"))
+        self.auth = {"Authorization": f"Bearer {token.create_access_token().token}"}
+
+    def popular(self, rng: random.Random, values: list):
+        """Mostly the first values, which are the most popular ones"""
+        return values[min(int(rng.expovariate(1 / 10)), len(values) - 1)]
+
+
+def seed(users: int, challenges: int):
+    with Session(engine) as db:
+        if engine.dialect.name == "sqlite":
+            # readers would otherwise wait on the login inserts
+            db.exec(text("PRAGMA journal_mode=WAL"))
+    if inspect(engine).has_table("users"):
+        with Session(engine) as db:
+            if db.exec(select(func.count()).select_from(User)).one():
+                return
+    populate_database(users, challenges, create_tables=True, verbose=False)
+
+
+def load_fixtures() -> Fixtures:
+    with Session(engine) as db:
+        takes = func.count(ChallengeTakers.user_id)
+        slugs = db.exec(
+            select(Challenge.slug)
+            .join(ChallengeTakers, isouter=True)
+            .where(Challenge.approval == ApprovalStatus.APPROVED)
+            .group_by(Challenge.id)
+            .order_by(takes.desc())
+            .limit(200)
+        ).all()
+        takers = db.exec(
+            select(User.id, User.username)
+            .join(ChallengeTakers)
+            .group_by(User.id)
+            .order_by(func.count().desc())
+            .limit(200)
+        ).all()
+        topics = db.exec(
+            text(
+                "SELECT topics.name FROM topics JOIN challenge_topics"
+                " ON topics.id = challenge_topics.topic_id"
+                " GROUP BY topics.name ORDER BY count(*) DESC LIMIT 5"
+            )
+        ).all()
+    if not slugs or not takers:
+        sys.exit("The database has no approved challenge or no challenge taker")
+    return Fixtures(
+        slugs=list(slugs),
+        usernames=[username for _, username in takers],
+        user_id=str(takers[0][0]),
+        topics=[name for name, in topics],
+    )
+
+
+def scenarios(fixtures: Fixtures) -> Dict[str, Callable]:
+    """Name to a function building `(method, url, request options)`"""
+    f = fixtures
+    return {
+        "available": lambda rng: ("GET", "/challenge/available?limit=20", {}),
+        "available_offset": lambda rng: (
+            "GET",
+            f"/challenge/available?limit=20&offset={rng.randrange(0, 2000, 20)}",
+            {},
+        ),
+        "available_cursor": lambda rng: (
+            "GET",
+            f"/challenge/available?limit=20&cursor={rng.choice(f.cursors)}",
+            {},
+        ),
+        "available_popular": lambda rng: (
+            "GET",
+            "/challenge/available?limit=20&sort=popular",
+            {},
+        ),
+        "trending": lambda rng: ("GET", "/challenge/trending?limit=20", {}),
+        "available_topics": lambda rng: (
+            "GET",
+            "/challenge/available",
+            {"params": {"limit": 20, "topics": rng.sample(f.topics, 2)}},
+        ),
+        "available_title": lambda rng: (
+            "GET",
+            "/challenge/available",
+            {"params": {"limit": 20, "title": rng.choice(["chat", "build", "game"])}},
+        ),
+        "view": lambda rng: (
+            "GET",
+            f"/challenge/view/{f.popular(rng, f.slugs)}",
+            {},
+        ),
+        "view_authenticated": lambda rng: (
+            "GET",
+            f"/challenge/view/{f.popular(rng, f.slugs)}",
+            {"headers": f.auth},
+        ),
+        "user": lambda rng: ("GET", f"/user/{rng.choice(f.usernames)}", {}),
+        "taken_all": lambda rng: (
+            "GET",
+            f"/challenge/{f.popular(rng, f.usernames)}/taken-all?limit=20",
+            {},
+        ),
+        "login": lambda rng: (
+            "POST",
+            "/auth/login/token",
+            {"data": {"username": f.popular(rng, f.usernames), "password": PASSWORD}},
+        ),
+    }
+
+
+class StatementCounter:
+    def __init__(self):
+        self.count = 0
+        self.targets = [engine, get_async_engine().sync_engine]
+
+    def __enter__(self):
+        self.count = 0
+        for target in self.targets:
+            event.listen(target, "before_cursor_execute", self.record)
+        return self
+
+    def __exit__(self, *exc):
+        for target in self.targets:
+            event.remove(target, "before_cursor_execute", self.record)
+
+    def record(self, *args):
+        self.count += 1
+
+
+async def collect_cursors(client: httpx.AsyncClient, fixtures: Fixtures, pages: int):
+    """Cursors of the first `pages` pages of the listing"""
+    url = "/challenge/available?limit=20"
+    for _ in range(pages):
+        response = (await client.get(url)).json()
+        if not response["nextCursor"]:
+            break
+        fixtures.cursors.append(response["nextCursor"])
+        url = f"/challenge/available?limit=20&cursor={response['nextCursor']}"
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    build: Callable,
+    requests: int,
+    concurrency: int,
+    seed: int,
+) -> dict:
+    rng = random.Random(seed)
+    latencies, statuses = [], Counter()
+    remaining = requests
+
+    async def worker():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            method, url, options = build(rng)
+            started = time.perf_counter()
+            response = await client.request(method, url, **options)
+            latencies.append((time.perf_counter() - started) * 1000)
+            statuses[response.status_code] += 1
+
+    # warm up caches and connection pools, not measured
+    for _ in range(min(20, requests)):
+        method, url, options = build(rng)
+        await client.request(method, url, **options)
+
+    with StatementCounter() as statements:
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": requests,
+        "errors": sum(n for status, n in statuses.items() if status >= 400),
+        "statuses": {str(status): n for status, n in sorted(statuses.items())},
+        "throughput_rps": round(requests / elapsed, 1),
+        "latency_ms": {
+            "mean": round(statistics.fmean(latencies), 2),
+            **{
+                f"p{p}": round(
+                    latencies[min(len(latencies) * p // 100, requests - 1)], 2
+                )
+                for p in PERCENTILES
+            },
+            "max": round(latencies[-1], 2),
+        },
+        "sql_per_request": round(statements.count / requests, 2),
+    }
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(report: dict, baseline: dict, tolerance: float) -> List[str]:
+    """Regressions of `report` against `baseline`, as readable lines"""
+    regressions = []
+    for name, result in report["scenarios"].items():
+        before = baseline["scenarios"].get(name)
+        if before is None:
+            continue
+        checks = (
+            ("p95", result["latency_ms"]["p95"], before["latency_ms"]["p95"], 1),
+            ("throughput", result["throughput_rps"], before["throughput_rps"], -1),
+        )
+        for metric, now, then, direction in checks:
+            if then and (now - then) / then * direction > tolerance:
+                regressions.append(f"{name}: {metric} {then} -> {now}")
+        # statements are deterministic, any new one is a regression
+        if result["sql_per_request"] > before["sql_per_request"]:
+            regressions.append(
+                f"{name}: SQL per request {before['sql_per_request']}"
+                f" -> {result['sql_per_request']}"
+            )
+    return regressions
+
+
+def print_report(report: dict):
+    print(
+        f"{'scenario':<20} {'req/s':>8} {'p50':>8} {'p95':>8} {'p99':>8}"
+        f" {'SQL/req':>8} {'errors':>7}"
+    )
+    for name, result in report["scenarios"].items():
+        latency = result["latency_ms"]
+        print(
+            f"{name:<20} {result['throughput_rps']:>8.1f} {latency['p50']:>6.1f}ms"
+            f" {latency['p95']:>6.1f}ms {latency['p99']:>6.1f}ms"
+            f" {result['sql_per_request']:>8.2f} {result['errors']:>7}"
+        )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=20_000)
+    parser.add_argument("--challenges", type=int, default=5_000)
+    parser.add_argument("--no-seed", action="store_true")
+    parser.add_argument("--requests", type=int, default=500, help="per scenario")
+    parser.add_argument(
+        "--login-requests", type=int, default=50, help="logins hash passwords"
+    )
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument(
+        "--scenario", action="append", help="only these scenarios, repeatable"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the report to this JSON file")
+    parser.add_argument("--compare", help="report of a previous run")
+    parser.add_argument(
+        "--tolerance", type=float, default=0.2, help="allowed relative slowdown"
+    )
+    args = parser.parse_args()
+
+    if not args.no_seed:
+        seed(args.users, args.challenges)
+    fixtures = load_fixtures()
+    use_middleware(None)
+
+    report = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "database": engine.dialect.name,
+        "concurrency": args.concurrency,
+        "users": args.users,
+        "challenges": args.challenges,
+        "scenarios": {},
+    }
+    transport = httpx.ASGITransport(app=app, root_path="")
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench", timeout=None
+    ) as client:
+        await collect_cursors(client, fixtures, pages=50)
+        for name, build in scenarios(fixtures).items():
+            if args.scenario and name not in args.scenario:
+                continue
+            requests = args.login_requests if name == "login" else args.requests
+            report["scenarios"][name] = await run_scenario(
+                client, build, requests, args.concurrency, args.seed
+            )
+    await get_async_engine().dispose()
+
+    print_report(report)
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+
+    if args.compare:
+        with open(args.compare) as file:
+            regressions = compare(report, json.load(file), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,133 @@
+"""
+Latency of a read endpoint while a storm of logins hashes passwords.
+
+A reader requests /challenge/available back to back, first alone, then while
+`--concurrency` clients hammer /auth/login/token. With `--shared-threadpool`
+password checks run on Starlette's threadpool, as the sync login route did,
+instead of the dedicated bounded pool; compare both runs.
+
+    python -m benchmarks.bench_login_storm --rounds 12
+    python -m benchmarks.bench_login_storm --rounds 12 --shared-threadpool
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from collections import Counter
+
+os.environ.setdefault(
+    "DATABASE_URI", f"sqlite:///{tempfile.mkdtemp()}/bench_login_storm.sqlite"
+)
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ["PASSWORD_HASHER"] = "bcrypt"
+
+import httpx  # noqa: E402
+from sqlalchemy import text  # noqa: E402
+from sqlmodel import Session, SQLModel, select  # noqa: E402
+from starlette.concurrency import run_in_threadpool  # noqa: E402
+
+from app.api.models import User  # noqa: E402
+from app.core.database import engine, get_async_engine  # noqa: E402
+from app.core.security import password as password_utils  # noqa: E402
+from app.main import app  # noqa: E402
+from benchmarks.bench_rate_limiter import use_middleware  # noqa: E402
+
+USERNAME = "bench-login-storm"
+PASSWORD = "bench-password"
+
+
+def seed(rounds: int):
+    """Create the user logging in, with a password hashed at `rounds`"""
+    SQLModel.metadata.create_all(engine)
+    password_utils.HASHERS["bcrypt"].rounds = rounds
+    with Session(engine) as db:
+        if engine.dialect.name == "sqlite":
+            # readers would otherwise wait on the last login inserts
+            db.exec(text("PRAGMA journal_mode=WAL"))
+        user = db.exec(select(User).where(User.username == USERNAME)).first()
+        if user is None:
+            user = User(
+                first_name="Bench",
+                last_name="Mark",
+                username=USERNAME,
+                email=f"{USERNAME}@example.com",
+            )
+        user.password = password_utils.get_password_hash(PASSWORD)
+        db.add(user)
+        db.commit()
+
+
+async def read_latencies(client: httpx.AsyncClient, count: int) -> list:
+    """Milliseconds of `count` sequential reads"""
+    latencies = []
+    for _ in range(count):
+        started = time.perf_counter()
+        response = await client.get("/challenge/available?limit=20")
+        response.raise_for_status()
+        latencies.append((time.perf_counter() - started) * 1000)
+    return latencies
+
+
+async def storm(client: httpx.AsyncClient, stop: asyncio.Event):
+    statuses = Counter()
+
+    async def login():
+        while not stop.is_set():
+            response = await client.post(
+                "/auth/login/token",
+                data={"username": USERNAME, "password": PASSWORD},
+            )
+            statuses[response.status_code] += 1
+            if response.status_code == 503:
+                await asyncio.sleep(0.05)
+
+    return statuses, login
+
+
+def summary(latencies: list) -> str:
+    latencies = sorted(latencies)
+    p95 = latencies[int(len(latencies) * 0.95)]
+    return f"median {statistics.median(latencies):7.1f}ms  p95 {p95:7.1f}ms"
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rounds", type=int, default=12, help="bcrypt cost")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--reads", type=int, default=200)
+    parser.add_argument("--shared-threadpool", action="store_true")
+    args = parser.parse_args()
+
+    seed(args.rounds)
+    use_middleware(None)  # the storm would only measure the login rate limit
+    if args.shared_threadpool:
+        password_utils.password_pool.run = run_in_threadpool
+
+    transport = httpx.ASGITransport(app=app, root_path="")
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench", timeout=None
+    ) as client:
+        await read_latencies(client, 20)  # warm up
+        alone = await read_latencies(client, args.reads)
+
+        stop = asyncio.Event()
+        statuses, login = await storm(client, stop)
+        logins = [asyncio.create_task(login()) for _ in range(args.concurrency)]
+        await asyncio.sleep(0.5)  # let the storm fill the pools
+        stormed = await read_latencies(client, args.reads)
+        stop.set()
+        await asyncio.gather(*logins)
+
+    mode = "shared threadpool" if args.shared_threadpool else "password pool"
+    print(f"bcrypt cost {args.rounds}, {args.concurrency} clients logging in, {mode}")
+    print(f"reads alone        : {summary(alone)}")
+    print(f"reads during storm : {summary(stormed)}")
+    print(f"login responses    : {dict(statuses)}")
+    await get_async_engine().dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,208 @@
+"""
+Per-request overhead of RateLimiterMiddleware.
+
+Drives `app.main:app` through a bare ASGI harness (no network, no HTTP client)
+with and without the rate limiter in the middleware stack and reports the
+difference, for allowed requests and for requests rejected with a 429. The
+same is measured for `BaseHTTPRateLimiter`, the BaseHTTPMiddleware version
+the limiter was before it became a pure ASGI middleware.
+
+    python -m benchmarks.bench_rate_limiter --requests 20000
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from typing import Dict, Optional
+
+from fastapi import FastAPI, HTTPException, Request, Response
+from starlette.middleware import Middleware
+from starlette.middleware.base import BaseHTTPMiddleware
+
+# allowed requests must never hit the default limit
+os.environ.setdefault("DATABASE_URI", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ["REQUESTS_LIMIT"] = str(10**9)
+
+from app.main import app  # noqa: E402
+from app.middlewares import RateLimiterMiddleware  # noqa: E402
+from app.core.rate_limit import (  # noqa: E402
+    MemoryStorage,
+    RateLimitPolicies,
+    RateLimitPolicy,
+    RateLimitStorage,
+)
+from app.core.security.token import decode_token  # noqa: E402
+
+
+class BaseHTTPRateLimiter(BaseHTTPMiddleware):
+    """RateLimiterMiddleware as it was on BaseHTTPMiddleware, for comparison"""
+
+    def __init__(
+        self,
+        app: FastAPI,
+        default_policy: RateLimitPolicy,
+        policies: Optional[Dict[str, RateLimitPolicy]] = None,
+        storage: Optional[RateLimitStorage] = None,
+    ):
+        super().__init__(app)
+        self.policies = RateLimitPolicies(default_policy, policies)
+        self.storage = storage if storage is not None else MemoryStorage()
+
+    def get_user_id(self, request: Request) -> Optional[str]:
+        token = request.cookies.get("access_token")
+        authorization = request.headers.get("authorization", "")
+        if authorization[:7].lower() == "bearer ":
+            token = authorization[7:]
+        if not token:
+            return None
+
+        try:
+            return decode_token(token=token).sub.id
+        except HTTPException:
+            return None
+
+    async def dispatch(self, request: Request, call_next) -> Response:
+        client_ip = request.client.host if request.client else "127.0.0.1"
+
+        route_path = request.url.path
+        root_path = request.scope.get("root_path", "")
+        if root_path and route_path.startswith(root_path):
+            route_path = route_path[len(root_path) :] or "/"
+
+        try:
+            scope, policy = self.policies.match(route_path)
+
+            identity = f"ip:{client_ip}"
+            if policy.key == "user":
+                user_id = self.get_user_id(request)
+                if user_id:
+                    identity = f"user:{user_id}"
+
+            key = f"{policy.algorithm}:{identity}:{scope}"
+            result = await policy.strategy.hit(
+                self.storage, key, policy.limit, policy.window
+            )
+
+            headers = {
+                "X-RateLimit-Limit": str(result.limit),
+                "X-RateLimit-Remaining": str(result.remaining),
+                "X-RateLimit-Reset": str(result.reset_after),
+            }
+
+            if not result.allowed:
+                return Response(
+                    status_code=429,
+                    content="Rate limit exceeded. Please try again later.",
+                    headers={**headers, "Retry-After": str(result.reset_after)},
+                )
+
+            response = await call_next(request)
+            response.headers.update(headers)
+            return response
+
+        except HTTPException as e:
+            raise e
+        except Exception as e:
+            print(f"Unexpected error: {e}")
+            raise HTTPException(status_code=500, detail="Internal Server Error")
+
+
+LIMITERS = (RateLimiterMiddleware, BaseHTTPRateLimiter)
+
+
+def make_scope(path: str) -> dict:
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"testserver")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("testserver", 80),
+    }
+
+
+def make_receive():
+    request_sent = False
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        # the client never disconnects, waiters get cancelled with the response
+        await asyncio.Event().wait()
+
+    return receive
+
+
+async def send(message):
+    pass
+
+
+def use_middleware(rate_limiter_options, limiter=RateLimiterMiddleware):
+    """Rebuild the app middleware stack with or without the rate limiter"""
+    app.user_middleware = [
+        middleware
+        for middleware in app.user_middleware
+        if middleware.cls not in LIMITERS
+    ]
+    if rate_limiter_options is not None:
+        app.user_middleware.insert(0, Middleware(limiter, **rate_limiter_options))
+    app.middleware_stack = None
+
+
+async def run(path: str, requests: int) -> float:
+    """Return the mean time per request in microseconds"""
+    # warm up, builds the middleware stack and the route caches
+    for _ in range(200):
+        await app(make_scope(path), make_receive(), send)
+
+    start = time.perf_counter()
+    for _ in range(requests):
+        await app(make_scope(path), make_receive(), send)
+    return (time.perf_counter() - start) / requests * 1e6
+
+
+def measure(path: str, requests: int, repeat: int) -> float:
+    return statistics.median(asyncio.run(run(path, requests)) for _ in range(repeat))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--path", default="/api/v1/")
+    args = parser.parse_args()
+
+    original = [m for m in app.user_middleware if m.cls is RateLimiterMiddleware]
+    options = original[0].kwargs
+
+    use_middleware(None)
+    baseline = measure(args.path, args.requests, args.repeat)
+
+    print(f"without rate limiter : {baseline:8.1f} us/request")
+    for limiter in LIMITERS:
+        use_middleware(options, limiter)
+        allowed = measure(args.path, args.requests, args.repeat)
+
+        strict = RateLimitPolicy(limit=1, window=3600)
+        use_middleware({**options, "default_policy": strict}, limiter)
+        rejected = measure(args.path, args.requests, args.repeat)
+
+        print(f"{limiter.__name__}")
+        print(f"  allowed requests   : {allowed:8.1f} us/request")
+        print(f"  overhead           : {allowed - baseline:8.1f} us/request")
+        print(f"  rejected (429)     : {rejected:8.1f} us/request")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+Latency of the challenge search, keystroke by keystroke, against the former
+`title ILIKE '%...%'` filter.
+
+Seeds `--challenges` challenges (100k by default) made of random words, then
+times a page of 20 results for every prefix of a few queries. On Postgres the
+search runs on the GIN indexed search vector, elsewhere on the in-process
+index whose build time is reported separately.
+
+    DATABASE_URI=postgresql://... python -m benchmarks.bench_search
+"""
+
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+os.environ.setdefault(
+    "DATABASE_URI", f"sqlite:///{tempfile.mkdtemp()}/bench_search.sqlite"
+)
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+from slugify import slugify  # noqa: E402
+from sqlalchemy import func, insert  # noqa: E402
+from sqlmodel import Session, SQLModel, col, select  # noqa: E402
+
+from app.api.crud import challenges as challenges_crud, search  # noqa: E402
+from app.api.models import Challenge, ChallengeTopic, Topic, User  # noqa: E402
+from app.api.models.challenges import ApprovalStatus, DifficultyTag  # noqa: E402
+from app.core.database import engine  # noqa: E402
+
+WORDS = (
+    "api auth blog cache chat cli clone compiler crawler dashboard database "
+    "deploy docker editor engine feed game graph inventory kafka kanban "
+    "leaderboard markdown message mobile monitor notes parser payment pipeline "
+    "portfolio python queue react realtime recipe redis rest scheduler scraper "
+    "search server shop social storage stream tracker tutorial upload voting "
+    "weather web websocket wiki workflow"
+).split()
+# long tail of words making up most of the descriptions
+FILLER = [f"{a}{b}{c}" for a in "bdfgklmnprstvz" for b in "aeiou" for c in "lmnrstx"]
+TOPICS = "python javascript go rust sql docker react django fastapi redis".split()
+QUERIES = ("python web", "realtime chat server", "redis cache", "zzz")
+
+
+def seed(count: int, batch: int = 5000):
+    SQLModel.metadata.create_all(engine)
+    rng = random.Random(42)
+    with Session(engine) as db:
+        if db.exec(select(func.count()).select_from(Challenge)).one() >= count:
+            return
+        user = User(
+            first_name="Bench",
+            last_name="Mark",
+            username="bench-search",
+            email="bench-search@example.com",
+        )
+        topics = [Topic(id=uuid.uuid4(), name=name) for name in TOPICS]
+        db.add(user)
+        db.add_all(topics)
+        db.commit()
+
+        start = datetime(2024, 1, 1)
+        for offset in range(0, count, batch):
+            challenges, links = [], []
+            for i in range(offset, min(offset + batch, count)):
+                id = uuid.uuid4()
+                title = " ".join(rng.sample(WORDS, 3)).capitalize()
+                challenges.append(
+                    {
+                        "id": id,
+                        "title": title,
+                        "slug": f"{slugify(title)}-{id}",
+                        "description": " ".join(
+                            rng.choices(WORDS, k=5) + rng.choices(FILLER, k=55)
+                        ),
+                        "difficulty_tag": DifficultyTag.BEGINNER,
+                        "contributor_id": user.id,
+                        "approval": ApprovalStatus.APPROVED,
+                        "created_at": start + timedelta(seconds=i),
+                    }
+                )
+                links.extend(
+                    {"challenge_id": id, "topic_id": topic.id}
+                    for topic in rng.sample(topics, 2)
+                )
+            db.exec(insert(Challenge), params=challenges)
+            db.exec(insert(ChallengeTopic), params=links)
+            db.commit()
+    search.search_index.invalidate()
+
+
+def ilike(db: Session, query: str):
+    statement = (
+        select(Challenge)
+        .where(Challenge.approval == ApprovalStatus.APPROVED)
+        .where(col(Challenge.title).ilike(f"%{query}%"))
+        .order_by(col(Challenge.created_at).desc())
+        .limit(20)
+        .options(*challenges_crud.CHALLENGE_INFO_OPTIONS)
+    )
+    return db.exec(statement).all()
+
+
+def fulltext(db: Session, query: str):
+    return challenges_crud.db_search_challenges(db, query=query, limit=20)
+
+
+def measure(db: Session, lookup, repeat: int) -> list:
+    """Milliseconds per lookup, for every prefix of every query"""
+    timings = []
+    for query in QUERIES:
+        for end in range(1, len(query) + 1):
+            for _ in range(repeat):
+                started = time.perf_counter()
+                lookup(db, query[:end])
+                timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--challenges", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    seed(args.challenges)
+    print(
+        f"seeded {args.challenges} challenges in {time.perf_counter() - started:.1f}s"
+    )
+
+    with Session(engine) as db:
+        if not search.is_fulltext_supported(db):
+            started = time.perf_counter()
+            search.search_index.search(db, [])
+            print(
+                f"built the in-process index of {len(search.search_index)} "
+                f"challenges in {time.perf_counter() - started:.1f}s"
+            )
+
+        for name, lookup in (("ilike", ilike), ("search", fulltext)):
+            timings = sorted(measure(db, lookup, args.repeat))
+            print(
+                f"{name:>6}: median {statistics.median(timings):7.2f}ms  "
+                f"p95 {timings[int(len(timings) * 0.95)]:7.2f}ms  "
+                f"max {timings[-1]:7.2f}ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
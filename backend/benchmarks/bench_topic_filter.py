@@ -0,0 +1,159 @@
+"""
+Latency of the topic filter of /challenge/available as the number of requested
+topics grows, for the former join + IN filter and the semi-joins of the "any" and
+"all" modes.
+
+Seeds `--challenges` approved challenges tagged with `--tags` of `--topics`
+topics, then times a page of 20 at offset 0 and at `--offset` for 1, 2, 4...
+requested topics. The former filter is also checked for duplicated rows.
+
+    DATABASE_URI=postgresql://... python -m benchmarks.bench_topic_filter
+"""
+
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+os.environ.setdefault(
+    "DATABASE_URI", f"sqlite:///{tempfile.mkdtemp()}/bench_topic_filter.sqlite"
+)
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+from sqlalchemy import func, insert  # noqa: E402
+from sqlmodel import Session, SQLModel, col, select  # noqa: E402
+
+from app.api.crud import challenges as challenges_crud  # noqa: E402
+from app.api.crud.topics import topic_catalog  # noqa: E402
+from app.api.models import Challenge, ChallengeTopic, Topic, User  # noqa: E402
+from app.api.models.challenges import ApprovalStatus, DifficultyTag  # noqa: E402
+from app.core.database import engine  # noqa: E402
+
+
+def seed(challenges: int, topics: int, tags: int, batch: int = 5000) -> list:
+    """Create the dataset if needed and return the topic names"""
+    SQLModel.metadata.create_all(engine)
+    names = [f"topic-{i}" for i in range(topics)]
+    rng = random.Random(42)
+    with Session(engine) as db:
+        if db.exec(select(func.count()).select_from(Challenge)).one() >= challenges:
+            return names
+        user = User(
+            first_name="Bench",
+            last_name="Mark",
+            username="bench-topics",
+            email="bench-topics@example.com",
+        )
+        topic_ids = [uuid.uuid4() for _ in names]
+        db.add(user)
+        db.add_all(Topic(id=id, name=name) for id, name in zip(topic_ids, names))
+        db.commit()
+
+        start = datetime(2024, 1, 1)
+        for offset in range(0, challenges, batch):
+            rows, links = [], []
+            for i in range(offset, min(offset + batch, challenges)):
+                id = uuid.uuid4()
+                rows.append(
+                    {
+                        "id": id,
+                        "title": f"Challenge {i}",
+                        "slug": f"challenge-{i}-{id}",
+                        "description": "",
+                        "difficulty_tag": DifficultyTag.BEGINNER,
+                        "contributor_id": user.id,
+                        "approval": ApprovalStatus.APPROVED,
+                        "created_at": start + timedelta(seconds=i),
+                    }
+                )
+                links.extend(
+                    {"challenge_id": id, "topic_id": topic_id}
+                    for topic_id in rng.sample(topic_ids, tags)
+                )
+            db.exec(insert(Challenge), params=rows)
+            db.exec(insert(ChallengeTopic), params=links)
+            db.commit()
+    return names
+
+
+def joined(db: Session, topics: list, offset: int):
+    """The filter as it was, a join multiplying challenges by matching tags"""
+    return (
+        select(Challenge.id)
+        .where(Challenge.approval == ApprovalStatus.APPROVED)
+        .join(ChallengeTopic)
+        .join(Topic)
+        .where(col(Topic.name).in_(topics))
+        .order_by(col(Challenge.created_at).desc(), col(Challenge.id).desc())
+        .limit(20)
+        .offset(offset)
+    )
+
+
+def semi_join(match: str):
+    def statement(db: Session, topics: list, offset: int):
+        # names are resolved by the topic catalog, as db_available_challenges does
+        topic_ids = topic_catalog.get(db).ids(topics)
+        return (
+            select(Challenge.id)
+            .where(Challenge.approval == ApprovalStatus.APPROVED)
+            .where(challenges_crud.topics_filter(topic_ids, match))
+            .order_by(col(Challenge.created_at).desc(), col(Challenge.id).desc())
+            .limit(20)
+            .offset(offset)
+        )
+
+    return statement
+
+
+def timed(db: Session, statement, repeat: int):
+    """Median milliseconds of `repeat` runs and the rows of the last one"""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        rows = db.exec(statement).all()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings), rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--challenges", type=int, default=50_000)
+    parser.add_argument("--topics", type=int, default=50)
+    parser.add_argument("--tags", type=int, default=4)
+    parser.add_argument("--offset", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    names = seed(args.challenges, args.topics, args.tags)
+    filters = (
+        ("join + IN", joined),
+        ("any", semi_join("any")),
+        ("all", semi_join("all")),
+    )
+
+    print(
+        f"{'topics':>6} {'filter':>10} {'offset 0':>10} {'offset ' + str(args.offset):>12}"
+    )
+    with Session(engine) as db:
+        fan_out = 1
+        while fan_out <= min(16, args.topics):
+            for name, statement in filters:
+                first, rows = timed(db, statement(db, names[:fan_out], 0), args.repeat)
+                deep, _ = timed(
+                    db, statement(db, names[:fan_out], args.offset), args.repeat
+                )
+                duplicates = len(rows) - len(set(rows))
+                print(
+                    f"{fan_out:>6} {name:>10} {first:>8.2f}ms {deep:>10.2f}ms"
+                    + (f"  {duplicates} duplicated rows" if duplicates else "")
+                )
+            fan_out *= 2
+
+
+if __name__ == "__main__":
+    main()
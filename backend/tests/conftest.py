@@ -0,0 +1,174 @@
+import asyncio
+import os
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+# settings are read at import time
+os.environ.setdefault("DATABASE_URI", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+# cheap password hashing, bcrypt spends most of the CPU of a test otherwise
+os.environ.setdefault("PASSWORD_HASHER", "pbkdf2_sha256")
+os.environ.setdefault("PBKDF2_ITERATIONS", "1")
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlmodel import Session, SQLModel, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.main import app, rate_limit_storage
+from app.api.crud.search import search_index
+from app.api.crud.topics import topic_catalog
+from app.api.crud.trending import trending_ranking
+from app.api.models import Challenge, Topic, User
+from app.api.models.challenges import ApprovalStatus, DifficultyTag
+from app.core.cache import challenge_cache
+from app.core.database import (
+    get_async_db,
+    get_async_session_factory,
+    get_db,
+    instrument_queries,
+)
+from app.core.security.token import Token, UserDataPayload
+
+
+@pytest.fixture
+def engines(tmp_path):
+    """Sync and async engines on the same throwaway SQLite file"""
+    path = tmp_path / "test.db"
+    engine = create_engine(f"sqlite:///{path}")
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    SQLModel.metadata.create_all(engine)
+    instrument_queries(engine)
+    instrument_queries(async_engine.sync_engine)
+    yield engine, async_engine
+    engine.dispose()
+    asyncio.run(async_engine.dispose())
+
+
+@pytest.fixture
+def db(engines):
+    with Session(engines[0]) as session:
+        yield session
+
+
+@pytest.fixture
+def client(engines):
+    engine, async_engine = engines
+
+    def override_get_db():
+        with Session(engine) as session:
+            yield session
+
+    async def override_get_async_db():
+        async with AsyncSession(async_engine, expire_on_commit=False) as session:
+            yield session
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    app.dependency_overrides[get_async_session_factory] = lambda: async_sessionmaker(
+        async_engine, class_=AsyncSession, expire_on_commit=False
+    )
+    asyncio.run(rate_limit_storage.reset())
+    search_index.invalidate()
+    challenge_cache.clear()
+    topic_catalog.invalidate()
+    trending_ranking.reset()
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+class QueryCounter:
+    def __init__(self):
+        self.statements = []
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+
+@pytest.fixture
+def count_queries(engines):
+    """
+    Count the SQL statements sent to the test database.
+
+        with count_queries() as queries:
+            client.get(...)
+        assert queries.count == 2
+    """
+
+    @contextmanager
+    def counting():
+        counter = QueryCounter()
+
+        def before_cursor_execute(conn, cursor, statement, *args):
+            counter.statements.append(statement)
+
+        targets = [engines[0], engines[1].sync_engine]
+        for target in targets:
+            event.listen(target, "before_cursor_execute", before_cursor_execute)
+        try:
+            yield counter
+        finally:
+            for target in targets:
+                event.remove(target, "before_cursor_execute", before_cursor_execute)
+
+    return counting
+
+
+def make_user(db: Session, username: str) -> User:
+    user = User(
+        first_name=username.title(),
+        last_name="Test",
+        username=username,
+        email=f"{username}@example.com",
+    )
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    return user
+
+
+def make_topics(db: Session, *names: str) -> list[Topic]:
+    topics = [Topic(id=uuid.uuid4(), name=name) for name in names]
+    db.add_all(topics)
+    db.commit()
+    return topics
+
+
+def make_challenges(
+    db: Session,
+    contributor: User,
+    count: int,
+    topics: list[Topic] = [],
+    approval: ApprovalStatus = ApprovalStatus.APPROVED,
+) -> list[Challenge]:
+    """Create `count` challenges, one second apart, the last one is the newest"""
+    start = datetime(2024, 1, 1)
+    challenges = [
+        Challenge(
+            id=uuid.uuid4(),
+            title=f"Challenge {i}",
+            description=f"Description of challenge {i}",
+            difficulty_tag=DifficultyTag.BEGINNER,
+            contributor_id=contributor.id,
+            approval=approval,
+            topic_tags=topics,
+            created_at=start + timedelta(seconds=i),
+        )
+        for i in range(count)
+    ]
+    db.add_all(challenges)
+    db.commit()
+    for challenge in challenges:
+        db.refresh(challenge)
+    return challenges
+
+
+def auth_headers(user: User) -> dict:
+    payload = UserDataPayload(id=str(user.id), role="user")
+    token = Token(payload=payload).create_access_token()
+    return {"Authorization": f"Bearer {token.token}"}
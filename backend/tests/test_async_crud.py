@@ -0,0 +1,59 @@
+import asyncio
+import uuid
+
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.api.models import Challenge, Topic, User
+from app.api.models.challenges import ApprovalStatus, DifficultyTag
+from app.api.crud import async_challenges, async_users
+
+
+def test_async_crud_loads_response_relationships(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}")
+
+    async def scenario():
+        async with engine.begin() as connection:
+            await connection.run_sync(SQLModel.metadata.create_all)
+
+        async with AsyncSession(engine, expire_on_commit=False) as db:
+            user = User(
+                first_name="Ada",
+                last_name="Lovelace",
+                username="ada",
+                email="ada@example.com",
+            )
+            topic = Topic(id=uuid.uuid4(), name="python")
+            db.add(user)
+            db.add(topic)
+            await db.commit()
+
+            challenge = await async_challenges.db_create_challenge(
+                db,
+                contributor_id=user.id,
+                challenge_data={
+                    "title": "Build an api",
+                    "description": "...",
+                    "difficulty_tag": DifficultyTag.BEGINNER,
+                    "approval": ApprovalStatus.APPROVED,
+                    "topic_tags": [topic],
+                },
+            )
+            assert challenge.slug == f"build-an-api-{challenge.id}"
+
+        # a fresh session proves the relationships are loaded eagerly
+        async with AsyncSession(engine, expire_on_commit=False) as db:
+            challenges = await async_challenges.db_available_challenges(
+                db, limit=10, topics=["python"]
+            )
+            assert [c.id for c in challenges] == [challenge.id]
+            assert challenges[0].contributor.username == "ada"
+            assert [t.name for t in challenges[0].topic_tags] == ["python"]
+
+            assert (await async_users.db_get_user(db, username="ada")).id == user.id
+            assert await async_users.db_get_user(db, username="bob") is None
+
+        await engine.dispose()
+
+    asyncio.run(scenario())
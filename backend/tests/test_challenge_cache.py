@@ -0,0 +1,158 @@
+from app.api.models.challenges import ApprovalStatus, ChallengeStatus, ChallengeTakers
+from app.core.cache import ReadThroughCache, challenge_cache
+from tests.conftest import auth_headers, make_challenges, make_topics, make_user
+
+
+def view(client, slug, headers={}):
+    response = client.get(f"/challenge/view/{slug}", headers=headers)
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_view_is_served_from_cache(client, db, count_queries):
+    ada = make_user(db, "ada")
+    (challenge,) = make_challenges(db, ada, 1, make_topics(db, "python"))
+
+    first = view(client, challenge.slug)
+    with count_queries() as queries:
+        second = view(client, challenge.slug)
+
+    assert second == first
+    assert first["challenge"]["topic_tags"][0]["name"] == "python"
+    assert queries.count == 0
+    assert challenge_cache.info()["hits"] == 1
+
+
+def test_take_status_is_not_cached(client, db):
+    ada, grace = make_user(db, "ada"), make_user(db, "grace")
+    (challenge,) = make_challenges(db, ada, 1)
+    db.add(
+        ChallengeTakers(
+            user_id=grace.id, challenge_id=challenge.id, status=ChallengeStatus.PENDING
+        )
+    )
+    db.commit()
+
+    assert view(client, challenge.slug, auth_headers(ada))["accepted_challenge"] is None
+    taken = view(client, challenge.slug, auth_headers(grace))["accepted_challenge"]
+    assert taken["user_id"] == str(grace.id)
+    assert view(client, challenge.slug)["accepted_challenge"] is None
+
+
+def test_update_and_approval_change_invalidate(client, db):
+    ada = make_user(db, "ada")
+    (challenge,) = make_challenges(db, ada, 1)
+    old_slug = challenge.slug
+    view(client, old_slug)
+
+    challenge.title = "Renamed"
+    db.add(challenge)
+    db.commit()
+    db.refresh(challenge)
+
+    assert client.get(f"/challenge/view/{old_slug}").status_code == 404
+    assert view(client, challenge.slug)["challenge"]["title"] == "Renamed"
+
+    challenge.approval = ApprovalStatus.REJECTED
+    db.add(challenge)
+    db.commit()
+
+    assert client.get(f"/challenge/view/{challenge.slug}").status_code == 403
+
+
+def test_counter_changes_invalidate(client, db):
+    ada, grace = make_user(db, "ada"), make_user(db, "grace")
+    (challenge,) = make_challenges(db, ada, 1)
+
+    def counters():
+        document = view(client, challenge.slug)["challenge"]
+        return document["takers_count"], document["submissions_count"]
+
+    before = client.get(f"/challenge/view/{challenge.slug}")
+    assert counters() == (0, 0)
+
+    response = client.post(
+        "/challenge/take-new",
+        json={"challenge_id": str(challenge.id)},
+        headers=auth_headers(grace),
+    )
+    assert response.status_code == 200
+    assert counters() == (1, 0)
+    revalidated = client.get(
+        f"/challenge/view/{challenge.slug}",
+        headers={"If-None-Match": before.headers["etag"]},
+    )
+    assert revalidated.status_code == 200
+
+    response = client.patch(
+        "/challenge/submit-challenge-solution",
+        json={
+            "challenge_id": str(challenge.id),
+            "github_url": "https://github.com/grace/solution",
+            "presentation_video_url": "https://youtu.be/grace",
+        },
+        headers=auth_headers(grace),
+    )
+    assert response.status_code == 200
+    assert counters() == (1, 1)
+
+
+def test_unapproved_challenges_are_not_cached(client, db):
+    ada = make_user(db, "ada")
+    (challenge,) = make_challenges(db, ada, 1, approval=ApprovalStatus.PENDING)
+
+    view(client, challenge.slug, auth_headers(ada))
+
+    assert challenge_cache.info()["size"] == 0
+    assert client.get(f"/challenge/view/{challenge.slug}").status_code == 403
+
+
+def test_shared_backend_fills_local_cache():
+    class DictBackend(dict):
+        def get(self, key):
+            return super().get(key)
+
+        def set(self, key, value, ttl):
+            self[key] = value
+
+        def delete(self, key):
+            self.pop(key, None)
+
+    backend = DictBackend()
+    writer = ReadThroughCache(maxsize=8, ttl=60, backend=backend)
+    reader = ReadThroughCache(maxsize=8, ttl=60, backend=backend)
+
+    writer.set("slug", {"title": "Shared"})
+    assert reader.get("slug") == {"title": "Shared"}
+    assert reader.info()["size"] == 1
+
+    reader.delete("slug")
+    assert "slug" not in backend
+
+
+def test_unreachable_backend_fails_soft(client, db, monkeypatch, caplog):
+    class DownBackend:
+        def get(self, key):
+            raise ConnectionError("backend down")
+
+        set = delete = get
+
+    monkeypatch.setattr(challenge_cache, "backend", DownBackend())
+    ada, grace = make_user(db, "ada"), make_user(db, "grace")
+    (challenge,) = make_challenges(db, ada, 1)
+
+    # read from the database, and cached in process
+    assert view(client, challenge.slug)["challenge"]["takers_count"] == 0
+    assert challenge_cache.info()["size"] == 1
+
+    # committed writes still succeed and drop the local copy
+    response = client.post(
+        "/challenge/take-new",
+        json={"challenge_id": str(challenge.id)},
+        headers=auth_headers(grace),
+    )
+    assert response.status_code == 200
+    assert view(client, challenge.slug)["challenge"]["takers_count"] == 1
+    assert any(
+        record.message.startswith("Cache backend delete") for record in caplog.records
+    )
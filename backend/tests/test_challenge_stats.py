@@ -0,0 +1,123 @@
+import asyncio
+import logging
+
+from sqlalchemy import update
+from sqlmodel import select
+
+from app.api.crud import challenges as challenges_crud
+from app.api.models import Challenge
+from app.api.models.challenges import ChallengeStatus
+from app.reconcile_challenge_stats import reconcile_periodically
+
+from tests.conftest import auth_headers, make_challenges, make_user
+
+
+def take(client, user, challenge):
+    response = client.post(
+        "/challenge/take-new",
+        json={"challenge_id": str(challenge.id)},
+        headers=auth_headers(user),
+    )
+    assert response.status_code == 200
+
+
+def test_counters_follow_takes_and_reviews(client, db):
+    contributor = make_user(db, "ada")
+    takers = [make_user(db, name) for name in ["bob", "carol", "dan"]]
+    (challenge,) = make_challenges(db, contributor, 1)
+    updated_at = challenge.updated_at
+
+    for user in takers:
+        take(client, user, challenge)
+    for user in takers[:2]:
+        response = client.patch(
+            "/challenge/submit-challenge-solution",
+            json={
+                "challenge_id": str(challenge.id),
+                "github_url": f"https://github.com/{user.username}/solution",
+                "presentation_video_url": f"https://youtu.be/{user.username}",
+            },
+            headers=auth_headers(user),
+        )
+        assert response.status_code == 200
+    challenges_crud.db_update_taken_challenge(
+        db,
+        user_id=takers[0].id,
+        challenge_id=challenge.id,
+        _status=ChallengeStatus.ACCEPTED,
+    )
+
+    [info] = client.get("/challenge/available").json()
+    assert (info["takers_count"], info["submissions_count"]) == (3, 2)
+    assert (info["accepted_count"], info["acceptance_rate"]) == (1, 0.5)
+    # the counters are no edit of the challenge
+    db.refresh(challenge)
+    assert challenge.updated_at == updated_at
+
+    # nothing drifted
+    assert challenges_crud.db_reconcile_challenge_stats(db) == 0
+
+
+def test_reconcile_fixes_drifted_counters(client, db):
+    contributor = make_user(db, "ada")
+    taker = make_user(db, "bob")
+    first, second = make_challenges(db, contributor, 2)
+    take(client, taker, first)
+    db.exec(update(Challenge).values(takers_count=7, accepted_count=1))
+    db.commit()
+
+    assert challenges_crud.db_reconcile_challenge_stats(db) == 2
+
+    counts = db.exec(
+        select(Challenge.id, Challenge.takers_count, Challenge.accepted_count)
+    ).all()
+    assert sorted(counts) == sorted([(first.id, 1, 0), (second.id, 0, 0)])
+
+
+def test_periodic_reconcile_logs_fixed_counters(engines, db, caplog):
+    contributor = make_user(db, "ada")
+    make_challenges(db, contributor, 2)
+    db.exec(update(Challenge).values(takers_count=3))
+    db.commit()
+
+    async def run_briefly():
+        task = asyncio.create_task(reconcile_periodically(0.01, bind=engines[0]))
+        await asyncio.sleep(0.5)
+        task.cancel()
+
+    with caplog.at_level(logging.INFO, logger="app.reconcile_challenge_stats"):
+        asyncio.run(run_briefly())
+
+    # fixed once, the later rounds find nothing to fix
+    assert [record.getMessage() for record in caplog.records] == [
+        "Reconciled the counters of 2 challenges"
+    ]
+    assert set(db.exec(select(Challenge.takers_count)).all()) == {0}
+
+
+def test_popular_sort(client, db, count_queries):
+    contributor = make_user(db, "ada")
+    takers = [make_user(db, f"user{i}") for i in range(3)]
+    challenges = make_challenges(db, contributor, 4)
+    # challenge i taken by i users
+    for i, challenge in enumerate(challenges):
+        for user in takers[:i]:
+            take(client, user, challenge)
+    expected = [str(challenge.id) for challenge in reversed(challenges)]
+
+    with count_queries() as queries:
+        page = client.get("/challenge/available?sort=popular&limit=2").json()
+    # ordered by the counter, takers are not aggregated
+    assert not any("GROUP BY" in statement for statement in queries.statements)
+    assert [c["id"] for c in page["data"]] == expected[:2]
+    assert [c["takers_count"] for c in page["data"]] == [3, 2]
+
+    cursor = page["nextCursor"]
+    page = client.get(f"/challenge/available?sort=popular&limit=2&cursor={cursor}")
+    assert [c["id"] for c in page.json()["data"]] == expected[2:]
+    assert page.json()["hasNext"] is False
+
+    # cursors of the newest first listing don't continue this one
+    newest = client.get("/challenge/available?limit=2").json()["nextCursor"]
+    response = client.get(f"/challenge/available?sort=popular&cursor={newest}")
+    assert response.status_code == 400
@@ -0,0 +1,89 @@
+from app.api.models import ChallengeTakers
+from app.api.models.challenges import ChallengeStatus
+from app.core.cache import challenge_cache
+from tests.conftest import (
+    auth_headers,
+    make_challenges,
+    make_topics,
+    make_user,
+)
+
+
+def revalidate(client, url, response, headers={}):
+    return client.get(
+        url, headers={**headers, "If-None-Match": response.headers["ETag"]}
+    )
+
+
+def test_view_not_modified_until_the_challenge_changes(client, db, count_queries):
+    ada = make_user(db, "ada")
+    (challenge,) = make_challenges(db, ada, 1)
+    url = f"/challenge/view/{challenge.slug}"
+
+    first = client.get(url)
+    assert first.headers["Last-Modified"]
+
+    # from the cache
+    assert revalidate(client, url, first).status_code == 304
+    # from the validators alone, the challenge is not loaded
+    challenge_cache.clear()
+    with count_queries() as queries:
+        response = revalidate(client, url, first)
+    assert response.status_code == 304
+    assert response.content == b""
+    assert queries.count == 1
+    since = client.get(
+        url, headers={"If-Modified-Since": first.headers["Last-Modified"]}
+    )
+    assert since.status_code == 304
+
+    challenge.description = "Updated"
+    db.add(challenge)
+    db.commit()
+
+    response = revalidate(client, url, first)
+    assert response.status_code == 200
+    assert response.json()["challenge"]["description"] == "Updated"
+    assert response.headers["ETag"] != first.headers["ETag"]
+
+
+def test_view_etag_depends_on_take_status(client, db):
+    ada, grace = make_user(db, "ada"), make_user(db, "grace")
+    (challenge,) = make_challenges(db, ada, 1)
+    url = f"/challenge/view/{challenge.slug}"
+    headers = auth_headers(grace)
+    first = client.get(url, headers=headers)
+
+    db.add(
+        ChallengeTakers(
+            user_id=grace.id, challenge_id=challenge.id, status=ChallengeStatus.PENDING
+        )
+    )
+    db.commit()
+
+    response = revalidate(client, url, first, headers)
+    assert response.status_code == 200
+    assert response.json()["accepted_challenge"]["user_id"] == str(grace.id)
+    # users are told apart by token or cookie, both 200 and 304 say so
+    assert response.headers["Vary"] == "Authorization, Cookie"
+    assert revalidate(client, url, response, headers).headers["Vary"] == (
+        "Authorization, Cookie"
+    )
+
+
+def test_available_and_topics_not_modified(client, db):
+    ada = make_user(db, "ada")
+    make_challenges(db, ada, 3, make_topics(db, "python"))
+
+    for url in ("/challenge/available?limit=2", "/challenge/topics"):
+        first = client.get(url)
+        assert first.headers["Cache-Control"] == "no-cache"
+        assert revalidate(client, url, first).status_code == 304
+
+    # another page has its own tag
+    page = client.get("/challenge/available?limit=2")
+    other = client.get("/challenge/available?limit=1")
+    assert other.headers["ETag"] != page.headers["ETag"]
+
+    make_topics(db, "rust")
+    assert revalidate(client, "/challenge/topics", first).status_code == 200
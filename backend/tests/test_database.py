@@ -0,0 +1,32 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from app.core.database import InstrumentedQueuePool, instrument_engine, pool_status
+
+
+def test_pool_status_reports_checkouts_and_timeouts(tmp_path):
+    engine = instrument_engine(
+        create_engine(
+            f"sqlite:///{tmp_path / 'pool.db'}",
+            poolclass=InstrumentedQueuePool,
+            pool_size=1,
+            max_overflow=0,
+            pool_timeout=0.05,
+        )
+    )
+
+    with engine.connect():
+        status = pool_status(engine)
+        assert status["checked_out"] == 1
+        assert status["checked_in"] == 0
+
+        with pytest.raises(PoolTimeoutError):
+            engine.connect()
+
+    status = pool_status(engine)
+    assert status["checked_out"] == 0
+    assert status["checked_in"] == 1
+    assert status["checkouts"] == 1
+    assert status["timeouts"] == 1
+    assert status["checkout_time_max_ms"] >= status["checkout_time_avg_ms"] > 0
@@ -0,0 +1,95 @@
+import csv
+import io
+import json
+
+import pytest
+
+from app.core.config import settings
+
+from tests.conftest import auth_headers, make_challenges, make_topics, make_user
+
+
+@pytest.fixture(autouse=True)
+def small_batches(monkeypatch):
+    monkeypatch.setattr(settings, "EXPORT_BATCH_SIZE", 2)
+
+
+def test_export_taken_challenges_as_ndjson(client, db):
+    contributor = make_user(db, "ada")
+    taker = make_user(db, "bob")
+    challenges = make_challenges(db, contributor, 5, make_topics(db, "python", "sql"))
+    for challenge in challenges:
+        response = client.post(
+            "/challenge/take-new",
+            json={"challenge_id": str(challenge.id)},
+            headers=auth_headers(taker),
+        )
+        assert response.status_code == 200
+
+    response = client.get("/challenge/bob/taken-all/export")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert "bob-challenges-taken.ndjson" in response.headers["content-disposition"]
+    items = [json.loads(line) for line in response.text.splitlines()]
+    # same items as the listing, across several batches
+    assert items == client.get("/challenge/bob/taken-all").json()
+    assert len(items) == 5
+    assert sorted(tag["name"] for tag in items[0]["topic_tags"]) == ["python", "sql"]
+
+    missing = client.get("/challenge/nobody/taken-all/export")
+    assert missing.status_code == 404
+
+
+def test_export_contributions_as_csv(client, db):
+    contributor = make_user(db, "ada")
+    challenges = make_challenges(db, contributor, 3, make_topics(db, "python", "sql"))
+
+    response = client.get(
+        "/challenge/your-contributions/export?format=csv",
+        headers=auth_headers(contributor),
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "text/csv; charset=utf-8"
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [row["id"] for row in rows] == [str(c.id) for c in reversed(challenges)]
+    assert rows[0]["contributor_username"] == "ada"
+    assert sorted(rows[0]["topic_tags"].split(";")) == ["python", "sql"]
+    assert rows[0]["approval"] == "approved"
+    assert rows[0]["acceptance_rate"] == ""
+
+    # only the header when there is nothing to export
+    other = make_user(db, "bob")
+    empty = client.get(
+        "/challenge/your-contributions/export?format=csv", headers=auth_headers(other)
+    )
+    assert empty.text.splitlines()[0].startswith("id,title,slug")
+    assert len(empty.text.splitlines()) == 1
+
+    assert client.get("/challenge/your-contributions/export").status_code == 401
+
+
+def test_csv_export_escapes_formulas(client, db):
+    contributor = make_user(db, "ada")
+    (challenge,) = make_challenges(db, contributor, 1, make_topics(db, "-python"))
+    challenge.title = '=HYPERLINK("http://evil.example","open")'
+    db.add(challenge)
+    db.commit()
+
+    response = client.get(
+        "/challenge/your-contributions/export?format=csv",
+        headers=auth_headers(contributor),
+    )
+
+    (row,) = csv.DictReader(io.StringIO(response.text))
+    assert row["title"] == '\'=HYPERLINK("http://evil.example","open")'
+    assert row["topic_tags"] == "'-python"
+    assert row["contributor_username"] == "ada"
+    # the NDJSON export is left as is
+    item = json.loads(
+        client.get(
+            "/challenge/your-contributions/export", headers=auth_headers(contributor)
+        ).text
+    )
+    assert item["title"].startswith("=HYPERLINK")
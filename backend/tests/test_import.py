@@ -0,0 +1,103 @@
+import json
+import uuid
+
+from sqlmodel import select
+
+from app.api.models import Challenge
+from app.api.models.challenges import ApprovalStatus
+from tests.conftest import auth_headers, make_topics, make_user
+
+
+def challenge(title, topics=[], **fields):
+    return {
+        "title": title,
+        "description": f"Description of {title}",
+        "difficulty_tag": "beginner",
+        "topic_tags": topics,
+        **fields,
+    }
+
+
+def test_import_reports_errors_per_item(client, db):
+    ada = make_user(db, "ada")
+    python, rust = make_topics(db, "python", "rust")
+
+    response = client.post(
+        "/challenge/import",
+        json=[
+            challenge("By id", [{"id": str(python.id), "name": "python"}]),
+            challenge("Missing difficulty", difficulty_tag=None),
+            challenge("By name", [{"name": "rust"}, {"name": "python"}]),
+            challenge("Unknown topic", [{"name": "cobol"}]),
+            challenge("x" * 181),
+        ],
+        headers=auth_headers(ada),
+    )
+
+    assert response.status_code == 200
+    result = response.json()
+    assert [item["index"] for item in result["created"]] == [0, 2]
+    assert [error["index"] for error in result["errors"]] == [1, 3, 4]
+    assert "cobol" in result["errors"][1]["detail"]
+
+    created = db.get(Challenge, uuid.UUID(result["created"][1]["id"]))
+    assert created.slug == result["created"][1]["slug"]
+    assert created.slug.startswith("by-name-")
+    assert created.approval == ApprovalStatus.PENDING
+    assert created.contributor_id == ada.id
+    assert sorted(topic.name for topic in created.topic_tags) == ["python", "rust"]
+
+
+def test_import_ndjson(client, db):
+    ada = make_user(db, "ada")
+    lines = [json.dumps(challenge(f"Line {i}")) for i in range(3)]
+    lines.insert(1, "{not json")
+
+    response = client.post(
+        "/challenge/import",
+        content="\n".join(lines),
+        headers={**auth_headers(ada), "Content-Type": "application/x-ndjson"},
+    )
+
+    result = response.json()
+    assert [item["index"] for item in result["created"]] == [0, 2, 3]
+    assert result["errors"][0]["index"] == 1
+    assert "Invalid JSON" in result["errors"][0]["detail"]
+
+
+def test_import_rejects_non_arrays(client, db):
+    ada = make_user(db, "ada")
+
+    response = client.post(
+        "/challenge/import", json=challenge("Alone"), headers=auth_headers(ada)
+    )
+
+    assert response.status_code == 400
+
+
+def test_rejected_rows_dont_abort_their_batch(client, db, monkeypatch):
+    from sqlalchemy.exc import IntegrityError
+
+    from app.api.crud import imports
+
+    insert_rows = imports.insert_rows
+
+    def reject_some(db, rows, links):
+        if any(row["title"].startswith("Reject") for row in rows):
+            raise IntegrityError("INSERT", {}, Exception("rejected"))
+        return insert_rows(db, rows, links)
+
+    monkeypatch.setattr(imports, "insert_rows", reject_some)
+    monkeypatch.setattr(imports, "IMPORT_BATCH_SIZE", 2)
+    ada = make_user(db, "ada")
+
+    response = client.post(
+        "/challenge/import",
+        json=[challenge(title) for title in ("A", "Reject B", "C", "D", "E")],
+        headers=auth_headers(ada),
+    )
+
+    result = response.json()
+    assert [item["index"] for item in result["created"]] == [0, 2, 3, 4]
+    assert result["errors"] == [{"index": 1, "detail": "rejected"}]
+    assert len(db.exec(select(Challenge)).all()) == 4
@@ -0,0 +1,163 @@
+import subprocess
+import sys
+
+from sqlalchemy import create_engine
+
+from app import main
+from app.core.config import settings
+from app.core.database import InstrumentedQueuePool, instrument_engine, pool_status
+from app.core.metrics import (
+    Counter,
+    Gauge,
+    Histogram,
+    MmapValues,
+    MultiProcessValues,
+    Registry,
+)
+
+from tests.conftest import make_challenges, make_user
+
+
+def test_render_openmetrics():
+    registry = Registry()
+    requests = Counter("requests", "Requests.", ("route",), registry=registry)
+    in_progress = Gauge("in_progress", "In progress.", registry=registry)
+    latency = Histogram(
+        "latency_seconds", "Latency.", ("route",), buckets=(0.1, 1), registry=registry
+    )
+
+    requests.labels("/a").inc()
+    requests.labels("/a").inc(2)
+    requests.labels('/b"').inc()
+    in_progress.labels().set(3)
+    for value in [0.05, 0.5, 0.7, 5]:
+        latency.labels("/a").observe(value)
+
+    assert registry.render() == (
+        "# TYPE requests counter\n"
+        "# HELP requests Requests.\n"
+        'requests_total{route="/a"} 3\n'
+        'requests_total{route="/b\\""} 1\n'
+        "# TYPE in_progress gauge\n"
+        "# HELP in_progress In progress.\n"
+        "in_progress 3\n"
+        "# TYPE latency_seconds histogram\n"
+        "# HELP latency_seconds Latency.\n"
+        'latency_seconds_bucket{route="/a",le="0.1"} 1\n'
+        'latency_seconds_bucket{route="/a",le="1"} 3\n'
+        'latency_seconds_bucket{route="/a",le="+Inf"} 4\n'
+        'latency_seconds_count{route="/a"} 4\n'
+        'latency_seconds_sum{route="/a"} 6.25\n'
+        "# EOF\n"
+    )
+
+
+def test_multiprocess_values(tmp_path):
+    registry = Registry(values=MultiProcessValues(str(tmp_path)))
+    requests = Counter("requests", "Requests.", registry=registry)
+    in_progress = Gauge("in_progress", "In progress.", registry=registry)
+    requests.labels().inc(2)
+    in_progress.labels().set(1)
+
+    # files left by another worker, the gauge one by an exited worker
+    exited = subprocess.Popen([sys.executable, "-c", "pass"])
+    exited.wait()
+    other = MmapValues(str(tmp_path / "counter_1.db"))
+    other.inc(("requests_total", ()), 5)
+    dead = MmapValues(str(tmp_path / f"gauge_{exited.pid}.db"))
+    dead.set(("in_progress", ()), 7)
+
+    lines = registry.render().splitlines()
+    assert "requests_total 7" in lines
+    assert "in_progress 1" in lines
+
+
+def test_mirrored_counts_add_up(tmp_path):
+    registry = Registry(values=MultiProcessValues(str(tmp_path)))
+    hits = Counter("cache_hits", "Hits.", registry=registry)
+    # hits counted by a worker which exited since
+    MmapValues(str(tmp_path / "counter_1.db")).set(("cache_hits_total", ()), 5)
+
+    hits.labels().set(3)
+    hits.labels().set(8)
+    assert "cache_hits_total 13" in registry.render().splitlines()
+
+    # the cache was cleared, and counted 2 hits since
+    hits.labels().set(2)
+    assert "cache_hits_total 15" in registry.render().splitlines()
+
+
+def test_mmap_values_grow_and_reopen(tmp_path):
+    path = str(tmp_path / "counter_1.db")
+    values = MmapValues(path)
+    for i in range(5000):
+        values.inc(("requests_total", (("route", f"/route/{i}"),)), i)
+    reopened = MmapValues(path)
+    reopened.inc(("requests_total", (("route", "/route/4999"),)), 1)
+
+    registry = Registry(values=MultiProcessValues(str(tmp_path)))
+    Counter("requests", "Requests.", ("route",), registry=registry)
+    assert 'requests_total{route="/route/4999"} 5000' in registry.render()
+
+
+def test_metrics_endpoint(client, db):
+    user = make_user(db, "alice")
+    [challenge] = make_challenges(db, user, 1)
+
+    client.get(f"/challenge/view/{challenge.slug}")
+    client.get("/no-such-page")
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/openmetrics-text")
+    lines = response.text.splitlines()
+    assert lines[-1] == "# EOF"
+    assert any(
+        line.startswith(
+            'http_requests_total{method="GET",route="/challenge/view/{slug}",status="200"}'
+        )
+        for line in lines
+    )
+    assert any('route="<unmatched>",status="404"' in line for line in lines)
+    assert any(line.startswith('cache_hits_total{cache="challenge"}') for line in lines)
+    assert any(
+        line.startswith('db_pool_checkouts_total{engine="sync"}') for line in lines
+    )
+
+
+def test_metrics_report_pool_overflow_and_wait(client, tmp_path, monkeypatch):
+    engine = instrument_engine(
+        create_engine(
+            f"sqlite:///{tmp_path / 'pool.db'}",
+            poolclass=InstrumentedQueuePool,
+            pool_size=1,
+            max_overflow=1,
+        )
+    )
+    monkeypatch.setattr(main, "get_pools_status", lambda: {"sync": pool_status(engine)})
+
+    with engine.connect(), engine.connect():
+        lines = client.get("/metrics").text.splitlines()
+
+    assert 'db_pool_overflow_connections{engine="sync"} 1' in lines
+    assert 'db_pool_checked_out_connections{engine="sync"} 2' in lines
+    [wait] = [
+        line
+        for line in lines
+        if line.startswith('db_pool_checkout_wait_seconds_total{engine="sync"}')
+    ]
+    assert float(wait.split()[-1]) > 0
+
+
+def test_metrics_endpoint_access(client, monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "scraper-secret")
+    assert client.get("/metrics").status_code == 401
+    wrong = client.get("/metrics", headers={"Authorization": "Bearer nope"})
+    assert wrong.status_code == 401
+    allowed = client.get("/metrics", headers={"Authorization": "Bearer scraper-secret"})
+    assert allowed.status_code == 200
+
+    # production without a token
+    monkeypatch.setattr(settings, "METRICS_TOKEN", None)
+    monkeypatch.setattr(settings, "METRICS_ENABLED", False)
+    assert client.get("/metrics").status_code == 404
@@ -0,0 +1,67 @@
+from datetime import datetime, timedelta
+
+from app.api.models.challenges import ChallengeTakers
+from tests.conftest import auth_headers, make_challenges, make_user
+
+
+def walk(client, url, headers=None):
+    """Follow `nextCursor` until the last page, returning every page"""
+    pages = [client.get(url, headers=headers).json()]
+    while pages[-1]["nextCursor"]:
+        cursor = pages[-1]["nextCursor"]
+        pages.append(client.get(f"{url}&cursor={cursor}", headers=headers).json())
+    return pages
+
+
+def test_available_challenges_cursor_pagination(client, db):
+    contributor = make_user(db, "ada")
+    challenges = make_challenges(db, contributor, 7)
+
+    pages = walk(client, "/challenge/available?limit=3")
+
+    assert [len(page["data"]) for page in pages] == [3, 3, 1]
+    assert [page["hasNext"] for page in pages] == [True, True, False]
+    assert [page["hasPrev"] for page in pages] == [False, True, True]
+    slugs = [challenge["slug"] for page in pages for challenge in page["data"]]
+    assert slugs == [challenge.slug for challenge in reversed(challenges)]
+
+
+def test_available_challenges_last_full_page_has_no_next(client, db):
+    contributor = make_user(db, "ada")
+    make_challenges(db, contributor, 4)
+
+    response = client.get("/challenge/available?limit=2&offset=2")
+
+    assert response.json()["hasNext"] is False
+    assert response.json()["nextCursor"] is None
+
+
+def test_invalid_cursor_is_rejected(client):
+    response = client.get("/challenge/available?limit=2&cursor=not-a-cursor")
+
+    assert response.status_code == 400
+
+
+def test_taken_and_contributed_challenges_cursor_pagination(client, db):
+    user = make_user(db, "ada")
+    challenges = make_challenges(db, user, 5)
+    start = datetime(2024, 2, 1)
+    db.add_all(
+        ChallengeTakers(
+            user_id=user.id,
+            challenge_id=challenge.id,
+            created_at=start + timedelta(seconds=i),
+        )
+        for i, challenge in enumerate(challenges)
+    )
+    db.commit()
+
+    taken = walk(client, "/challenge/ada/taken-all?limit=2")
+    contributed = walk(
+        client, "/challenge/your-contributions?limit=2", headers=auth_headers(user)
+    )
+
+    expected = [challenge.slug for challenge in reversed(challenges)]
+    for pages in (taken, contributed):
+        assert [len(page["data"]) for page in pages] == [2, 2, 1]
+        assert [c["slug"] for page in pages for c in page["data"]] == expected
@@ -0,0 +1,75 @@
+import pytest
+from sqlmodel import select
+
+from app.api.models import User
+from app.core.security.password import (
+    BcryptHasher,
+    Pbkdf2Hasher,
+    PasswordHashers,
+    password_pool,
+)
+
+SIGNUP = {
+    "first_name": "Ada",
+    "username": "ada",
+    "email": "ada@example.com",
+    "password": "correct-horse",
+}
+
+
+@pytest.fixture
+def full_pool(monkeypatch):
+    monkeypatch.setattr(password_pool, "max_pending", 0)
+
+
+def login(client, password):
+    return client.post(
+        "/auth/login/token", data={"username": "ada", "password": password}
+    )
+
+
+def test_signup_and_login(client):
+    assert client.post("/auth/signup", data=SIGNUP).status_code == 201
+
+    assert login(client, "correct-horse").status_code == 200
+    assert login(client, "wrong-horse!").status_code == 400
+
+
+def test_signup_is_refused_when_password_pool_is_full(client, full_pool):
+    response = client.post("/auth/signup", data=SIGNUP)
+
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
+    assert password_pool.rejected >= 1
+
+
+def test_outdated_hashes_need_rehash():
+    hashers = PasswordHashers(Pbkdf2Hasher(iterations=2), BcryptHasher(rounds=4))
+    bcrypt_hash = BcryptHasher(rounds=4).hash("correct-horse")
+    cheaper_hash = Pbkdf2Hasher(iterations=1).hash("correct-horse")
+
+    assert hashers.verify("correct-horse", bcrypt_hash)
+    assert hashers.verify("correct-horse", cheaper_hash)
+    assert not hashers.verify("wrong-horse", cheaper_hash)
+    assert hashers.needs_rehash(bcrypt_hash)
+    assert hashers.needs_rehash(cheaper_hash)
+    assert not hashers.needs_rehash(hashers.hash("correct-horse"))
+
+
+def test_login_rehashes_outdated_password(client, db):
+    user = User(
+        first_name="Ada",
+        last_name="Test",
+        username="ada",
+        email="ada@example.com",
+        password=BcryptHasher(rounds=4).hash("correct-horse"),
+    )
+    db.add(user)
+    db.commit()
+
+    assert login(client, "correct-horse").status_code == 200
+
+    db.expire_all()
+    rehashed = db.exec(select(User.password).where(User.username == "ada")).one()
+    assert rehashed.startswith("pbkdf2_sha256$1$")
+    assert login(client, "correct-horse").status_code == 200
@@ -0,0 +1,135 @@
+import pytest
+
+from app.api.models.challenges import ApprovalStatus
+from app.core.cache import challenge_cache
+
+from tests.conftest import auth_headers, make_challenges, make_topics, make_user
+
+
+@pytest.mark.parametrize("page_size", [5, 50])
+def test_available_challenges_query_count(client, db, count_queries, page_size):
+    contributor = make_user(db, "ada")
+    make_challenges(db, contributor, page_size, make_topics(db, "python", "sql"))
+
+    with count_queries() as queries:
+        response = client.get(f"/challenge/available?limit={page_size}")
+
+    assert response.status_code == 200
+    assert len(response.json()["data"]) == page_size
+    # challenges joined with their contributor, then every topic in one query
+    assert queries.count == 2
+
+
+@pytest.mark.parametrize("page_size", [5, 50])
+def test_contributions_query_count(client, db, count_queries, page_size):
+    contributor = make_user(db, "ada")
+    make_challenges(db, contributor, page_size, make_topics(db, "python"))
+    headers = auth_headers(contributor)
+
+    with count_queries() as queries:
+        response = client.get("/challenge/your-contributions", headers=headers)
+
+    assert response.status_code == 200
+    assert len(response.json()) == page_size
+    assert queries.count == 2
+
+
+def test_view_challenge_query_count(client, db, count_queries):
+    contributor = make_user(db, "ada")
+    (challenge,) = make_challenges(db, contributor, 1, make_topics(db, "python", "sql"))
+
+    with count_queries() as queries:
+        response = client.get(f"/challenge/view/{challenge.slug}")
+
+    assert response.status_code == 200
+    assert len(response.json()["challenge"]["topic_tags"]) == 2
+    assert queries.count == 2
+
+
+@pytest.mark.parametrize("taken", [False, True])
+def test_view_challenge_query_count_for_user(client, db, count_queries, taken):
+    contributor = make_user(db, "ada")
+    viewer = make_user(db, "bob")
+    (challenge,) = make_challenges(db, contributor, 1, make_topics(db, "python", "sql"))
+    headers = auth_headers(viewer)
+    if taken:
+        client.post(
+            "/challenge/take-new",
+            json={"challenge_id": str(challenge.id)},
+            headers=headers,
+        )
+    challenge_cache.clear()
+
+    with count_queries() as queries:
+        response = client.get(f"/challenge/view/{challenge.slug}", headers=headers)
+
+    assert response.status_code == 200
+    assert len(response.json()["challenge"]["topic_tags"]) == 2
+    assert (response.json()["accepted_challenge"] is not None) == taken
+    # challenge, contributor, topics and take status joined together
+    assert queries.count == 1
+
+    # cached challenge, only the take status is looked up
+    with count_queries() as queries:
+        client.get(f"/challenge/view/{challenge.slug}", headers=headers)
+    assert queries.count == 1
+
+
+def test_forbidden_view_query_count(client, db, count_queries):
+    contributor = make_user(db, "ada")
+    viewer = make_user(db, "bob")
+    (challenge,) = make_challenges(
+        db, contributor, 1, make_topics(db, "python"), approval=ApprovalStatus.PENDING
+    )
+
+    headers = auth_headers(viewer)
+
+    with count_queries() as queries:
+        response = client.get(f"/challenge/view/{challenge.slug}", headers=headers)
+
+    assert response.status_code == 403
+    assert queries.count == 1
+
+
+def test_taken_statuses_query_count(client, db, count_queries):
+    contributor = make_user(db, "ada")
+    taker = make_user(db, "bob")
+    challenges = make_challenges(db, contributor, 30)
+    for challenge in challenges[:3]:
+        response = client.post(
+            "/challenge/take-new",
+            json={"challenge_id": str(challenge.id)},
+            headers=auth_headers(taker),
+        )
+        assert response.status_code == 200
+    headers = auth_headers(taker)
+    ids = [str(challenge.id) for challenge in challenges]
+
+    with count_queries() as queries:
+        response = client.post(
+            "/challenge/taken-challenges-info",
+            json={"challenge_ids": ids},
+            headers=headers,
+        )
+    assert response.json()["statuses"] == {id: "pending" for id in ids[:3]}
+    assert queries.count == 1
+
+    # the page inlines them with one more query
+    with count_queries() as queries:
+        response = client.get(
+            "/challenge/available?limit=30&taken_status=true", headers=headers
+        )
+    assert response.json()["takenStatuses"] == {id: "pending" for id in ids[:3]}
+    assert response.headers["cache-control"] == "private, no-cache"
+    assert queries.count == 3
+
+    anonymous = client.post(
+        "/challenge/taken-challenges-info", json={"challenge_ids": ids}
+    )
+    assert anonymous.json() == {"statuses": {}}
+    too_many = client.post(
+        "/challenge/taken-challenges-info",
+        json={"challenge_ids": ids * 4},
+        headers=headers,
+    )
+    assert too_many.status_code == 422
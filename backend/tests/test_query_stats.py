@@ -0,0 +1,66 @@
+import logging
+
+from app.core.config import settings
+from sqlmodel import select
+
+from app.api.models import User
+from app.core.database import normalize_sql, track_queries
+
+from tests.conftest import make_challenges, make_user
+
+
+def test_normalize_sql():
+    assert (
+        normalize_sql(
+            "SELECT *\n  FROM challenges\n WHERE id IN (?, ?, ?) AND title = 'a''b' LIMIT 20"
+        )
+        == "SELECT * FROM challenges WHERE id IN (...) AND title = ? LIMIT ?"
+    )
+    assert normalize_sql("SELECT * FROM t WHERE id IN ($1, $2) AND a = $3") == (
+        "SELECT * FROM t WHERE id IN (...) AND a = $3"
+    )
+
+
+def test_server_timing(client, db):
+    user = make_user(db, "alice")
+    make_challenges(db, user, 3)
+
+    for url in ["/challenge/available", f"/user/{user.username}"]:
+        response = client.get(url)
+        assert response.status_code == 200
+        db_timing, app_timing = response.headers["server-timing"].split(", ")
+        assert db_timing.startswith("db;dur=") and db_timing.endswith(' queries"')
+        assert int(db_timing.split('desc="')[1].split()[0]) >= 1
+        assert app_timing.startswith("app;dur=")
+
+
+def test_slow_and_repeated_queries_are_logged(client, db, caplog, monkeypatch):
+    user = make_user(db, "alice")
+    make_challenges(db, user, 3)
+    monkeypatch.setattr(settings, "SLOW_QUERY_THRESHOLD", 0)
+
+    with caplog.at_level(logging.INFO):
+        client.get("/challenge/available")
+        client.get(f"/user/{user.username}")
+
+    slow = [r.message for r in caplog.records if r.message.startswith("Slow query")]
+    # sync and async routes, with the crud function running the query
+    assert any("app/api/crud/challenges.py" in message for message in slow)
+    assert any("app/api/crud/async_users.py" in message for message in slow)
+
+    requests = [r for r in caplog.records if r.name == "app.requests"]
+    assert [r.path for r in requests] == ["/challenge/available", "/user/alice"]
+    assert all(r.db_queries >= 1 and r.status_code == 200 for r in requests)
+
+
+def test_repeated_queries_are_logged(db, caplog, monkeypatch):
+    monkeypatch.setattr(settings, "SQL_REPEATED_QUERY_THRESHOLD", 3)
+
+    with track_queries() as stats:
+        for username in ["alice", "bob", "carol"]:
+            db.exec(select(User).where(User.username == username)).first()
+
+    assert stats.count == 3 and stats.duration > 0
+    [record] = [r for r in caplog.records if r.message.startswith("Query repeated")]
+    assert "Query repeated 3 times" in record.message
+    assert record.sql.endswith("WHERE users.username = ?")
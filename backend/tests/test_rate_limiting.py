@@ -1,7 +1,22 @@
+import asyncio
+import fnmatch
+import time
+
 import pytest
+from fastapi import FastAPI
 from fastapi.testclient import TestClient
 from app.main import app
 from app.core.config import settings
+from app.core.rate_limit import (
+    ALGORITHMS,
+    MemoryStorage,
+    RateLimitPolicies,
+    RateLimitPolicy,
+    RedisStorage,
+)
+from app.core.rate_limit import storage as storage_module
+from app.core.security.token import Token, UserDataPayload
+from app.middlewares import RateLimiterMiddleware
 
 RATE_LIMIT_HIT_REQUEST = settings.REQUESTS_LIMIT + 1
 
@@ -16,3 +31,307 @@ def test_rate_limiting(num_requests, expected_status):
         response = client.get("/api/v1/")
 
     assert response.status_code == expected_status
+
+
+class FakeRedis:
+    """Minimal in-memory stand-in for `redis.asyncio.Redis`"""
+
+    def __init__(self):
+        self.data = {}  # key -> [value, expires_at]
+
+    def _get(self, key):
+        entry = self.data.get(key)
+        if entry and entry[1] is not None and entry[1] <= time.time():
+            del self.data[key]
+            return None
+        return entry
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def register_script(self, script):
+        async def run(keys, args):
+            raise NotImplementedError("Lua scripts are not supported by the fake")
+
+        return run
+
+    async def get(self, key):
+        entry = self._get(key)
+        return entry[0] if entry else None
+
+    async def scan_iter(self, match="*"):
+        for key in list(self.data):
+            if fnmatch.fnmatch(key, match):
+                yield key
+
+    async def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+
+class FakePipeline:
+    def __init__(self, client: FakeRedis):
+        self.client = client
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def set(self, key, value, ex=None, nx=False):
+        self.commands.append(("set", key, value, ex, nx))
+
+    def incrby(self, key, amount):
+        self.commands.append(("incrby", key, amount))
+
+    def pttl(self, key):
+        self.commands.append(("pttl", key))
+
+    async def execute(self):
+        results = []
+        for command, key, *args in self.commands:
+            entry = self.client._get(key)
+            if command == "set":
+                value, ex, nx = args
+                if nx and entry:
+                    results.append(None)
+                    continue
+                self.client.data[key] = [value, time.time() + ex if ex else None]
+                results.append(True)
+            elif command == "incrby":
+                if entry is None:
+                    entry = self.client.data[key] = [0, None]
+                entry[0] = int(entry[0]) + args[0]
+                results.append(entry[0])
+            elif command == "pttl":
+                if entry is None:
+                    results.append(-2)
+                elif entry[1] is None:
+                    results.append(-1)
+                else:
+                    results.append(int((entry[1] - time.time()) * 1000))
+        self.commands = []
+        return results
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(storage_module.time, "time", lambda: now[0])
+    return now
+
+
+def test_memory_storage_expires_counters(clock):
+    now = clock
+    storage = MemoryStorage()
+
+    async def scenario():
+        assert await storage.incr("a", 10) == (1, 10)
+        assert await storage.incr("a", 10) == (2, 10)
+        assert await storage.get("a") == 2
+        assert (await storage.incr("b", 5))[0] == 1
+        assert len(storage) == 2
+
+        # "b" expires first, "a" is left untouched
+        now[0] += 6
+        assert (await storage.incr("c", 10))[0] == 1
+        assert len(storage) == 2
+
+        # a fresh window starts once the counter has expired
+        now[0] += 5
+        assert await storage.incr("a", 10) == (1, 10)
+        assert len(storage) == 2
+
+        # a long idle period sweeps everything at once
+        now[0] += 3600
+        assert await storage.incr("d", 10) == (1, 10)
+        assert len(storage) == 1
+
+    asyncio.run(scenario())
+
+
+def test_redis_storage_shares_counters_between_workers():
+    client = FakeRedis()
+    worker_a, worker_b = RedisStorage(client), RedisStorage(client)
+
+    async def scenario():
+        assert (await worker_a.incr("1.2.3.4:/", 60))[0] == 1
+        count, reset_in = await worker_b.incr("1.2.3.4:/", 60)
+        assert count == 2
+        assert 0 < reset_in <= 60
+
+        await worker_a.reset()
+        assert (await worker_b.incr("1.2.3.4:/", 60))[0] == 1
+
+    asyncio.run(scenario())
+
+
+@pytest.fixture
+def lua_redis():
+    """Redis fake running the Lua scripts, `pip install fakeredis[lua]`"""
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")
+    return fakeredis.FakeAsyncRedis()
+
+
+def test_redis_scripts_share_limits_between_workers(lua_redis):
+    worker_a, worker_b = RedisStorage(lua_redis), RedisStorage(lua_redis)
+
+    async def scenario():
+        assert await worker_a.acquire_entry("log", 2, 60) == (True, 1, 60)
+        allowed, count, reset_in = await worker_b.acquire_entry("log", 2, 60)
+        assert (allowed, count) == (True, 2)
+        assert 0 < reset_in <= 60
+        assert (await worker_a.acquire_entry("log", 2, 60))[:2] == (False, 2)
+
+        assert await worker_a.acquire_token("bucket", 2, 1) == (True, 1)
+        assert (await worker_b.acquire_token("bucket", 2, 1))[0] is True
+        assert (await worker_a.acquire_token("bucket", 2, 1))[0] is False
+
+        # two hits in the previous window weigh one at half of this one
+        await worker_a.incr("window:0", 20)
+        await worker_a.incr("window:0", 20)
+        window = ("window:1", "window:0", 3, 0.5, 20)
+        assert await worker_a.acquire_window(*window) == (True, 2, 1)
+        assert await worker_b.acquire_window(*window) == (True, 2, 2)
+        assert await worker_a.acquire_window(*window) == (False, 2, 2)
+        assert 0 < await lua_redis.ttl("ratelimit:window:1") <= 20
+
+    asyncio.run(scenario())
+
+
+@pytest.mark.parametrize("algorithm", ["sliding-log", "sliding-window", "token-bucket"])
+def test_concurrent_hits_respect_limit(lua_redis, algorithm):
+    storage = RedisStorage(lua_redis)
+    strategy = ALGORITHMS[algorithm]
+
+    async def scenario():
+        return await asyncio.gather(
+            *(strategy.hit(storage, "key", 5, 60) for _ in range(20))
+        )
+
+    results = asyncio.run(scenario())
+    assert sum(result.allowed for result in results) == 5
+
+
+def hits(algorithm, storage, count, limit=3, window=10):
+    strategy = ALGORITHMS[algorithm]
+
+    async def scenario():
+        return [await strategy.hit(storage, "key", limit, window) for _ in range(count)]
+
+    return [result.allowed for result in asyncio.run(scenario())]
+
+
+@pytest.mark.parametrize(
+    "algorithm", ["fixed-window", "sliding-log", "sliding-window", "token-bucket"]
+)
+def test_algorithms_enforce_limit(clock, algorithm):
+    storage = MemoryStorage()
+    assert hits(algorithm, storage, 4) == [True, True, True, False]
+
+    # every algorithm gives the full quota back after two idle windows
+    clock[0] += 20
+    assert hits(algorithm, storage, 4) == [True, True, True, False]
+
+
+def test_sliding_log_prevents_boundary_burst(clock):
+    fixed, sliding = MemoryStorage(), MemoryStorage()
+    assert hits("fixed-window", fixed, 1) == [True]
+    assert hits("sliding-log", sliding, 1) == [True]
+
+    clock[0] += 9
+    assert hits("fixed-window", fixed, 2) == [True, True]
+    assert hits("sliding-log", sliding, 2) == [True, True]
+
+    # the fixed window restarts and lets a second burst through right away
+    clock[0] += 1.5
+    assert hits("fixed-window", fixed, 3) == [True, True, True]
+    assert hits("sliding-log", sliding, 3) == [True, False, False]
+
+
+def test_token_bucket_refills_gradually(clock):
+    storage = MemoryStorage()
+    assert hits("token-bucket", storage, 4) == [True, True, True, False]
+
+    # 3 tokens per 10 seconds, one token is back after 10 / 3 seconds
+    clock[0] += 3.4
+    assert hits("token-bucket", storage, 2) == [True, False]
+
+
+def test_policy_table_matches_longest_prefix():
+    default = RateLimitPolicy(limit=100, window=60)
+    router = RateLimitPolicy(limit=50, window=60)
+    route = RateLimitPolicy(limit=5, window=60, algorithm="sliding-log")
+    policies = RateLimitPolicies(
+        default, {"/challenge": router, "/challenge/create-new": route}
+    )
+
+    assert policies.match("/challenge/create-new") == ("/challenge/create-new", route)
+    assert policies.match("/challenge/view/a") == ("/challenge", router)
+    assert policies.match("/challenges") == ("/challenges", default)
+    assert policies.match("/user/me") == ("/user/me", default)
+
+
+def test_policy_rejects_unknown_algorithm():
+    with pytest.raises(ValueError):
+        RateLimitPolicy(limit=1, window=60, algorithm="leaky")
+
+
+def test_user_policy_counts_per_user():
+    limited_app = FastAPI()
+    limited_app.add_middleware(
+        RateLimiterMiddleware,
+        default_policy=RateLimitPolicy(limit=100, window=60),
+        policies={"/expensive": RateLimitPolicy(limit=2, window=60, key="user")},
+    )
+
+    @limited_app.get("/expensive")
+    def expensive():
+        return "ok"
+
+    @limited_app.get("/cheap")
+    def cheap():
+        return "ok"
+
+    def auth(user_id):
+        token = Token(payload=UserDataPayload(id=user_id, role="user"))
+        return {"Authorization": f"Bearer {token.create_access_token().token}"}
+
+    client = TestClient(limited_app)
+    alice, bob = auth("alice"), auth("bob")
+
+    assert [client.get("/expensive", headers=alice).status_code for _ in range(3)] == [
+        200,
+        200,
+        429,
+    ]
+    # other users and other routes keep their own quota
+    assert client.get("/expensive", headers=bob).status_code == 200
+    response = client.get("/cheap", headers=alice)
+    assert response.status_code == 200
+    assert response.headers["X-RateLimit-Remaining"] == "99"
+
+
+def test_rate_limit_headers():
+    limited_app = FastAPI()
+    limited_app.add_middleware(
+        RateLimiterMiddleware, default_policy=RateLimitPolicy(limit=1, window=60)
+    )
+
+    @limited_app.get("/")
+    def index():
+        return "ok"
+
+    client = TestClient(limited_app)
+    response = client.get("/")
+    assert response.json() == "ok"
+    assert response.headers["X-RateLimit-Limit"] == "1"
+    assert response.headers["X-RateLimit-Remaining"] == "0"
+
+    response = client.get("/")
+    assert response.status_code == 429
+    assert response.text == "Rate limit exceeded. Please try again later."
+    assert response.headers["Retry-After"] == response.headers["X-RateLimit-Reset"]
@@ -0,0 +1,78 @@
+import uuid
+
+from app.api.models import Challenge
+from app.api.models.challenges import ApprovalStatus, DifficultyTag
+from tests.conftest import make_topics, make_user
+
+
+def add_challenge(db, contributor, title, description="", topics=[], **kwargs):
+    challenge = Challenge(
+        id=uuid.uuid4(),
+        title=title,
+        description=description or title,
+        difficulty_tag=DifficultyTag.BEGINNER,
+        contributor_id=contributor.id,
+        approval=kwargs.get("approval", ApprovalStatus.APPROVED),
+        topic_tags=topics,
+    )
+    db.add(challenge)
+    db.commit()
+    return challenge
+
+
+def search(client, q):
+    response = client.get("/challenge/search", params={"q": q})
+    assert response.status_code == 200
+    return [challenge["title"] for challenge in response.json()["data"]]
+
+
+def test_search_ranks_title_above_topics_and_description(client, db):
+    ada = make_user(db, "ada")
+    add_challenge(db, ada, "Todo app", "Persist the todos in PostgreSQL")
+    add_challenge(db, ada, "Blog", topics=make_topics(db, "postgresql"))
+    add_challenge(db, ada, "PostgreSQL replication")
+    add_challenge(db, ada, "Chat server")
+
+    assert search(client, "postgresql") == [
+        "PostgreSQL replication",
+        "Blog",
+        "Todo app",
+    ]
+
+
+def test_search_matches_prefixes_of_every_word(client, db):
+    ada = make_user(db, "ada")
+    add_challenge(db, ada, "Python web scraper")
+    add_challenge(db, ada, "Python CLI")
+    add_challenge(db, ada, "Web server in Go")
+
+    assert sorted(search(client, "pyth")) == ["Python CLI", "Python web scraper"]
+    assert search(client, "Pyth we") == ["Python web scraper"]
+    assert search(client, "rust") == []
+    assert search(client, "!!") == []
+
+
+def test_search_index_follows_commits(client, db):
+    ada = make_user(db, "ada")
+    pending = add_challenge(db, ada, "Kafka consumer", approval=ApprovalStatus.PENDING)
+    assert search(client, "kafka") == []
+
+    pending.approval = ApprovalStatus.APPROVED
+    db.add(pending)
+    add_challenge(db, ada, "Kafka producer")
+    db.commit()
+    assert sorted(search(client, "kafka")) == ["Kafka consumer", "Kafka producer"]
+
+    db.delete(pending)
+    db.commit()
+    assert search(client, "kafka") == ["Kafka producer"]
+
+
+def test_available_challenges_title_filter_uses_search(client, db):
+    ada = make_user(db, "ada")
+    add_challenge(db, ada, "Realtime chat", topics=make_topics(db, "websockets"))
+    add_challenge(db, ada, "Static site")
+
+    response = client.get("/challenge/available", params={"title": "websock"})
+
+    assert [c["title"] for c in response.json()] == ["Realtime chat"]
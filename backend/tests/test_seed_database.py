@@ -0,0 +1,58 @@
+from sqlalchemy import func
+from sqlmodel import col, select
+
+from app.api.models import Challenge, ChallengeTakers, ChallengeTopic, User
+from app.seed_database import Generator, populate_database
+
+
+def test_generator_is_deterministic():
+    def sample(seed):
+        generator = Generator(users=50, challenges=20, seed=seed)
+        return [
+            list(generator.challenge_rows()),
+            list(generator.challenge_taker_rows()),
+            list(generator.login_history_rows()),
+        ]
+
+    assert sample(1) == sample(1)
+    assert sample(1) != sample(2)
+
+
+def test_populate_database(engines, db):
+    engine = engines[0]
+
+    counts = populate_database(
+        200, 50, engine=engine, chunk_size=64, verbose=False, takes_per_user=4
+    )
+
+    assert counts["users"] == 200 and counts["challenges"] == 50
+    assert counts["challenge_takers"] > 200
+    assert db.exec(select(func.count()).select_from(ChallengeTakers)).one() == (
+        counts["challenge_takers"]
+    )
+    # counters reconciled with the generated takers
+    assert db.exec(select(func.sum(Challenge.takers_count))).one() == (
+        counts["challenge_takers"]
+    )
+    # every link points to generated rows
+    orphans = db.exec(
+        select(func.count())
+        .select_from(ChallengeTopic)
+        .where(col(ChallengeTopic.challenge_id).not_in(select(Challenge.id)))
+    ).one()
+    assert orphans == 0
+    contributors = db.exec(
+        select(func.count(func.distinct(Challenge.contributor_id))).where(
+            col(Challenge.contributor_id).in_(select(User.id))
+        )
+    ).one()
+    assert 1 <= contributors <= 10
+
+    # popularity is skewed, the most taken challenge outnumbers the median
+    takes = db.exec(
+        select(func.count())
+        .select_from(ChallengeTakers)
+        .group_by(ChallengeTakers.challenge_id)
+        .order_by(func.count().desc())
+    ).all()
+    assert takes[0] > 4 * takes[len(takes) // 2]
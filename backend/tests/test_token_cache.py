@@ -0,0 +1,71 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.security.token import (
+    Token,
+    TokenCache,
+    TokenPayload,
+    UserDataPayload,
+    decode_token,
+    token_cache,
+)
+
+USER = UserDataPayload(id="ada", role="user")
+
+
+def payload(expires_in: timedelta) -> TokenPayload:
+    exp = datetime.now(timezone.utc) + expires_in
+    return TokenPayload(sub=USER, token_type="access", exp=exp)
+
+
+def test_decode_token_verifies_each_token_once():
+    token_cache.clear()
+    token = Token(payload=USER).create_access_token().token
+
+    first = decode_token(token)
+    second = decode_token(token)
+
+    assert second is first
+    info = token_cache.info()
+    assert (info["hits"], info["misses"], info["size"]) == (1, 1, 1)
+
+
+def test_invalid_tokens_are_not_cached():
+    token_cache.clear()
+
+    for _ in range(2):
+        with pytest.raises(HTTPException):
+            decode_token("not-a-token")
+
+    assert token_cache.info()["size"] == 0
+
+
+def test_refresh_tokens_are_not_cached():
+    token_cache.clear()
+    token = Token(payload=USER).create_refresh_token().token
+
+    assert decode_token(token).token_type == "refresh"
+    assert decode_token(token).token_type == "refresh"
+
+    assert token_cache.info()["size"] == 0
+
+
+def test_token_cache_is_bounded_and_skips_expired_tokens():
+    cache = TokenCache(maxsize=2)
+    for token in ("a", "b", "c"):
+        cache.set(token, payload(timedelta(minutes=15)))
+    cache.set("expired", payload(timedelta(seconds=-1)))
+
+    assert cache.get("a") is None
+    assert cache.get("c") is not None
+    assert cache.get("expired") is None
+    assert cache.info()["size"] == 2
+
+
+def test_disabled_token_cache():
+    cache = TokenCache(maxsize=0)
+    cache.set("a", payload(timedelta(minutes=15)))
+
+    assert cache.get("a") is None
@@ -0,0 +1,126 @@
+import uuid
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.api.crud.topics import topic_catalog
+from app.api.models import Challenge
+from tests.conftest import auth_headers, make_challenges, make_topics, make_user
+
+
+def new_challenge(topics):
+    return {
+        "title": "Catalog",
+        "description": "Tags resolved from the topic catalog",
+        "difficulty_tag": "beginner",
+        "topic_tags": [{"id": str(topic.id), "name": topic.name} for topic in topics],
+    }
+
+
+def test_topics_are_loaded_once(client, db, count_queries):
+    make_topics(db, "rust", "python")
+
+    assert [topic["name"] for topic in client.get("/challenge/topics").json()] == [
+        "python",
+        "rust",
+    ]
+    with count_queries() as queries:
+        assert len(client.get("/challenge/topics").json()) == 2
+    assert queries.count == 0
+
+    # committing a topic reloads the catalog
+    make_topics(db, "go")
+    assert len(client.get("/challenge/topics").json()) == 3
+
+
+def test_create_challenge_resolves_topics_from_catalog(client, db, count_queries):
+    ada = make_user(db, "ada")
+    python, rust = make_topics(db, "python", "rust")
+    topic_catalog.get(db)
+    loads = topic_catalog.loads
+    body = new_challenge([python, rust])
+
+    with count_queries() as queries:
+        response = client.post(
+            "/challenge/create-new",
+            json=body,
+            headers=auth_headers(ada),
+        )
+    assert response.status_code == 200
+    assert sorted(t["name"] for t in response.json()["topic_tags"]) == [
+        "python",
+        "rust",
+    ]
+    # topics are only read back for the response, after the challenge is saved
+    inserted = next(
+        i for i, s in enumerate(queries.statements) if s.startswith("INSERT")
+    )
+    assert not any("FROM topics" in s for s in queries.statements[:inserted])
+    # tagging a challenge doesn't touch the topics themselves
+    assert topic_catalog.loads == loads
+    assert len(db.get(Challenge, uuid.UUID(response.json()["id"])).topic_tags) == 2
+
+    body["topic_tags"] = [{"id": str(uuid.uuid4()), "name": "unknown"}]
+    with count_queries() as queries:
+        response = client.post(
+            "/challenge/create-new",
+            json=body,
+            headers=auth_headers(ada),
+        )
+    assert response.status_code == 404
+    # the only query looks for a topic created since the catalog was loaded
+    assert queries.count == 1
+
+
+def test_unknown_topic_names_match_nothing(client, db):
+    ada = make_user(db, "ada")
+    make_challenges(db, ada, 2, make_topics(db, "python"))
+
+    def titles(**params):
+        response = client.get("/challenge/available", params=params)
+        return len(response.json())
+
+    assert titles(topics=["python"]) == 2
+    assert titles(topics=["cobol"]) == 0
+    assert titles(topics=["python", "cobol"]) == 2
+    assert titles(topics=["python", "cobol"], topic_match="all") == 0
+
+
+def test_topics_created_by_another_process_are_found(client, db, monkeypatch):
+    ada = make_user(db, "ada")
+    (python,) = make_topics(db, "python")
+    topic_catalog.get(db)
+
+    # another process doesn't invalidate the catalog of this one
+    monkeypatch.setattr(topic_catalog, "invalidate", lambda: None)
+    (rust,) = make_topics(db, "rust")
+    make_challenges(db, ada, 1, [rust])
+    response = client.post(
+        "/challenge/create-new",
+        json=new_challenge([python, rust]),
+        headers=auth_headers(ada),
+    )
+    assert response.status_code == 200
+    assert sorted(t["name"] for t in response.json()["topic_tags"]) == [
+        "python",
+        "rust",
+    ]
+
+    response = client.get("/challenge/available", params={"topics": ["rust"]})
+    assert [challenge["title"] for challenge in response.json()] == ["Challenge 0"]
+    # the snapshot was not reloaded
+    assert [t["name"] for t in client.get("/challenge/topics").json()] == ["python"]
+
+
+def test_failed_warm_up_is_logged(client, monkeypatch, caplog):
+    async def unreachable(db):
+        raise ConnectionError("database down")
+
+    monkeypatch.setattr(topic_catalog, "get_async", unreachable)
+    # the app starts anyway, requests load the catalog when it is back
+    with TestClient(app):
+        pass
+
+    [record] = [r for r in caplog.records if r.name == "app.main"]
+    assert record.getMessage().startswith("Warming the topic catalog")
+    assert record.exc_info[0] is ConnectionError
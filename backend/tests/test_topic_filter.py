@@ -0,0 +1,39 @@
+import pytest
+
+from tests.conftest import make_challenges, make_topics, make_user
+
+
+@pytest.fixture
+def tagged(db):
+    """Challenge 0 tagged python and sql, 1 python, 2 sql, 3 untagged"""
+    ada = make_user(db, "ada")
+    python, sql = make_topics(db, "python", "sql")
+    return {
+        "both": make_challenges(db, ada, 1, [python, sql])[0].slug,
+        "python": make_challenges(db, ada, 1, [python])[0].slug,
+        "sql": make_challenges(db, ada, 1, [sql])[0].slug,
+        "none": make_challenges(db, ada, 1)[0].slug,
+    }
+
+
+def slugs(client, **params):
+    response = client.get("/challenge/available", params=params)
+    assert response.status_code == 200
+    return sorted(challenge["slug"] for challenge in response.json()["data"])
+
+
+def test_any_topic_returns_each_challenge_once(client, tagged):
+    page = slugs(client, topics=["python", "sql"], limit=10)
+
+    assert page == sorted([tagged["both"], tagged["python"], tagged["sql"]])
+
+
+def test_all_topics(client, tagged):
+    page = slugs(client, topics=["python", "sql"], topic_match="all", limit=10)
+
+    assert page == [tagged["both"]]
+
+
+def test_unknown_topic_matches_nothing(client, tagged):
+    assert slugs(client, topics=["cobol"], limit=10) == []
+    assert slugs(client, topics=["python", "cobol"], topic_match="all", limit=10) == []
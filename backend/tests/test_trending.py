@@ -0,0 +1,109 @@
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import update
+
+from app.api.crud.trending import naive_utc_now, trending_ranking
+from app.api.models import ChallengeTakers
+from app.api.models.challenges import ApprovalStatus, ChallengeStatus
+
+from tests.conftest import auth_headers, make_challenges, make_user
+
+
+@pytest.fixture
+def refresh_every_request(monkeypatch):
+    monkeypatch.setattr(trending_ranking, "interval", 0)
+
+
+def take(db, users, challenge, *, ago=timedelta(0), status=ChallengeStatus.PENDING):
+    for user in users:
+        db.add(
+            ChallengeTakers(
+                user_id=user.id,
+                challenge_id=challenge.id,
+                status=status,
+                updated_at=naive_utc_now() - ago,
+            )
+        )
+    db.commit()
+
+
+def test_trending_ranks_recent_activity(client, db, refresh_every_request):
+    contributor = make_user(db, "ada")
+    users = [make_user(db, f"user{i}") for i in range(4)]
+    old, taken, submitted, quiet = make_challenges(db, contributor, 4)
+    (rejected,) = make_challenges(db, contributor, 1, approval=ApprovalStatus.REJECTED)
+    half_life = timedelta(seconds=trending_ranking.half_life)
+    # 3 takes a half-life ago weigh 1.5, as much as a submission now
+    take(db, users[:3], old, ago=half_life)
+    take(db, users[:2], taken)
+    take(db, users[:1], submitted, status=ChallengeStatus.SUBMITTED)
+    take(db, users[:1], quiet, status=ChallengeStatus.ACCEPTED)
+    take(db, users, rejected)
+
+    response = client.get("/challenge/trending")
+    assert response.status_code == 200
+    page = response.json()
+    assert [item["id"] for item in page["data"]] == [
+        str(submitted.id),
+        str(taken.id),
+        str(old.id),
+    ]
+    assert [item["trending_score"] for item in page["data"]] == pytest.approx(
+        [3, 2, 1.5], abs=0.01
+    )
+    assert page["data"][0]["title"] == submitted.title
+    assert page["data"][0]["topic_tags"] == []
+    assert (page["hasPrev"], page["hasNext"]) == (False, False)
+
+    second = client.get("/challenge/trending?limit=1&offset=1").json()
+    assert [item["id"] for item in second["data"]] == [str(taken.id)]
+    assert (second["hasPrev"], second["hasNext"]) == (True, True)
+
+    etag = response.headers["etag"]
+    unchanged = client.get("/challenge/trending", headers={"If-None-Match": etag})
+    assert unchanged.status_code == 304
+
+
+def test_refresh_adds_new_takers_once(client, db, refresh_every_request):
+    contributor = make_user(db, "ada")
+    users = [make_user(db, f"user{i}") for i in range(3)]
+    first, second = make_challenges(db, contributor, 2)
+    take(db, users[:2], first)
+
+    client.get("/challenge/trending")
+    assert dict(trending_ranking.scores) == pytest.approx({first.id: 2}, abs=0.01)
+
+    # rows read again within the commit lag are not counted twice
+    take(db, users[:1], second)
+    client.get("/challenge/trending")
+    assert dict(trending_ranking.scores) == pytest.approx(
+        {first.id: 2, second.id: 1}, abs=0.01
+    )
+
+    # a submission adds to the take of the challenge
+    response = client.patch(
+        "/challenge/submit-challenge-solution",
+        json={
+            "challenge_id": str(second.id),
+            "github_url": "https://github.com/user0/solution",
+            "presentation_video_url": "https://youtu.be/user0",
+        },
+        headers=auth_headers(users[0]),
+    )
+    assert response.status_code == 200
+    page = client.get("/challenge/trending").json()
+    assert [item["id"] for item in page["data"]] == [str(second.id), str(first.id)]
+
+
+def test_ranking_is_served_between_refreshes(client, db, count_queries):
+    contributor = make_user(db, "ada")
+    user = make_user(db, "bob")
+    (challenge,) = make_challenges(db, contributor, 1)
+    client.get("/challenge/trending")
+
+    take(db, [user], challenge)
+    with count_queries() as queries:
+        page = client.get("/challenge/trending").json()
+    assert page["data"] == []
+    assert queries.count == 0